@@ -9,82 +9,31 @@ Usage:
     python3 zenn-retry-failed.py [--max N]
 """
 
-import re
 import sys
-import json
 import os
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from zenn_corpus import load_corpus  # noqa: E402
+from zenn_discord import Notice, deliver, webhook_url  # noqa: E402
+from zenn_state import StateTransaction, TransitionError, schedule  # noqa: E402
 
 # 設定（GitHub Actions環境対応）
 WORKSPACE = Path(os.getenv("GITHUB_WORKSPACE", "."))
 ARTICLES_DIR = WORKSPACE / "articles"
-RETRY_QUEUE_FILE = WORKSPACE / ".github/scripts/.zenn-retry-queue.json"
 MAX_ARTICLES_PER_RUN = 3  # 24時間に5本以内のため、保守的に3本
 
 
-def load_retry_queue() -> List[Dict]:
-    """リトライキューを読み込み"""
-    if not RETRY_QUEUE_FILE.exists():
-        return []
-
-    with open(RETRY_QUEUE_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def save_retry_queue(queue: List[Dict]):
-    """リトライキューを保存"""
-    RETRY_QUEUE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(RETRY_QUEUE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(queue, f, indent=2, ensure_ascii=False)
-
-
-def schedule_article(file_path: Path, published_at: str):
-    """記事のpublished_atを更新"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # published: false → true
-    content = re.sub(
-        r'^published:\s*false',
-        'published: true',
-        content,
-        flags=re.MULTILINE
-    )
-
-    # published_at を更新
-    if re.search(r'^published_at:', content, re.MULTILINE):
-        content = re.sub(
-            r'^published_at:.*$',
-            f'published_at: "{published_at}"',
-            content,
-            flags=re.MULTILINE
-        )
-    else:
-        content = re.sub(
-            r'^(published: true)$',
-            f'\\1\npublished_at: "{published_at}"',
-            content,
-            flags=re.MULTILINE
-        )
-
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-
 def get_existing_scheduled_times() -> set:
     """既存記事のpublished_atを取得（競合チェック用）"""
     scheduled_times = set()
 
-    for article_file in ARTICLES_DIR.glob("*.md"):
-        with open(article_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # published_at を抽出
-        match = re.search(r'^published_at:\s*["\']?([^"\']+)["\']?', content, re.MULTILINE)
-        if match:
-            scheduled_times.add(match.group(1).strip())
+    for article in load_corpus(articles_dir=ARTICLES_DIR).values():
+        published_at = article.fm.get("published_at", "")
+        if published_at:
+            scheduled_times.add(published_at)
 
     return scheduled_times
 
@@ -143,7 +92,8 @@ def main():
     print(f"Zennリトライ処理開始: {datetime.now().isoformat()}")
     print(f"最大処理数: {max_articles}件")
 
-    retry_queue = load_retry_queue()
+    txn = StateTransaction(root=WORKSPACE)
+    retry_queue = txn.state.retry_queue
 
     if not retry_queue:
         print("リトライキューは空です")
@@ -155,19 +105,39 @@ def main():
     remaining = retry_queue[max_articles:]
 
     next_slots = calculate_next_slots(len(to_process))
+    if len(next_slots) < len(to_process):
+        # 空きスロットが足りない分はキューに残す
+        remaining = to_process[len(next_slots):] + remaining
+        to_process = to_process[:len(next_slots)]
 
     print(f"\n処理する記事: {len(to_process)}件")
-    for i, article in enumerate(to_process):
+    scheduled = []
+    for article, scheduled_at in zip(to_process, next_slots):
         file_path = WORKSPACE / article.get('file_path', article.get('file', ''))
-        if not file_path.exists():
+        if not file_path.is_file():
             print(f"  ❌ {article['slug']}: ファイルが見つかりません")
+            txn.record("dequeued", article['slug'])
             continue
-
-        scheduled_at = next_slots[i]
-        schedule_article(file_path, scheduled_at)
-        print(f"  ✅ {article['slug']}: {scheduled_at} に予約")
-
-    save_retry_queue(remaining)
+        if any(slug == file_path.stem for slug, _ in txn.transitions):
+            print(f"  ⚠️ {article['slug']}: キューに重複しているためスキップ")
+            txn.record("dequeued", article['slug'])
+            continue
+        txn.add(file_path.stem, schedule(scheduled_at))
+        txn.record("dequeued", article['slug'])
+        scheduled.append((article['slug'], scheduled_at))
+
+    # 予約した記事とキューの更新を1回でまとめて書き込む（検証エラー時は何も変更しない）
+    try:
+        txn.commit()
+    except TransitionError as e:
+        print("❌ 予約を中止しました（ファイルは変更していません）:")
+        for error in e.errors:
+            print(f"  - {error}")
+        sys.exit(1)
+    for slug, scheduled_at in scheduled:
+        print(f"  ✅ {slug}: {scheduled_at} に予約")
+    if scheduled and webhook_url():
+        deliver([Notice("retry", slug, detail=at) for slug, at in scheduled], webhook_url())
 
     print(f"\n残りのリトライキュー: {len(remaining)}件")
     print(f"リトライ処理完了: {datetime.now().isoformat()}")
@@ -9,9 +9,11 @@ Usage:
     python3 zenn-validate.py
 """
 import sys
-import re
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from zenn_corpus import load_corpus  # noqa: E402
+
 ARTICLES_DIR = Path("articles")
 
 
@@ -19,24 +21,13 @@ def validate_articles() -> list[str]:
     """バリデーションエラーを検出"""
     errors = []
 
-    for article_file in ARTICLES_DIR.glob("*.md"):
-        content = article_file.read_text(encoding="utf-8")
-
-        published_match = re.search(r'^published:\s*(\w+)', content, re.MULTILINE)
-        published_at_match = re.search(r'^published_at:', content, re.MULTILINE)
-
-        if published_match and published_at_match:
-            published = published_match.group(1)
-            if published == "false":
-                published_at_line = re.search(
-                    r'^published_at:\s*["\']?([^"\']+)["\']?',
-                    content,
-                    re.MULTILINE
-                )
-                published_at_value = published_at_line.group(1) if published_at_line else "Unknown"
-                errors.append(
-                    f"{article_file.name}: published: false + published_at: {published_at_value} は無効"
-                )
+    for article in load_corpus(articles_dir=ARTICLES_DIR).values():
+        fm = article.fm
+        if fm.get("published") == "false" and "published_at" in fm:
+            published_at_value = fm["published_at"] or "Unknown"
+            errors.append(
+                f"{article.filename}: published: false + published_at: {published_at_value} は無効"
+            )
 
     return errors
 
@@ -10,172 +10,268 @@ published: true の記事が実際にZennに公開されているか確認し、
     次回 push 時に Zenn が自動リトライするため、ロールバック不要。
     ロールバックすると publish→rollback→republish の無限ループが発生する。
   - 猶予期間: 最終変更から6時間以内の記事はスキップ（デプロイ待ち）
-  - 失敗記録: .publish-failures.json に記録（監視・Discord通知用）
+  - 失敗記録: イベントログ scripts/.publish-events.jsonl に記録（監視・Discord通知用）
+  - Discord 通知は scripts/zenn_discord.py 経由（レート制限対応・未達分は次回再送）
+  - 最終コミット時刻は git 履歴インデックス（scripts/zenn_history.py）から取得する
+  - Zenn への確認は requests.Session の接続プールで並行実行する（MAX_WORKERS 並列）
+  - 前回 OK だった記事は、その後コミットされておらず VERIFY_FRESH_HOURS 以内なら
+    再確認しない（.zenn-cache/verify-status.json）
+
+--wait-until-deployed モード:
+  固定 sleep の代わりに、指定コミット（既定 HEAD）で変更された公開記事だけを
+  指数バックオフ + ジッターでポーリングし、全て 200 になるか期限切れで終了する。
+  slug ごとに公開までの経過秒数を出力する。期限切れなら exit 1。
 
 Usage:
     python3 zenn-verify-published.py [--fix]  # --fix は後方互換のため残存、動作は同じ
+    python3 zenn-verify-published.py --wait-until-deployed [--commit REV] [--deadline SEC]
 """
 
 import json
 import os
-import re
+import random
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List
 
 import requests
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from zenn_corpus import ZENN_ARTICLES_URL, atomic_write, load_corpus  # noqa: E402
+from zenn_discord import Notice, deliver, webhook_url  # noqa: E402
+from zenn_frontmatter import patch_frontmatter, unquote  # noqa: E402
+from zenn_history import load_history  # noqa: E402
+from zenn_state import StateTransaction  # noqa: E402
+
 # 設定（GitHub Actions環境対応）
 WORKSPACE = Path(os.getenv("GITHUB_WORKSPACE", "."))
 ARTICLES_DIR = WORKSPACE / "articles"
-RETRY_QUEUE_FILE = WORKSPACE / ".github/scripts/.zenn-retry-queue.json"
-FAILURE_LOG = WORKSPACE / "scripts" / ".publish-failures.json"
-DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL_CONTENT", "")
+STATUS_CACHE_FILE = WORKSPACE / ".zenn-cache" / "verify-status.json"
 GRACE_PERIOD_HOURS = 6
+VERIFY_FRESH_HOURS = 24
+MAX_WORKERS = 8
+WAIT_DEADLINE_SEC = 600
+WAIT_INITIAL_SEC = 10
+WAIT_MAX_INTERVAL_SEC = 60
 JST = timezone(timedelta(hours=9))
 
 
-def extract_front_matter(file_path: Path) -> Dict[str, str]:
-    """front matterを抽出"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
-    if not match:
-        return {}
-
-    front_matter = {}
-    for line in match.group(1).split("\n"):
-        if ":" in line:
-            key, value = line.split(":", 1)
-            front_matter[key.strip()] = value.strip().strip('"')
-
-    return front_matter
+def make_session() -> requests.Session:
+    """Zenn 確認用の Session（MAX_WORKERS 本の keep-alive 接続をプール）"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
-def check_published_on_zenn(slug: str, username: str = "correlate") -> bool | None:
+def check_published_on_zenn(slug: str, session: requests.Session | None = None) -> bool | None:
     """Zennで実際に公開されているか確認. ネットワークエラー時は None."""
-    url = f"https://zenn.dev/{username}/articles/{slug}"
+    url = f"{ZENN_ARTICLES_URL}/{slug}"
     try:
-        response = requests.head(url, timeout=10, allow_redirects=True)
+        response = (session or requests).head(url, timeout=10, allow_redirects=True)
         return response.status_code in [200, 301]
     except Exception as e:
         print(f"  [WARN] Failed to check {slug}: {e}", file=sys.stderr)
         return None
 
 
-def get_file_modified_hours_ago(file_path: Path) -> float | None:
-    """git logからファイルの最終コミット時刻を取得し、経過時間を返す"""
-    try:
-        result = subprocess.run(
-            ["git", "log", "-1", "--format=%aI", "--", str(file_path)],
-            capture_output=True,
-            text=True,
-            cwd=WORKSPACE,
-            timeout=10,
-        )
-        if result.stdout.strip():
-            modified = datetime.fromisoformat(result.stdout.strip())
-            delta = datetime.now(timezone.utc) - modified
-            return delta.total_seconds() / 3600
-    except Exception:
-        pass
-    return None
-
-
-def rollback_published_flag(file_path: Path):
-    """published: true → false にロールバック + published_at も削除"""
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+def check_many_on_zenn(slugs: List[str]) -> Dict[str, bool | None]:
+    """複数 slug を接続プール付き Session で並行に確認する"""
+    if not slugs:
+        return {}
+    with make_session() as session, ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        results = pool.map(lambda slug: check_published_on_zenn(slug, session=session), slugs)
+        return dict(zip(slugs, results))
 
-    # published: true → false
-    updated = re.sub(
-        r"^published:\s*true", "published: false", content, flags=re.MULTILINE
-    )
 
-    # published_at も削除（published: false + published_at は無効な組み合わせ）
-    updated = re.sub(r"^published_at:.*\n", "", updated, flags=re.MULTILINE)
+def load_last_commit_times() -> Dict[str, datetime]:
+    """各記事の最終コミット時刻を git 履歴インデックスから取得する（slug → datetime）"""
+    try:
+        history = load_history(WORKSPACE)
+    except Exception as e:
+        print(f"  [WARN] git 履歴の取得失敗: {e}", file=sys.stderr)
+        return {}
+    return {slug: history.last_modified(slug) for slug in history.last_touched}
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(updated)
 
+def hours_since(moment: datetime | None) -> float | None:
+    if moment is None:
+        return None
+    return (datetime.now(timezone.utc) - moment).total_seconds() / 3600
 
-def load_retry_queue() -> List[Dict]:
-    """リトライキューを読み込み"""
-    if not RETRY_QUEUE_FILE.exists():
-        return []
 
-    with open(RETRY_QUEUE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+def load_status_cache() -> dict:
+    """前回の検証結果（slug → verified_at / committed_at）を読み込み"""
+    try:
+        with open(STATUS_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
 
-def save_retry_queue(queue: List[Dict]):
-    """リトライキューを保存"""
-    RETRY_QUEUE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(RETRY_QUEUE_FILE, "w", encoding="utf-8") as f:
-        json.dump(queue, f, indent=2, ensure_ascii=False)
+def save_status_cache(cache: dict):
+    """検証結果を保存（キャッシュなので失敗しても続行）"""
+    try:
+        STATUS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(STATUS_CACHE_FILE, json.dumps(cache, indent=2, ensure_ascii=False))
+    except OSError:
+        pass
 
 
-def load_failures() -> dict:
-    """失敗ログを読み込み"""
-    if not FAILURE_LOG.exists():
-        return {}
+def is_verified_fresh(entry: dict | None, committed_at: datetime | None) -> bool:
+    """前回 OK で、その後コミットされておらず VERIFY_FRESH_HOURS 以内か"""
+    if not entry:
+        return False
     try:
-        with open(FAILURE_LOG, encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, Exception):
-        return {}
+        verified_at = datetime.fromisoformat(entry["verified_at"])
+    except (KeyError, ValueError):
+        return False
+    if hours_since(verified_at) >= VERIFY_FRESH_HOURS:
+        return False
+    return committed_at is None or committed_at <= verified_at
 
 
-def save_failures(failures: dict):
-    """失敗ログを保存"""
-    FAILURE_LOG.parent.mkdir(parents=True, exist_ok=True)
-    with open(FAILURE_LOG, "w", encoding="utf-8") as f:
-        json.dump(failures, f, indent=2, ensure_ascii=False)
-
+def rollback_published_flag(file_path: Path):
+    """published: true → false にロールバック + published_at も削除"""
+    def edit(fm):
+        # published_at も削除（published: false + published_at は無効な組み合わせ）
+        changes = {"published_at": None}
+        if unquote(fm.get("published", "")) == "true":
+            changes["published"] = "false"
+        return changes
 
-def record_failure(slug: str, failures: dict):
-    """失敗を記録（カウント+タイムスタンプ）"""
-    now_str = datetime.now(JST).isoformat()
-    if slug in failures:
-        failures[slug]["count"] += 1
-        failures[slug]["last_failed"] = now_str
-    else:
-        failures[slug] = {"count": 1, "last_failed": now_str}
+    patch_frontmatter(file_path, edit)
 
 
 def send_discord_notification(failed_articles: List[Dict]):
-    """Discord通知送信"""
-    if not failed_articles or not DISCORD_WEBHOOK_URL:
+    """Discord通知送信（届かなかった分は次回の実行で再送される）"""
+    url = webhook_url()
+    if not failed_articles or not url:
         return
-
-    article_list = "\n".join(
-        [f"- `{a['slug']}` ({a['title'][:30]}...)" for a in failed_articles]
+    deliver([Notice("failed", a["slug"], a["title"]) for a in failed_articles], url)
+
+
+def changed_article_slugs(rev: str) -> List[str]:
+    """コミット rev で追加・変更された記事のうち、公開対象（published: true かつ予約時刻到来済み）の slug"""
+    result = subprocess.run(
+        ["git", "diff-tree", "--root", "--no-commit-id", "--name-only", "-r",
+         "--diff-filter=AMR", rev, "--", "articles"],
+        capture_output=True,
+        text=True,
+        cwd=WORKSPACE,
+        timeout=30,
     )
+    if result.returncode != 0:
+        print(f"git diff-tree {rev} に失敗: {result.stderr.strip()}", file=sys.stderr)
+        return []
+    paths = [WORKSPACE / line for line in result.stdout.splitlines() if line.endswith(".md")]
 
-    message = f"""🚨 **Zenn公開失敗検知**
-
-以下の記事が `published: true` ですが、Zennに公開されていません:
-
-{article_list}
-
-**対処**: published: true のまま維持。次回push時にZennが自動リトライします。
-（ロールバックは廃止 — publish→rollback→republish ループ防止のため）
-
-**確認**: https://zenn.dev/dashboard
-"""
+    now = datetime.now(JST)
+    slugs = []
+    for article in load_corpus([p for p in paths if p.exists()]).values():
+        front_matter = article.fm
+        if front_matter.get("published") != "true":
+            continue
+        published_at_str = front_matter.get("published_at", "")
+        if published_at_str:
+            try:
+                published_at = datetime.strptime(
+                    published_at_str, "%Y-%m-%d %H:%M"
+                ).replace(tzinfo=JST)
+                if published_at > now:
+                    continue
+            except ValueError:
+                pass
+        slugs.append(front_matter.get("slug", article.path.stem))
+    return slugs
+
+
+def wait_until_deployed(slugs: List[str], deadline_sec: float) -> Dict[str, float]:
+    """全 slug が公開されるか期限切れまでポーリングし、slug → 公開確認までの秒数を返す.
+
+    待機間隔は WAIT_INITIAL_SEC から倍々で WAIT_MAX_INTERVAL_SEC まで伸ばし、
+    同時実行の run と足並みが揃わないよう後半にジッターを入れる。
+    """
+    started = time.monotonic()
+    deadline = started + deadline_sec
+    pending = list(slugs)
+    latencies: Dict[str, float] = {}
+    interval = WAIT_INITIAL_SEC
+    attempt = 0
+
+    while pending:
+        attempt += 1
+        results = check_many_on_zenn(pending)
+        elapsed = time.monotonic() - started
+        for slug in pending:
+            if results[slug] is True:
+                latencies[slug] = elapsed
+                print(f"  ✅ {slug}: live after {elapsed:.0f}s (poll #{attempt})")
+        pending = [slug for slug in pending if slug not in latencies]
+        if not pending:
+            break
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        delay = min(interval / 2 + random.uniform(0, interval / 2), remaining)
+        print(f"  ... {len(pending)}件待機中、{delay:.0f}s 後に再確認")
+        time.sleep(delay)
+        interval = min(interval * 2, WAIT_MAX_INTERVAL_SEC)
+
+    return latencies
+
+
+def run_wait_mode() -> int:
+    rev = "HEAD"
+    if "--commit" in sys.argv:
+        idx = sys.argv.index("--commit")
+        if idx + 1 < len(sys.argv):
+            rev = sys.argv[idx + 1]
+    deadline_sec = WAIT_DEADLINE_SEC
+    if "--deadline" in sys.argv:
+        idx = sys.argv.index("--deadline")
+        if idx + 1 < len(sys.argv):
+            deadline_sec = int(sys.argv[idx + 1])
+
+    slugs = changed_article_slugs(rev)
+    print(f"デプロイ待機: {rev} の公開記事 {len(slugs)}件（期限 {deadline_sec}s）")
+    if not slugs:
+        return 0
+
+    latencies = wait_until_deployed(slugs, deadline_sec)
+
+    # 公開を確認できた記事は通常検証でも確認済みとして扱う
+    status_cache = load_status_cache()
+    verified_at = datetime.now(timezone.utc).isoformat()
+    for slug in latencies:
+        status_cache[slug] = {"verified_at": verified_at}
+    save_status_cache(status_cache)
+
+    print("\nslug ごとの公開までの時間:")
+    for slug in slugs:
+        if slug in latencies:
+            print(f"  {slug}: {latencies[slug]:.0f}s")
+        else:
+            print(f"  {slug}: ❌ {deadline_sec}s 以内に公開を確認できず")
 
-    try:
-        requests.post(
-            DISCORD_WEBHOOK_URL, json={"content": message}, timeout=10
-        )
-    except Exception as e:
-        print(f"Discord通知エラー: {e}", file=sys.stderr)
+    missing = len(slugs) - len(latencies)
+    if missing:
+        print(f"\n⏰ {missing}件が期限内に公開されませんでした")
+        return 1
+    print(f"\n✅ 全{len(slugs)}件の公開を確認しました")
+    return 0
 
 
 def main():
+    if "--wait-until-deployed" in sys.argv:
+        sys.exit(run_wait_mode())
+
     fix_mode = "--fix" in sys.argv
 
     print(f"Zenn公開状態検証開始: {datetime.now(JST).isoformat()}")
@@ -184,13 +280,21 @@ def main():
     print(f"Grace period: {GRACE_PERIOD_HOURS}h")
 
     failed_articles = []
-    retry_queue = load_retry_queue()
-    failures = load_failures()
+    corpus = load_corpus(articles_dir=ARTICLES_DIR)
+    # 失敗記録とリトライキューの変更はイベントとしてため、最後に1回でまとめて追記する
+    txn = StateTransaction(corpus=corpus, root=WORKSPACE)
+    failures = txn.state.failures
+
+    status_cache = load_status_cache()
+    commit_times = load_last_commit_times()
 
     now = datetime.now(JST)
 
-    for article_file in ARTICLES_DIR.glob("*.md"):
-        front_matter = extract_front_matter(article_file)
+    # 1パス目: ローカル情報だけで判定できる記事を振り分け、要確認の slug を集める
+    targets = []
+    for article in corpus.values():
+        article_file = article.path
+        front_matter = article.fm
 
         if front_matter.get("published") != "true":
             continue
@@ -212,68 +316,80 @@ def main():
                 pass  # パースできない場合は通常チェック
 
         # 猶予期間: 最終コミットから6h以内の記事はスキップ
-        hours_ago = get_file_modified_hours_ago(article_file)
+        rel_path = article_file.relative_to(WORKSPACE).as_posix()
+        committed_at = commit_times.get(article_file.stem)
+        hours_ago = hours_since(committed_at)
         if hours_ago is not None and hours_ago < GRACE_PERIOD_HOURS:
             print(
                 f"Checking: {slug}... ⏳ GRACE PERIOD ({hours_ago:.1f}h ago, need {GRACE_PERIOD_HOURS}h)"
             )
             continue
 
+        # 前回 OK かつその後未変更ならネットワーク確認を省略
+        if is_verified_fresh(status_cache.get(slug), committed_at):
+            if slug in failures:
+                txn.record("failure_cleared", slug)
+            print(f"Checking: {slug}... ✅ OK (cached)")
+            continue
+
+        targets.append((slug, title, rel_path))
+
+    # 2パス目: 残りを並行に確認し、記事順に結果を出力
+    results = check_many_on_zenn([slug for slug, _, _ in targets])
+    verified_at = datetime.now(timezone.utc).isoformat()
+
+    for slug, title, rel_path in targets:
         print(f"Checking: {slug}...", end=" ")
 
-        result = check_published_on_zenn(slug)
+        result = results[slug]
         if result is True:
-            # 公開成功 → 失敗ログから削除
+            # 公開成功 → 失敗記録から削除
             if slug in failures:
-                del failures[slug]
+                txn.record("failure_cleared", slug)
+            status_cache[slug] = {"verified_at": verified_at}
             print("✅ OK")
         elif result is None:
             print("⚠️ NETWORK ERROR (skipped)")
         else:
+            status_cache.pop(slug, None)
             print("❌ NOT PUBLISHED")
             failed_articles.append(
                 {
                     "slug": slug,
                     "title": title,
-                    "file": str(article_file.relative_to(WORKSPACE)),
+                    "file": rel_path,
                     "detected_at": now.isoformat(),
                 }
             )
 
             # 失敗記録（ロールバックは廃止: published: true のまま維持し次回pushでリトライ）
-            record_failure(slug, failures)
+            txn.record("failed", slug)
             print(f"  → published: true を維持（次回push時にZennが自動リトライ）")
 
-    # 失敗ログの肥大化防止: 失敗10回以上の記事は手動対応案件として除外
-    permanent_failures = [
-        slug for slug, data in failures.items() if data.get("count", 0) >= 10
-    ]
-    for slug in permanent_failures:
-        print(f"  ⚠️ {slug}: 失敗10回以上 → 手動対応が必要です")
-        del failures[slug]
-
-    # 失敗ログ保存
-    save_failures(failures)
-
-    # リトライキューに追加（30日超のエントリは自動削除）
-    cutoff = (now - timedelta(days=30)).isoformat()
-    retry_queue = [
-        item for item in retry_queue
-        if item.get("detected_at", now.isoformat()) > cutoff
-    ]
-    existing_slugs = {item["slug"] for item in retry_queue}
+    save_status_cache(status_cache)
+
+    # 失敗記録の肥大化防止: 失敗10回以上の記事は手動対応案件として除外
+    for slug, data in txn.state.failures.items():
+        if data.get("count", 0) >= 10:
+            print(f"  ⚠️ {slug}: 失敗10回以上 → 手動対応が必要です")
+            txn.record("failure_abandoned", slug)
+
+    # リトライキューに追加（30日超のエントリはイベントログの保持期間で消える）
+    queued = txn.state
     for article in failed_articles:
-        if article["slug"] not in existing_slugs:
-            retry_queue.append(article)
+        if not queued.queued(article["slug"]):
+            txn.record("queued", article["slug"], title=article["title"], file=article["file"])
 
-    save_retry_queue(retry_queue)
+    # 失敗記録・リトライキューのイベントを追記
+    txn.commit()
+    state = txn.state
 
     # Discord通知
     if failed_articles:
         send_discord_notification(failed_articles)
         print(f"\n🚨 {len(failed_articles)}件の公開失敗を検知しました")
-        print(f"リトライキュー: {len(retry_queue)}件")
-        print(f"失敗記録: {len(failures)}件（48hクールダウン適用）")
+        print(f"リトライキュー: {len(state.retry_queue)}件")
+        print(f"失敗記録: {len(state.failures)}件（48hクールダウン適用）")
     else:
         print("\n✅ 全記事が正常に公開されています")
 
@@ -1,11 +1,11 @@
 """全公開記事に関連記事 + Publication フッターを追加するスクリプト."""
 
-import os
 import re
 import sys
-import tempfile
 from pathlib import Path
 
+from zenn_corpus import atomic_write
+
 RELATED_MAP = {
     "agent-teams-parallel": ["ai-content-pipeline", "claude-code-hooks-complete-guide", "morning-bot-ai"],
     "ai-content-pipeline": ["agent-teams-parallel", "content-pipeline-philosophy", "claude-code-knowledge-files"],
@@ -77,22 +77,6 @@ OLD_URL_PATTERNS = [
 NEW_URL_PATTERN = f"zenn.dev/{PUBLICATION}/articles/"
 
 
-def atomic_write(path: Path, content: str) -> None:
-    """一時ファイル経由でアトミックに書き込む."""
-    dir_ = path.parent
-    fd, tmp_path = tempfile.mkstemp(dir=dir_, suffix=".tmp")
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as fh:
-            fh.write(content)
-        os.replace(tmp_path, path)
-    except Exception:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
-        raise
-
-
 def fix_old_urls(content: str) -> tuple[str, int]:
     """旧URLを新URLに置換する。変更件数を返す。"""
     total_count = 0
@@ -2,86 +2,70 @@
 """
 Zenn記事 品質・SEO一括監査スクリプト
 重大度: CRITICAL / HIGH / MEDIUM / LOW
+
+使い方:
+  python3 scripts/audit_articles.py            # CPU数のプロセスで per-article チェックを並列実行
+  python3 scripts/audit_articles.py --jobs 1   # 直列実行
 """
 
+import argparse
 import os
 import re
 import sys
-from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from difflib import SequenceMatcher
+from fractions import Fraction
 
-ARTICLES_DIR = Path("/Users/naoyayokota/dev/projects/self/public-zenn-docs/articles")
+from zenn_corpus import ARTICLES_DIR, load_corpus
+from zenn_flanking import literal_bold
+from zenn_overlap import find_overlaps
 
 # ---- frontmatter パーサー ----
 
-def parse_frontmatter(content: str) -> dict:
-    """YAMLフロントマターをパース（PyYAML不要）"""
-    lines = content.split("\n")
-    if not lines[0].strip() == "---":
-        return {}
+def parse_frontmatter(fm_lines: list[str]) -> dict:
+    """front matter 行を監査用の dict に変換（PyYAML不要）
 
+    topics はリスト、true/false は bool に変換する。
+    """
     fm = {}
-    in_fm = False
-    for i, line in enumerate(lines):
-        if i == 0 and line.strip() == "---":
-            in_fm = True
-            continue
-        if in_fm and line.strip() == "---":
-            break
-        if in_fm:
-            # topics: [a, b, c] 形式
-            if line.startswith("topics:"):
-                val = line[len("topics:"):].strip()
-                if val.startswith("[") and val.endswith("]"):
-                    inner = val[1:-1]
-                    topics = [t.strip().strip('"').strip("'") for t in inner.split(",") if t.strip()]
-                    fm["topics"] = topics
-                else:
-                    fm["topics"] = []
-            elif ":" in line:
-                key, _, val = line.partition(":")
-                key = key.strip()
-                val = val.strip().strip('"').strip("'")
-                if val.lower() == "true":
-                    val = True
-                elif val.lower() == "false":
-                    val = False
-                fm[key] = val
+    for line in fm_lines:
+        # topics: [a, b, c] 形式
+        if line.startswith("topics:"):
+            val = line[len("topics:"):].strip()
+            if val.startswith("[") and val.endswith("]"):
+                inner = val[1:-1]
+                topics = [t.strip().strip('"').strip("'") for t in inner.split(",") if t.strip()]
+                fm["topics"] = topics
+            else:
+                fm["topics"] = []
+        elif ":" in line:
+            key, _, val = line.partition(":")
+            key = key.strip()
+            val = val.strip().strip('"').strip("'")
+            if val.lower() == "true":
+                val = True
+            elif val.lower() == "false":
+                val = False
+            fm[key] = val
     return fm
 
 
-def get_body(content: str) -> str:
-    """フロントマター以降の本文を返す"""
-    lines = content.split("\n")
-    if not lines[0].strip() == "---":
-        return content
-    end = -1
-    for i, line in enumerate(lines[1:], start=1):
-        if line.strip() == "---":
-            end = i
-            break
-    if end == -1:
-        return content
-    return "\n".join(lines[end + 1:])
-
-
 # ---- 記事読み込み ----
 
 def load_articles() -> list[dict]:
     articles = []
-    for path in sorted(ARTICLES_DIR.glob("*.md")):
-        text = path.read_text(encoding="utf-8")
-        fm = parse_frontmatter(text)
-        body = get_body(text)
+    for article in load_corpus(articles_dir=ARTICLES_DIR).values():
         articles.append({
-            "path": path,
-            "slug": path.stem,
-            "filename": path.name,
-            "fm": fm,
-            "body": body,
-            "raw": text,
-            "line_count": len(text.split("\n")),
+            "path": article.path,
+            "slug": article.slug,
+            "filename": article.filename,
+            "fm": parse_frontmatter(article.fm_lines),
+            "body": article.body,
+            "body_line": article.body_line,
+            "raw": article.text,
+            "line_count": article.line_count,
+            "article": article,
         })
     return articles
 
@@ -94,6 +78,70 @@ def title_similarity(t1: str, t2: str) -> float:
     return SequenceMatcher(None, t1, t2).ratio()
 
 
+SIMILAR_TITLE_THRESHOLD = 0.85
+
+
+def similar_title_candidates(titles: list[str], threshold: float = SIMILAR_TITLE_THRESHOLD) -> list[tuple[int, int]]:
+    """title_similarity >= threshold になり得るペア (i, j)（i < j, 昇順）を列挙する.
+
+    SequenceMatcher.ratio() は文字の多重集合の Dice 係数
+    2 * |A ∩ B| / (|A| + |B|)（= quick_ratio）を超えないので、
+    Dice >= threshold のペアを過不足なく返せば取りこぼしはない。
+
+    各文字の k 回目の出現を1トークンとして多重集合を集合に直し、PPJoin と同じ手順で絞り込む:
+      - 長さフィルタ: 短い方が長い方の t/(2-t) 倍以上
+      - prefix フィルタ: コーパス全体で出現頻度の低い順に並べたトークン列の先頭だけを
+        転置索引に載せる。Dice >= t のペアは必ず先頭同士でトークンを共有する
+      - 位置フィルタ: 共有トークンの位置から残りで到達し得る共通数の上限を見積もり、
+        必要な共通数に届かないペアを捨てる
+    最後にトークン集合の共通部分（= 多重集合の共通部分）を数えて Dice を確定する。
+    日本語タイトルは文字単位で扱うので分かち書きは不要。
+    """
+    t = Fraction(str(threshold))
+    tn, td = t.numerator, t.denominator
+
+    def required_overlap(m: int, n: int) -> int:
+        # 2 * O / (m + n) >= t を満たす最小の O
+        return -(-tn * (m + n) // (2 * td))
+
+    token_lists = [
+        [(ch, k) for ch, cnt in Counter(title).items() for k in range(cnt)] for title in titles
+    ]
+    freq = Counter(tok for tokens in token_lists for tok in tokens)
+    order = {tok: r for r, tok in enumerate(sorted(freq, key=lambda tok: (freq[tok], tok)))}
+    ranked = [sorted(order[tok] for tok in tokens) for tokens in token_lists]
+    token_sets = [frozenset(tokens) for tokens in ranked]
+
+    # 短い順に処理すると、索引に載るのは自分以下の長さの記事だけになるので
+    # 索引側の prefix を |y| - ceil(t * |y|) + 1 まで短くできる
+    index: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    candidates = []
+    for x in sorted(range(len(ranked)), key=lambda k: (len(ranked[k]), k)):
+        tokens = ranked[x]
+        n = len(tokens)
+        if n == 0:
+            continue
+        min_len = -(-tn * n // (2 * td - tn))
+        overlap: dict[int, int] = {}
+        for i, tok in enumerate(tokens[: n - min_len + 1]):
+            for y, j in index[tok]:
+                c = overlap.get(y, 0)
+                if c < 0:
+                    continue
+                m = len(ranked[y])
+                if m >= min_len and c + 1 + min(n - i - 1, m - j - 1) >= required_overlap(m, n):
+                    overlap[y] = c + 1
+                else:
+                    overlap[y] = -1
+        for i, tok in enumerate(tokens[: n - (-(-tn * n // td)) + 1]):
+            index[tok].append((x, i))
+        for y, c in overlap.items():
+            if c > 0:
+                if len(token_sets[x] & token_sets[y]) >= required_overlap(len(ranked[y]), n):
+                    candidates.append((min(x, y), max(x, y)))
+    return sorted(candidates)
+
+
 # ---- チェック関数 ----
 
 def check_duplicate_fixed_visual(articles: list[dict]) -> list[dict]:
@@ -126,38 +174,62 @@ def check_duplicate_fixed_visual(articles: list[dict]) -> list[dict]:
 
 
 def check_similar_titles(articles: list[dict]) -> list[dict]:
-    """タイトルが酷似する記事ペアを検出"""
+    """タイトルが酷似する記事ペアを検出
+
+    全ペアを SequenceMatcher で比較する代わりに similar_title_candidates で
+    quick_ratio >= 0.85 のペアだけを取り出し、ratio を1回だけ計算して確定する
+    （出力は全ペア比較と同一）。
+    """
     issues = []
     published = [a for a in articles if is_published(a)]
-    for i, a in enumerate(published):
-        t1 = a["fm"].get("title", "")
-        if not t1:
+    titles = [a["fm"].get("title", "") for a in published]
+    for i, j in similar_title_candidates(titles):
+        a, b = published[i], published[j]
+        t1, t2 = titles[i], titles[j]
+        if t1 == t2:
+            issues.append({
+                "severity": "CRITICAL",
+                "category": "重複記事",
+                "message": (
+                    f"タイトル完全一致\n"
+                    f"  {a['filename']}\n"
+                    f"  {b['filename']}\n"
+                    f"  title=「{t1}」"
+                ),
+            })
             continue
-        for b in published[i + 1 :]:
-            t2 = b["fm"].get("title", "")
-            if not t2:
-                continue
-            if t1 == t2:
-                issues.append({
-                    "severity": "CRITICAL",
-                    "category": "重複記事",
-                    "message": (
-                        f"タイトル完全一致\n"
-                        f"  {a['filename']}\n"
-                        f"  {b['filename']}\n"
-                        f"  title=「{t1}」"
-                    ),
-                })
-            elif title_similarity(t1, t2) >= 0.85:
-                issues.append({
-                    "severity": "HIGH",
-                    "category": "類似タイトル",
-                    "message": (
-                        f"タイトル類似度 {title_similarity(t1, t2):.0%}\n"
-                        f"  {a['filename']} →「{t1}」\n"
-                        f"  {b['filename']} →「{t2}」"
-                    ),
-                })
+        ratio = title_similarity(t1, t2)
+        if ratio >= SIMILAR_TITLE_THRESHOLD:
+            issues.append({
+                "severity": "HIGH",
+                "category": "類似タイトル",
+                "message": (
+                    f"タイトル類似度 {ratio:.0%}\n"
+                    f"  {a['filename']} →「{t1}」\n"
+                    f"  {b['filename']} →「{t2}」"
+                ),
+            })
+    return issues
+
+
+def check_body_overlap(articles: list[dict]) -> list[dict]:
+    """本文（コードブロック外）が重複する記事ペアを一致箇所の行範囲つきで検出"""
+    issues = []
+    by_article = {id(a["article"]): a for a in articles}
+    for art_a, art_b, sections in find_overlaps([a["article"] for a in articles]):
+        a, b = by_article[id(art_a)], by_article[id(art_b)]
+        if not (is_published(a) or is_published(b)):
+            continue
+        ranges = "\n".join(
+            f"  L{s.a_start}-{s.a_end} ⇔ L{s.b_start}-{s.b_end}（一致 {s.count}箇所）"
+            for s in sections[:5]
+        )
+        more = f"\n  ...ほか{len(sections) - 5}区間" if len(sections) > 5 else ""
+        issues.append({
+            "severity": "MEDIUM" if is_published(a) and is_published(b) else "LOW",
+            "category": "本文重複",
+            "message": f"{a['filename']} ⇔ {b['filename']}\n{ranges}{more}",
+        })
     return issues
 
 
@@ -325,51 +397,40 @@ def check_tech_without_code(articles: list[dict]) -> list[dict]:
     return issues
 
 
+FLANKING_SAMPLES = 5
+
+
 def check_commonmark_flanking(articles: list[dict]) -> list[dict]:
     """CommonMark flanking rule違反による未レンダリングboldを検出する。
 
     `）**は` `**word **` のように日本語文字や全角括弧に挟まれた `**` は
-    Zenn上で literal asterisk として表示される。python-commonmark で
-    実際にHTMLレンダリングし、コード/preブロック外に `**` が残るかを検査する。
+    Zenn上で literal asterisk として表示される。zenn_flanking で python-commonmark と
+    同じ強調判定を行い、コード/preブロック外に `**` が残る位置を 行:列 で報告する。
     """
-    try:
-        import commonmark
-    except ImportError:
-        return [{
-            "severity": "INFO",
-            "category": "依存欠落",
-            "message": "python-commonmark が未インストール。`pip install commonmark` で flanking チェックが有効化されます",
-        }]
-    parser = commonmark.Parser()
-    renderer = commonmark.HtmlRenderer()
     issues = []
     for a in articles:
-        try:
-            ast = parser.parse(a["body"])
-            html = renderer.render(ast)
-        except Exception:
+        hits = literal_bold(a["body"])
+        if not hits:
             continue
-        # コード/preブロック除外
-        cleaned = re.sub(r"<pre[^>]*>.*?</pre>", "", html, flags=re.S)
-        cleaned = re.sub(r"<code[^>]*>.*?</code>", "", cleaned, flags=re.S)
-        if "**" in cleaned:
-            count = cleaned.count("**")
-            samples = []
-            for m in re.finditer(r".{0,40}\*\*.{0,40}", cleaned):
-                ctx = re.sub(r"<[^>]+>", "", m.group()).strip()
-                if ctx:
-                    samples.append(ctx[:120])
-                if len(samples) >= 3:
-                    break
-            severity = "HIGH" if is_published(a) else "MEDIUM"
-            issues.append({
-                "severity": severity,
-                "category": "CommonMark flanking違反",
-                "message": (
-                    f"{a['filename']}: literal `**` がレンダリングHTMLに{count}件残存\n"
-                    f"  例: " + " / ".join(samples)
-                ),
-            })
+        body_lines = a["body"].split("\n")
+        samples = []
+        for line, col in hits[:FLANKING_SAMPLES]:
+            if line < 0:
+                samples.append("（リンク先URL内）")
+                continue
+            text = body_lines[line]
+            snippet = text[max(0, col - 20):col + 22].strip()
+            samples.append(f"L{a['body_line'] + line + 1}:{col + 1} {snippet}")
+        more = f"\n  ...ほか{len(hits) - len(samples)}件" if len(hits) > len(samples) else ""
+        severity = "HIGH" if is_published(a) else "MEDIUM"
+        issues.append({
+            "severity": severity,
+            "category": "CommonMark flanking違反",
+            "message": (
+                f"{a['filename']}: literal `**` がレンダリング結果に{len(hits)}件残存\n  "
+                + "\n  ".join(samples) + more
+            ),
+        })
     return issues
 
 
@@ -441,38 +502,82 @@ def print_stats(articles: list[dict]):
 
 SEVERITY_ORDER = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3, "INFO": 4}
 
-def main():
-    print("Loading articles...")
-    articles = load_articles()
-    print(f"Loaded {len(articles)} articles.\n")
+# チェック登録簿（実行順 = 出力順）
+#   per_article=True : 記事ごとに独立して判定できる。--jobs で記事チャンクに分けて並列実行する
+#   per_article=False: 記事間の比較・集計が必要。親プロセスで全記事に対して実行する
+CHECKS = [
+    # 1. 重複記事
+    (check_duplicate_fixed_visual, False),
+    (check_similar_titles, False),
+    (check_body_overlap, False),
+    (check_known_bugs, True),
+    # 2. SEO
+    (check_title_length, True),
+    (check_topics_count, True),
+    (check_compound_topics, True),
+    (check_type_ratio, False),
+    # 3. コンテンツ品質
+    (check_short_articles, True),
+    (check_heading_count, True),
+    (check_lead_section, True),
+    (check_tech_without_code, True),
+    # 4. frontmatter品質
+    (check_duplicate_emoji, False),
+    # 5. レンダリング品質（CommonMark flanking）
+    (check_commonmark_flanking, True),
+]
+PER_ARTICLE_CHECKS = [fn for fn, per_article in CHECKS if per_article]
+CHUNKS_PER_JOB = 4
+
+
+def run_per_article_checks(chunk: list[dict]) -> list[list[dict]]:
+    """記事チャンクに per-article チェックを全て適用する（ワーカープロセスで実行）"""
+    return [fn(chunk) for fn in PER_ARTICLE_CHECKS]
 
-    print_stats(articles)
-    print()
 
+def run_checks(articles: list[dict], jobs: int = 1) -> list[dict]:
+    """登録簿のチェックを実行し、直列実行と同じ順序で issue を返す.
+
+    per-article チェックは記事を連続チャンクに分けてプロセスプールで並列に実行し、
+    チェック順 → チャンク順に連結する。
+    """
+    if jobs > 1:
+        # 子プロセスには Article（ファイル内容のキャッシュ付き）を送らない
+        slim = [{k: v for k, v in a.items() if k != "article"} for a in articles]
+        size = max(1, -(-len(slim) // (jobs * CHUNKS_PER_JOB)))
+        chunks = [slim[i:i + size] for i in range(0, len(slim), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunk_results = list(pool.map(run_per_article_checks, chunks))
+        per_article = [
+            [issue for result in chunk_results for issue in result[k]]
+            for k in range(len(PER_ARTICLE_CHECKS))
+        ]
+    else:
+        per_article = run_per_article_checks(articles)
+
+    results = iter(per_article)
     all_issues = []
+    for fn, is_per_article in CHECKS:
+        all_issues += next(results) if is_per_article else fn(articles)
+    return all_issues
 
-    # 1. 重複記事
-    all_issues += check_duplicate_fixed_visual(articles)
-    all_issues += check_similar_titles(articles)
-    all_issues += check_known_bugs(articles)
 
-    # 2. SEO
-    all_issues += check_title_length(articles)
-    all_issues += check_topics_count(articles)
-    all_issues += check_compound_topics(articles)
-    all_issues += check_type_ratio(articles)
+def main():
+    parser = argparse.ArgumentParser(description="Zenn記事 品質・SEO一括監査")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=os.cpu_count() or 1,
+        help="per-article チェックの並列プロセス数（デフォルト: CPU数、1 で直列）",
+    )
+    args = parser.parse_args()
 
-    # 3. コンテンツ品質
-    all_issues += check_short_articles(articles)
-    all_issues += check_heading_count(articles)
-    all_issues += check_lead_section(articles)
-    all_issues += check_tech_without_code(articles)
+    print("Loading articles...")
+    articles = load_articles()
+    print(f"Loaded {len(articles)} articles.\n")
 
-    # 4. frontmatter品質
-    all_issues += check_duplicate_emoji(articles)
+    print_stats(articles)
+    print()
 
-    # 5. レンダリング品質（CommonMark flanking）
-    all_issues += check_commonmark_flanking(articles)
+    all_issues = run_checks(articles, jobs=max(1, args.jobs))
 
     # ソート（重大度順）
     all_issues.sort(key=lambda x: SEVERITY_ORDER.get(x["severity"], 99))
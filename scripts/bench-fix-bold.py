@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+fix-bold の bold ペア照合のベンチマーク
+
+  - 現行（zenn_rewrite.bold_edits: コード外の `*` 位置を1回走査）
+  - 従来実装（文字ごとのマスク + 閉じ候補ごとに内側を再走査）
+の実行時間を、`*` を数百個含む病的な行（テーブル行・長い段落）で比べる。
+あわせて articles/*.md の全行と病的な行で両者の出力が一致することを確認する。
+
+使い方:
+  python3 scripts/bench-fix-bold.py                 # * 200〜1600個の行
+  python3 scripts/bench-fix-bold.py --stars 5000
+"""
+import argparse
+import random
+import sys
+import time
+
+from zenn_corpus import ARTICLES_DIR
+from zenn_markdown import BLANK, FENCE, FRONTMATTER, TEXT, Line, code_spans, inline_spans, tokenize
+from zenn_rewrite import apply_edits, bold_edits
+
+
+def naive_fix_line(line: str):
+    """従来実装（O(n²)）"""
+    mask = [False] * len(line)
+    for start, end in code_spans(line):
+        mask[start:end] = [True] * (end - start)
+    n = len(line)
+    out = []
+    i = 0
+    fixes = 0
+    while i < n:
+        if i + 1 < n and line[i] == '*' and line[i + 1] == '*' and not mask[i]:
+            j = i + 2
+            found_close = -1
+            while j + 1 < n:
+                if line[j] == '*' and line[j + 1] == '*' and not mask[j]:
+                    inner = line[i + 2:j]
+                    bad = False
+                    for k, c in enumerate(inner):
+                        if c == '*' and not mask[i + 2 + k]:
+                            bad = True
+                            break
+                    if not bad:
+                        found_close = j
+                        break
+                j += 1
+            if found_close != -1:
+                inner = line[i + 2:found_close]
+                stripped = inner.strip()
+                if stripped and inner != stripped:
+                    out.append('**' + stripped + '**')
+                    fixes += 1
+                else:
+                    out.append(line[i:found_close + 2])
+                i = found_close + 2
+                continue
+        out.append(line[i])
+        i += 1
+    return ''.join(out), fixes
+
+
+def fix_line(line: str):
+    return apply_fixes(to_line(line))
+
+
+def to_line(text: str) -> Line:
+    return Line(0, text, TEXT, spans=inline_spans(text))
+
+
+def apply_fixes(line: Line):
+    fixes = bold_edits(line)
+    new, counts = apply_edits(line.text, [(*e, ("bold", k)) for k, fix in enumerate(fixes) for e in fix])
+    return new, counts["bold"]
+
+
+def pathological_lines(stars: int, rng: random.Random) -> dict[str, str]:
+    """`*` を stars 個前後含む行"""
+    words = ["設定", "API", "Cloud Run", "値", "`a*b`", "`**`", " ", "a"]
+    return {
+        # 閉じられない ** の連続（従来実装は開きごとに行末まで走査する）
+        "unclosed": "** * " * (stars // 3),
+        # テーブル行: 各セルに余白付き bold と単独 *
+        "table": "|" + "|".join(
+            f" ** {rng.choice(words)} ** * " for _ in range(stars // 5)
+        ) + "|",
+        # 長い段落: インラインコード内の * と bold が混在
+        "paragraph": "".join(
+            rng.choice(["** 強調 **", "*", "`*`", "テキスト", "**", " `**x**` "])
+            for _ in range(stars // 2)
+        ),
+    }
+
+
+def timed(lines: list[str], repeat: int = 1) -> tuple[float, float]:
+    """(現行, 従来) の所要時間。トークン（インラインコードの範囲）はエンジンで共有済みなので
+    現行は計測に含めず、従来実装は行ごとのマスク作成を含める。"""
+    tokens = [to_line(line) for line in lines]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for line in tokens:
+            apply_fixes(line)
+    fast = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            naive_fix_line(line)
+    return fast / repeat, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fix-bold の bold ペア照合のベンチマーク")
+    parser.add_argument("--stars", type=int, nargs="+", default=[200, 400, 800, 1600],
+                        help="病的な行に含める * の数（デフォルト: 200 400 800 1600）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    corpus = [
+        line.text
+        for path in sorted(ARTICLES_DIR.glob("*.md"))
+        for line in tokenize(path.read_text(encoding="utf-8").split("\n"))
+        if line.block not in (FRONTMATTER, FENCE, BLANK)
+    ]
+    mismatches = [line for line in corpus if fix_line(line) != naive_fix_line(line)]
+    fast, slow = timed(corpus)
+    print(f"コーパス: {len(corpus)}行  現行 {fast:.3f}s  従来 {slow:.3f}s")
+
+    for stars in args.stars:
+        for name, line in pathological_lines(stars, rng).items():
+            if fix_line(line) != naive_fix_line(line):
+                mismatches.append(line)
+            fast, slow = timed([line], 3)
+            print(f"{name:>9} * {line.count('*'):5d}個 {len(line):6d}文字  "
+                  f"現行 {fast * 1000:8.2f}ms  従来 {slow * 1000:9.2f}ms  ({slow / fast:6.1f}x)")
+
+    if mismatches:
+        print(f"✗ 出力が従来実装と一致しない行: {len(mismatches)}", file=sys.stderr)
+        for line in mismatches[:5]:
+            print(f"  {line[:80]}", file=sys.stderr)
+        sys.exit(1)
+    print("✓ 出力は従来実装と一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+CommonMark flanking チェックの差分テストとベンチマーク
+
+  - 現行（zenn_flanking.literal_bold: ブロック/インライン解析のみ、HTML を作らない）
+  - 従来実装（python-commonmark で HTML レンダリング → <pre>/<code> を除いて `**` を数える）
+の記事ごとの `**` の件数を比べ、所要時間を計測する。
+
+差分テストの入力:
+  corpus     articles/*.md の本文
+  perturbed  本文の段落に `）**は` `** x **` 単独の `*` などを差し込んだもの
+  fuzz       `*` `_` `` ` `` `[` `<` `>` `-` 全角括弧などをランダムに並べた短い文書
+
+使い方:
+  python3 scripts/bench-flanking.py
+  python3 scripts/bench-flanking.py --fuzz 20000 --seed 1
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from zenn_corpus import ARTICLES_DIR, load_corpus
+from zenn_flanking import literal_bold
+
+try:
+    import commonmark
+except ImportError:
+    commonmark = None
+
+TARGET_SPEEDUP = 10  # corpus で python-commonmark に対して目指す倍率
+
+INJECTIONS = ["）**は", "**強調 **", "** x **", "*", "**", "「**引用**」", "`**`", "\\*\\*", "&#42;&#42;",
+              "[**a**](https://example.com/**)", "<span>**</span>", "_**a**_"]
+FUZZ_ATOMS = ["*", "**", "***", "_", "__", "`", "``", "[", "]", "(", ")", "<", ">", "!", "\\", "&amp;",
+              "&#42;", "a", "あ", "（", "）", "。", " ", "  ", "\n", "\n\n", "\n- ", "\n1. ", "\n> ",
+              "\n    ", "\n```\n", "\n~~~\n", "\n  - ", "\n# ", "\n---\n", "\n===\n", "\n<div>\n",
+              "\n<!--\n", "-->", "<b>", "<code>", "</code>", "https://x.y/", "\t", "\n[a]: /u*\n", "[a]"]
+
+
+def naive_count(parser, renderer, text: str) -> int:
+    """従来実装（audit_articles の旧 check_commonmark_flanking と同じ判定）"""
+    html = renderer.render(parser.parse(text))
+    cleaned = re.sub(r"<pre[^>]*>.*?</pre>", "", html, flags=re.S)
+    cleaned = re.sub(r"<code[^>]*>.*?</code>", "", cleaned, flags=re.S)
+    return cleaned.count("**")
+
+
+def perturb(body: str, rng: random.Random) -> str:
+    lines = body.split("\n")
+    for _ in range(max(1, len(lines) // 10)):
+        k = rng.randrange(len(lines))
+        line = lines[k]
+        at = rng.randint(0, len(line))
+        lines[k] = line[:at] + rng.choice(INJECTIONS) + line[at:]
+    return "\n".join(lines)
+
+
+def fuzz_doc(rng: random.Random) -> str:
+    return "".join(rng.choice(FUZZ_ATOMS) for _ in range(rng.randint(1, 40)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CommonMark flanking チェックの差分テストとベンチマーク")
+    parser.add_argument("--fuzz", type=int, default=5000, help="ランダム文書の数（デフォルト: 5000）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数（最短を表示）")
+    args = parser.parse_args()
+    if commonmark is None:
+        print("python-commonmark が未インストール（pip install commonmark）", file=sys.stderr)
+        sys.exit(2)
+    rng = random.Random(args.seed)
+    cm_parser = commonmark.Parser()
+    renderer = commonmark.HtmlRenderer()
+
+    bodies = [a.body for a in load_corpus(articles_dir=ARTICLES_DIR).values()]
+    inputs = {
+        "corpus": bodies,
+        "perturbed": [perturb(body, rng) for body in bodies],
+        "fuzz": [fuzz_doc(rng) for _ in range(args.fuzz)],
+    }
+
+    def timed(fn, texts):
+        """(結果, 最短の所要時間)"""
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = [fn(text) for text in texts]
+            best = min(best, time.perf_counter() - start)
+        return result, best
+
+    mismatches = []
+    speedups = {}
+    for name, texts in inputs.items():
+        fast, fast_time = timed(lambda text: len(literal_bold(text)), texts)
+        slow, slow_time = timed(lambda text: naive_count(cm_parser, renderer, text), texts)
+        bad = [(name, text, f, s) for text, f, s in zip(texts, fast, slow) if f != s]
+        mismatches.extend(bad)
+        speedups[name] = slow_time / max(fast_time, 1e-9)
+        print(f"{name:>9}: {len(texts):5d}件  `**` {sum(slow):5d}個  不一致 {len(bad):3d}  "
+              f"現行 {fast_time:.3f}s  従来 {slow_time:.3f}s  ({speedups[name]:5.1f}x)")
+
+    reached = "達成" if speedups["corpus"] >= TARGET_SPEEDUP else "未達"
+    print(f"目標 {TARGET_SPEEDUP}x（corpus）: {reached}")
+
+    if mismatches:
+        print(f"✗ 件数が python-commonmark と一致しない文書: {len(mismatches)}", file=sys.stderr)
+        for name, text, f, s in mismatches[:5]:
+            print(f"  [{name}] 現行 {f} / 従来 {s}: {text[:200]!r}", file=sys.stderr)
+        sys.exit(1)
+    print("✓ 件数は python-commonmark と一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+check_similar_titles のベンチマーク（合成タイトルコーパス）
+
+実記事に近い日本語タイトルを乱数で生成し（一部は語の入れ替え・追加で類似タイトルにする）、
+  - 候補生成あり（現行の check_similar_titles）
+  - 全ペア比較（従来実装）
+の実行時間を比べ、出力が一致することを確認する。
+全ペア比較は O(n²) なので --naive-max 件までに限定する。
+
+使い方:
+  python3 scripts/bench-similar-titles.py                # 10,000件（全ペア比較は 1,000件で照合）
+  python3 scripts/bench-similar-titles.py --n 5000 --naive-max 5000
+"""
+import argparse
+import random
+import sys
+import time
+
+from audit_articles import SIMILAR_TITLE_THRESHOLD, check_similar_titles, title_similarity
+
+TECHS = [
+    "Claude Code", "TypeScript", "Next.js", "React", "Terraform", "GCP", "AWS Lambda",
+    "Docker", "Kubernetes", "Python", "Rust", "Go", "BigQuery", "Cloud Run", "Vercel",
+    "GitHub Actions", "Zod", "Prisma", "Tailscale", "MCP", "LangChain", "Gemini API",
+]
+TOPICS = [
+    "入門", "ベストプラクティス", "設計パターン", "アンチパターン", "コスト最適化", "自動化",
+    "パフォーマンス改善", "運用ノウハウ", "移行ガイド", "トラブルシューティング", "完全ガイド",
+    "実践レシピ", "監視設計", "セキュリティ対策", "テスト戦略",
+]
+VERBS = ["で作る", "で始める", "を使った", "による", "で実現する", "で学ぶ", "と組み合わせる"]
+OBJECTS = [
+    "個人開発", "社内ツール", "AIエージェント", "CI/CD", "マルチテナントSaaS", "データ基盤",
+    "ブログ基盤", "API サーバー", "バッチ処理", "開発環境",
+]
+SUFFIXES = ["", "【2026年版】", "— 実例付き", "（前編）", "（後編）", "のすすめ", "まとめ"]
+KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモラリルレロワン"
+# 常用漢字程度の字種数（実タイトルは数千字種に散らばる）
+KANJI = [chr(c) for c in range(0x4E00, 0x4E00 + 2000)]
+
+
+def make_word(rng: random.Random) -> str:
+    """固有名詞・造語の代わりにランダムなカタカナ語 or 漢字熟語を作る"""
+    if rng.random() < 0.5:
+        return "".join(rng.choice(KANA) for _ in range(rng.randint(3, 6)))
+    return "".join(rng.choice(KANJI) for _ in range(rng.randint(2, 4)))
+
+
+def make_title(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(TECHS)}{rng.choice(VERBS)}{make_word(rng)}{rng.choice(OBJECTS)}の"
+        f"{make_word(rng)}{rng.choice(TOPICS)}{rng.choice(SUFFIXES)}"
+    )
+
+
+def mutate(rng: random.Random, title: str) -> str:
+    """1〜2文字の置換・挿入・削除で類似タイトルを作る"""
+    chars = list(title)
+    for _ in range(rng.randint(1, 2)):
+        op = rng.choice("sid")
+        pos = rng.randrange(len(chars))
+        if op == "s":
+            chars[pos] = rng.choice("のをにでとがアイウ")
+        elif op == "i":
+            chars.insert(pos, rng.choice("新版的な"))
+        elif len(chars) > 1:
+            del chars[pos]
+    return "".join(chars)
+
+
+def synthetic_articles(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    titles: list[str] = []
+    for _ in range(n):
+        r = rng.random()
+        if titles and r < 0.05:
+            titles.append(rng.choice(titles))  # 完全一致
+        elif titles and r < 0.15:
+            titles.append(mutate(rng, rng.choice(titles)))  # 類似
+        else:
+            titles.append(make_title(rng))
+    return [
+        {"filename": f"bench-{i:05d}.md", "fm": {"title": t, "published": True}}
+        for i, t in enumerate(titles)
+    ]
+
+
+def naive_similar_titles(articles: list[dict]) -> list[tuple[str, str, str]]:
+    """従来実装（全ペア比較）の判定結果を (filename, filename, category) で返す"""
+    hits = []
+    for i, a in enumerate(articles):
+        t1 = a["fm"]["title"]
+        for b in articles[i + 1:]:
+            t2 = b["fm"]["title"]
+            if t1 == t2:
+                hits.append((a["filename"], b["filename"], "重複記事"))
+            elif title_similarity(t1, t2) >= SIMILAR_TITLE_THRESHOLD:
+                hits.append((a["filename"], b["filename"], "類似タイトル"))
+    return hits
+
+
+def issue_keys(issues: list[dict]) -> list[tuple[str, str, str]]:
+    keys = []
+    for issue in issues:
+        names = [line.split()[0] for line in issue["message"].split("\n")[1:3]]
+        keys.append((names[0], names[1], issue["category"]))
+    return keys
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check_similar_titles のベンチマーク")
+    parser.add_argument("--n", type=int, default=10_000, help="合成タイトル数（デフォルト: 10000）")
+    parser.add_argument("--naive-max", type=int, default=1_000, help="全ペア比較で照合する件数（デフォルト: 1000）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    articles = synthetic_articles(args.n, args.seed)
+    issues, elapsed = timed(check_similar_titles, articles)
+    print(f"候補生成あり: {args.n:>6}件  {elapsed:7.2f}s  検出 {len(issues)}件")
+
+    m = min(args.n, args.naive_max)
+    subset = articles[:m]
+    fast, fast_elapsed = timed(check_similar_titles, subset)
+    naive, naive_elapsed = timed(naive_similar_titles, subset)
+    print(f"候補生成あり: {m:>6}件  {fast_elapsed:7.2f}s  検出 {len(fast)}件")
+    print(f"全ペア比較:   {m:>6}件  {naive_elapsed:7.2f}s  検出 {len(naive)}件")
+    if m < args.n:
+        scale = (args.n / m) ** 2
+        print(f"  → 全ペア比較の {args.n}件換算: 約 {naive_elapsed * scale:.0f}s")
+
+    if issue_keys(fast) != naive:
+        print("✗ 出力が全ペア比較と一致しません", file=sys.stderr)
+        sys.exit(1)
+    print("✓ 出力は全ペア比較と一致")
+
+
+if __name__ == "__main__":
+    main()
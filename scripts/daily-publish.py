@@ -3,7 +3,7 @@
 daily-publish.py — 優先度キューから毎日N本ずつ published: false → true に変更する
 
 レートリミット対策:
-  - 過去24hのデプロイ数をgit logから取得し、残り枠のみ公開
+  - 過去24hのデプロイ数を git 履歴インデックス（zenn_history）から取得し、残り枠のみ公開
   - 過去に失敗（ロールバック）した記事は48hクールダウン
   - デフォルト公開数: 2本（安全マージン確保）
 
@@ -13,18 +13,19 @@ daily-publish.py — 優先度キューから毎日N本ずつ published: false 
   python3 scripts/daily-publish.py --count 3 # 3本公開
 """
 import argparse
-import json
 import os
 import re
-import subprocess
 import sys
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta, timezone
 from pathlib import Path
 
+from zenn_events import EventLog
+from zenn_frontmatter import patch_frontmatter, unquote
+from zenn_history import load_history
+
 REPO_ROOT = Path(__file__).parent.parent
 ARTICLES_DIR = REPO_ROOT / "articles"
 QUEUE_FILE = Path(__file__).parent / "publish-queue.txt"
-FAILURE_LOG = Path(__file__).parent / ".publish-failures.json"
 DAILY_LIMIT = 4  # Zenn公式上限5、安全マージン1
 COOLDOWN_HOURS = 48
 JST = timezone(timedelta(hours=9))
@@ -48,65 +49,26 @@ def is_draft(article_path: Path) -> bool:
 
 
 def publish_article(article_path: Path) -> bool:
-    """published: false → true に変更（1箇所のみ）"""
-    content = article_path.read_text(encoding="utf-8")
-    new_content, count = re.subn(
-        r"^(published:\s*)false(\s*)$",
-        r"\1true\2",
-        content,
-        count=1,
-        flags=re.MULTILINE,
-    )
-    if count == 0:
-        return False
-    article_path.write_text(new_content, encoding="utf-8")
-    return True
+    """front matter の published: false → true に変更"""
+    def edit(fm):
+        return {"published": "true"} if unquote(fm.get("published", "")) == "false" else {}
+
+    return bool(patch_frontmatter(article_path, edit))
 
 
 def count_recent_deploys() -> int:
-    """過去24hにdaily-publishで公開された記事数をgit logから取得（ロールバック除外）"""
+    """過去24hに公開（published: false → true）された記事数を git 履歴インデックスから取得.
+
+    コミットメッセージではなく frontmatter の変更で判定するため、手動公開も枠に含まれ、
+    ロールバックコミットは数えない。
+    """
     try:
-        # daily-publish/予約公開コミットのみカウント（ロールバックコミットを除外）
-        result = subprocess.run(
-            ["git", "log", "--since=24 hours ago",
-             "--grep=自動公開", "--grep=予約記事を自動公開",
-             "--name-only", "--pretty=format:", "--", "articles/*.md"],
-            capture_output=True, text=True, cwd=REPO_ROOT, timeout=10,
-        )
-        files = set(
-            line.strip() for line in result.stdout.splitlines() if line.strip()
-        )
-        return len(files)
+        return load_history().deploys_since(hours=24)
     except Exception as e:
-        print(f"  [WARN] git log 取得失敗（安全側で上限適用）: {e}", file=sys.stderr)
+        print(f"  [WARN] git 履歴の取得失敗（安全側で上限適用）: {e}", file=sys.stderr)
         return DAILY_LIMIT  # 取得失敗時は公開しない（安全側）
 
 
-def load_failures() -> dict:
-    """失敗ログを読み込み"""
-    if not FAILURE_LOG.exists():
-        return {}
-    try:
-        with open(FAILURE_LOG, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def is_in_cooldown(slug: str, failures: dict) -> bool:
-    """記事が失敗クールダウン中か判定"""
-    if slug not in failures:
-        return False
-    try:
-        last_failed = datetime.fromisoformat(failures[slug]["last_failed"])
-        # タイムゾーン情報がない場合はJSTと仮定
-        if last_failed.tzinfo is None:
-            last_failed = last_failed.replace(tzinfo=JST)
-        return datetime.now(JST) - last_failed < timedelta(hours=COOLDOWN_HOURS)
-    except (KeyError, ValueError):
-        return False
-
-
 def main():
     parser = argparse.ArgumentParser(description="Zenn 下書き記事を自動公開")
     parser.add_argument("--dry-run", action="store_true", help="変更せずに確認のみ")
@@ -125,8 +87,8 @@ def main():
         print("レートリミットに到達済み。本日の公開をスキップします。")
         sys.exit(0)
 
-    # 失敗ログ読み込み
-    failures = load_failures()
+    # 失敗記録（イベントログのビュー）
+    state = EventLog().state()
 
     queue = load_queue()
     to_publish = []
@@ -138,7 +100,7 @@ def main():
             continue
         if not is_draft(article_path):
             continue
-        if is_in_cooldown(slug, failures):
+        if state.in_cooldown(slug, COOLDOWN_HOURS):
             skipped_cooldown.append(slug)
             continue
         to_publish.append((slug, article_path))
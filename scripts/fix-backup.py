@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""修正スクリプト（fix-text / fix-bold / fix-emdash / fix-single-emdash）のバックアップ管理.
+
+使い方:
+  python3 scripts/fix-backup.py list                         # run の一覧と使用量
+  python3 scripts/fix-backup.py restore --run <id>           # run の実行前の内容に戻す
+  python3 scripts/fix-backup.py restore --run <id> articles/x.md --dry-run
+  python3 scripts/fix-backup.py gc --keep 20                 # 新しい20件を残して削除
+  python3 scripts/fix-backup.py gc --days 30                 # 30日より古い run を削除
+"""
+import argparse
+import sys
+
+from zenn_backup import gc, list_runs, restore_run, store_size
+
+
+def cmd_list(args):
+    runs = list_runs()
+    for run in runs:
+        print(f"{run['id']}  {run.get('created_at', '')}  {len(run['files']):4d} files  {run.get('label', '')}")
+    count, size = store_size()
+    print(f"runs: {len(runs)}  objects: {count}  {size / 1024:.1f} KiB")
+
+
+def cmd_restore(args):
+    try:
+        restored, undo = restore_run(args.run, args.files or None, dry_run=args.dry_run)
+    except FileNotFoundError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    verb = "戻す対象" if args.dry_run else "復元"
+    print(f"{verb}: {len(restored)}ファイル")
+    for rel in restored:
+        print(f"  {rel}")
+    if undo:
+        print(f"復元前の内容: {undo}（restore --run {undo.stem} で元に戻せます）")
+
+
+def cmd_gc(args):
+    if args.keep is None and args.days is None:
+        print("--keep か --days を指定してください", file=sys.stderr)
+        sys.exit(2)
+    dropped, removed, freed = gc(args.keep, args.days, dry_run=args.dry_run)
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}削除した run: {len(dropped)}  オブジェクト: {removed}  解放: {freed / 1024:.1f} KiB")
+    for run_id in dropped:
+        print(f"  {run_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="修正スクリプトのバックアップ管理")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="run の一覧").set_defaults(func=cmd_list)
+
+    p = sub.add_parser("restore", help="run の実行前の内容に戻す")
+    p.add_argument("--run", required=True, help="run ID（list で確認）")
+    p.add_argument("--dry-run", action="store_true", help="戻すファイルを表示するだけ")
+    p.add_argument("files", nargs="*", help="一部のファイルだけ戻す")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("gc", help="古い run と参照されないオブジェクトを削除")
+    p.add_argument("--keep", type=int, help="新しい順に残す run の数")
+    p.add_argument("--days", type=float, help="これより古い run を削除（日数）")
+    p.add_argument("--dry-run", action="store_true", help="削除対象を表示するだけ")
+    p.set_defaults(func=cmd_gc)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
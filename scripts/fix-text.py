@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""bold / emダッシュ / 単独 em-dash の修正を1パスでまとめて適用する。
+
+記事ごとに1回だけ読み込み・トークン化し、全ルールの編集をまとめて1回で書き込む。
+書き換え前の内容は .fix-backup/ に1回の実行としてまとめて保存される。
+
+使い方:
+  python3 scripts/fix-text.py                          # 全ルール
+  python3 scripts/fix-text.py --rules bold,emdash      # 一部のルールだけ
+  python3 scripts/fix-text.py --dry-run articles/x.md  # 書き込まずに件数だけ表示
+"""
+from zenn_rewrite import main
+
+if __name__ == "__main__":
+    main(title="Text fix", limit=30)
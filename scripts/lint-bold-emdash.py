@@ -9,31 +9,85 @@
 5. mojibake（U+FFFD）、emダッシュ「—」「——」（日本語文中）
 6. コードフェンス未閉じ
 7. 末尾 ``` の前後に空行が無く崩れているケース
+
+使い方:
+  python3 scripts/lint-bold-emdash.py                          # テキストのレポート
+  python3 scripts/lint-bold-emdash.py --jobs 4 --format jsonl  # 1件1行の JSON をファイルごとに逐次出力
+  python3 scripts/lint-bold-emdash.py --format sarif > lint.sarif
+  python3 scripts/lint-bold-emdash.py articles/a.md articles/b.md
+  python3 scripts/lint-bold-emdash.py --watch                  # 保存された記事だけを再監査し続ける
+
+jsonl / sarif の各レコードは file（リポジトリ相対パス）・line・column（1 始まり）・
+rule・severity（error / warning / note）・message を持つ。
+--jobs N では記事をプロセスプールで並列に監査し、終わったファイルから出力する。
 """
-import os, re, sys, glob, json
+import os, re, sys, glob, json, time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-ART_DIR = os.path.expanduser("~/dev/projects/self/public-zenn-docs/articles")
+from zenn_corpus import ARTICLES_DIR, REPO_ROOT, Article, load_article
+from zenn_markdown import CODE, FENCE, FRONTMATTER, HEADING, tokenize, unclosed_fence
+from zenn_watch import ArticleWatcher
+
+ART_DIR = str(ARTICLES_DIR)
+CACHE_KEY = "lint-bold-emdash/3"  # audit() のロジックや issue の形式を変えたら上げる
 
 REQUIRED_KEYS = {"title", "emoji", "type", "topics", "published"}
 
-def strip_inline_code(line: str) -> str:
-    # remove `...` segments
-    return re.sub(r"`[^`]*`", "", line)
+# ルール ID → (severity, 説明)。severity は SARIF の level と同じ語彙
+RULES = {
+    "MOJIBAKE": ("error", "U+FFFD（文字化け）を含む"),
+    "EMDASH": ("warning", "emダッシュ「——」を使っている"),
+    "FRONTMATTER_MISSING": ("error", "先頭に front matter の --- が無い"),
+    "FRONTMATTER_UNCLOSED": ("error", "front matter が閉じていない"),
+    "FRONTMATTER_KEYS": ("error", "front matter の必須キーが欠けている"),
+    "FRONTMATTER_TYPE": ("error", "front matter の type が tech / idea 以外"),
+    "HEADING_BOLD": ("warning", "見出し行に ** がある"),
+    "LEADING_BOLD": ("warning", "行頭の ** の直後が空白（強調が崩れている可能性）"),
+    "ODD_BOLD": ("error", "行内の ** の個数が奇数"),
+    "EMPTY_BOLD": ("warning", "中身の無い ** ** の組がある"),
+    "UNCLOSED_FENCE": ("error", "コードフェンスが閉じていない"),
+    "READ_ERROR": ("error", "記事を読み込めない"),
+}
+# 行単位のルール（テキスト出力で "L{line} " を前に付ける）
+LINE_RULES = {"HEADING_BOLD", "LEADING_BOLD", "ODD_BOLD", "EMPTY_BOLD"}
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
 
-def audit(path: str):
-    issues = []
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-    except Exception as e:
-        return [f"READ_ERROR: {e}"]
 
-    lines = text.splitlines()
+def issue(rule: str, message: str, line: int = 1, column: int = 1) -> dict:
+    return {"rule": rule, "severity": RULES[rule][0], "line": line, "column": column, "message": message}
+
+
+def format_issue(x: dict) -> str:
+    """テキストレポート用の1行（従来の出力と同じ形式）."""
+    if x["rule"] in LINE_RULES:
+        return f"L{x['line']} {x['message']}"
+    return x["message"]
+
+
+def raw_column(line, idx: int) -> int:
+    """without_code() 上の位置 idx を行内の列（1 始まり）に戻す."""
+    for span in line.spans:
+        if span.kind == CODE:
+            continue
+        if idx < span.end - span.start:
+            return span.start + idx + 1
+        idx -= span.end - span.start
+    return len(line.text) + 1
+
+
+def audit(article: Article):
+    """記事の issue（issue() の dict）のリストを返す."""
+    issues = []
+    text = article.text
+    lines = article.lines
 
     # mojibake
     if "�" in text:
         positions = [i+1 for i, l in enumerate(lines) if "�" in l]
-        issues.append(f"MOJIBAKE U+FFFD lines={positions[:10]}")
+        first = lines[positions[0] - 1]
+        issues.append(issue("MOJIBAKE", f"MOJIBAKE U+FFFD lines={positions[:10]}",
+                            positions[0], first.index("�") + 1))
 
     # emダッシュ（日本語文中の "——" / "—" 単体使用）
     em_lines = []
@@ -41,15 +95,17 @@ def audit(path: str):
         if "——" in l:
             em_lines.append(i)
     if em_lines:
-        issues.append(f"EMDASH '——' lines={em_lines[:20]}")
+        first = lines[em_lines[0] - 1]
+        issues.append(issue("EMDASH", f"EMDASH '——' lines={em_lines[:20]}",
+                            em_lines[0], first.index("——") + 1))
 
     # frontmatter 解析
     if not text.startswith("---\n"):
-        issues.append("FRONTMATTER missing leading ---")
+        issues.append(issue("FRONTMATTER_MISSING", "FRONTMATTER missing leading ---"))
     else:
         end = text.find("\n---\n", 4)
         if end == -1:
-            issues.append("FRONTMATTER not closed")
+            issues.append(issue("FRONTMATTER_UNCLOSED", "FRONTMATTER not closed"))
         else:
             fm = text[4:end]
             keys = set()
@@ -59,79 +115,235 @@ def audit(path: str):
                     keys.add(m.group(1))
             missing = REQUIRED_KEYS - keys
             if missing:
-                issues.append(f"FRONTMATTER missing keys: {sorted(missing)}")
+                issues.append(issue("FRONTMATTER_KEYS", f"FRONTMATTER missing keys: {sorted(missing)}"))
             # type validation
             mt = re.search(r'^type\s*:\s*"?(\w+)"?', fm, re.M)
             if mt and mt.group(1) not in ("tech", "idea"):
-                issues.append(f"FRONTMATTER type invalid: {mt.group(1)}")
-
-    # コードブロック処理
-    in_fence = False
-    fence_char = None
-    fence_open_line = 0
-    for i, raw in enumerate(lines, 1):
-        s = raw.lstrip()
-        # detect fence start/end. Allow ``` and ~~~
-        m = re.match(r"^(```+|~~~+)(.*)$", s)
-        if m:
-            mark = m.group(1)
-            if not in_fence:
-                in_fence = True
-                fence_char = mark[0] * 3  # treat as prefix
-                fence_open_line = i
-            else:
-                # closing fence (loose match)
-                if mark[0] * 3 == fence_char:
-                    in_fence = False
-                    fence_char = None
-            continue
-        if in_fence:
+                issues.append(issue("FRONTMATTER_TYPE", f"FRONTMATTER type invalid: {mt.group(1)}",
+                                    fm.count("\n", 0, mt.start()) + 2, mt.start(1) - mt.start() + 1))
+
+    # 本文（front matter・コードブロック・インラインコード除外）
+    tokens = list(tokenize(lines))
+    for line in tokens:
+        if line.block in (FRONTMATTER, FENCE):
             continue
+        i = line.no + 1
+        raw = line.text
 
         # heading に ** 混入
-        if raw.startswith("#"):
+        if line.block == HEADING:
             if "**" in raw:
-                issues.append(f"L{i} HEADING contains **: {raw.strip()[:120]}")
+                issues.append(issue("HEADING_BOLD", f"HEADING contains **: {raw.strip()[:120]}",
+                                    i, raw.index("**") + 1))
 
-        cleaned = strip_inline_code(raw)
+        cleaned = line.without_code()
         # 行頭 "** " （箇条書き風崩れ）
         if re.match(r"^\*\*\s+\S", cleaned):
-            issues.append(f"L{i} LEADING '** ' (likely broken bold): {raw.strip()[:120]}")
+            issues.append(issue("LEADING_BOLD", f"LEADING '** ' (likely broken bold): {raw.strip()[:120]}",
+                                i, raw_column(line, 0)))
 
         # ** 個数が奇数
         cnt = cleaned.count("**")
         if cnt % 2 == 1:
-            issues.append(f"L{i} ODD ** count={cnt}: {raw.strip()[:120]}")
+            issues.append(issue("ODD_BOLD", f"ODD ** count={cnt}: {raw.strip()[:120]}",
+                                i, raw_column(line, cleaned.index("**"))))
 
         # 単独 ** (空 bold)
-        if re.search(r"\*\*\s*\*\*", cleaned):
-            issues.append(f"L{i} EMPTY ** pair: {raw.strip()[:120]}")
+        m = re.search(r"\*\*\s*\*\*", cleaned)
+        if m:
+            issues.append(issue("EMPTY_BOLD", f"EMPTY ** pair: {raw.strip()[:120]}",
+                                i, raw_column(line, m.start())))
 
-    if in_fence:
-        issues.append(f"CODE FENCE not closed (opened L{fence_open_line})")
+    fence_open = unclosed_fence(tokens)
+    if fence_open is not None:
+        opener = lines[fence_open]
+        issues.append(issue("UNCLOSED_FENCE", f"CODE FENCE not closed (opened L{fence_open + 1})",
+                            fence_open + 1, len(opener) - len(opener.lstrip()) + 1))
 
     return issues
 
 
-def main():
-    files = sorted(glob.glob(os.path.join(ART_DIR, "*.md")))
-    summary = {"total": len(files), "with_issues": 0, "issues_total": 0}
-    report = []
+def audit_path(fp: str) -> tuple[str, list[dict]]:
+    """1ファイルを監査する（--jobs のワーカープロセスで実行。キャッシュは親が保存する）."""
+    try:
+        return fp, audit(load_article(fp, cache=False))
+    except Exception as e:
+        return fp, [issue("READ_ERROR", f"READ_ERROR: {e}")]
+
+
+def run(files: list[str], jobs: int = 1):
+    """(ファイル, issue リスト) を監査が終わった順に返す.
+
+    キャッシュ済みの結果はその場で返し、残りだけをプロセスプールに渡す。
+    子プロセスの結果は親の Article に memo として保存する。
+    """
+    pending = {}
     for fp in files:
-        iss = audit(fp)
+        try:
+            article = load_article(fp)
+        except Exception as e:
+            yield fp, [issue("READ_ERROR", f"READ_ERROR: {e}")]
+            continue
+        if jobs > 1 and CACHE_KEY not in article.derived:
+            pending[fp] = article
+            continue
+        try:
+            yield fp, article.memo(CACHE_KEY, audit)
+        except Exception as e:
+            yield fp, [issue("READ_ERROR", f"READ_ERROR: {e}")]
+    if not pending:
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(audit_path, fp) for fp in pending]
+        for future in as_completed(futures):
+            fp, iss = future.result()
+            if not (iss and iss[0]["rule"] == "READ_ERROR"):
+                pending[fp].derived[CACHE_KEY] = iss
+            yield fp, iss
+
+
+def relpath(fp: str) -> str:
+    """リポジトリ相対のパス（リポジトリ外のファイルは絶対パス）."""
+    path = os.path.abspath(fp)
+    rel = os.path.relpath(path, REPO_ROOT) if path.startswith(str(REPO_ROOT) + os.sep) else path
+    return rel.replace(os.sep, "/")
+
+
+def sarif_result(fp: str, x: dict) -> dict:
+    return {
+        "ruleId": x["rule"],
+        "level": x["severity"],
+        "message": {"text": x["message"]},
+        "locations": [{
+            "physicalLocation": {
+                "artifactLocation": {"uri": relpath(fp), "uriBaseId": "%SRCROOT%"},
+                "region": {"startLine": x["line"], "startColumn": x["column"]},
+            },
+        }],
+    }
+
+
+def print_text(results):
+    """従来のテキストレポート（全ファイルを待ってファイル名順に出力）."""
+    results = sorted(results)
+    summary = {"total": len(results), "with_issues": 0, "issues_total": 0}
+    report = []
+    for fp, iss in results:
         if iss:
             summary["with_issues"] += 1
             summary["issues_total"] += len(iss)
-            report.append((os.path.basename(fp), iss))
+            report.append((os.path.basename(fp), [format_issue(x) for x in iss]))
 
     print(f"# Audit summary: {summary}")
     print(f"# Files with issues: {summary['with_issues']} / {summary['total']}")
     for name, iss in report:
-        print(f"\n## {name}  ({len(iss)} issues)")
-        for x in iss[:30]:
-            print(f"  - {x}")
-        if len(iss) > 30:
-            print(f"  ... +{len(iss)-30} more")
+        print_file(name, iss)
+
+
+def print_file(name: str, iss: list[str]):
+    print(f"\n## {name}  ({len(iss)} issues)")
+    for x in iss[:30]:
+        print(f"  - {x}")
+    if len(iss) > 30:
+        print(f"  ... +{len(iss)-30} more")
+
+
+def print_jsonl(results):
+    for fp, iss in results:
+        file = relpath(fp)
+        for x in iss:
+            print(json.dumps({"file": file, **x}, ensure_ascii=False))
+        sys.stdout.flush()
+
+
+def print_sarif(results):
+    """SARIF 2.1.0。results 配列の要素をファイルごとに逐次書き出す."""
+    driver = {
+        "name": "lint-bold-emdash",
+        "rules": [
+            {"id": rule, "shortDescription": {"text": desc}, "defaultConfiguration": {"level": level}}
+            for rule, (level, desc) in RULES.items()
+        ],
+    }
+    head = {"version": "2.1.0", "$schema": SARIF_SCHEMA, "runs": [{"tool": {"driver": driver}, "results": []}]}
+    prefix, suffix = json.dumps(head, ensure_ascii=False).rsplit("[]", 1)
+    sys.stdout.write(prefix + "[")
+    sep = "\n"
+    for fp, iss in results:
+        for x in iss:
+            sys.stdout.write(sep + json.dumps(sarif_result(fp, x), ensure_ascii=False))
+            sep = ",\n"
+        sys.stdout.flush()
+    sys.stdout.write("\n]" + suffix + "\n")
+
+
+def watch(files: list[str], fmt: str, polling: bool):
+    """初回に全体を監査し、以後は保存された記事だけを再監査して結果を出す.
+
+    files を指定した場合はそのファイルだけを対象にする（未指定なら追加された記事も対象）。
+    """
+    targets = {os.path.abspath(fp) for fp in files}
+    watcher = ArticleWatcher(ART_DIR, polling=polling)
+    results = dict(run(sorted(targets) if targets else sorted(glob.glob(os.path.join(ART_DIR, "*.md")))))
+    if fmt == "jsonl":
+        print_jsonl(results.items())
+    else:
+        print_text(results.items())
+    print(f"# watching {ART_DIR} ({watcher.backend}) ... Ctrl-C で終了", file=sys.stderr, flush=True)
+    for paths in watcher:
+        start = time.perf_counter()
+        changed = []
+        for path in sorted(paths):
+            fp = str(path)
+            if targets and fp not in targets:
+                continue
+            if path.exists():
+                results.update(run([fp]))
+            else:
+                results.pop(fp, None)
+            changed.append(fp)
+        if not changed:
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        if fmt == "jsonl":
+            print_jsonl((fp, results[fp]) for fp in changed if fp in results)
+            continue
+        for fp in changed:
+            name = os.path.basename(fp)
+            if fp not in results:
+                print(f"\n## {name}  (removed)")
+            elif results[fp]:
+                print_file(name, [format_issue(x) for x in results[fp]])
+            else:
+                print(f"\n## {name}  ✓ no issues")
+        with_issues = sum(1 for iss in results.values() if iss)
+        print(f"# Files with issues: {with_issues} / {len(results)}  ({elapsed:.0f}ms)", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zenn 記事の ** / emダッシュ / front matter の監査")
+    parser.add_argument("files", nargs="*", help="対象の記事（デフォルト: articles/*.md）")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="並列プロセス数（デフォルト: 1。キャッシュ済みの記事は親プロセスで返す）")
+    parser.add_argument("--format", choices=["text", "jsonl", "sarif"], default="text",
+                        help="出力形式（jsonl / sarif はファイルごとに逐次出力）")
+    parser.add_argument("--watch", action="store_true",
+                        help="articles/ を監視し、保存された記事だけを再監査し続ける（text / jsonl）")
+    parser.add_argument("--poll", action="store_true", help="--watch で inotify を使わず mtime を定期的に比べる")
+    args = parser.parse_args()
+
+    if args.watch:
+        if args.format == "sarif":
+            parser.error("--watch は --format sarif と併用できません")
+        try:
+            watch(args.files, args.format, args.poll)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    files = args.files or sorted(glob.glob(os.path.join(ART_DIR, "*.md")))
+    results = run(files, jobs=max(1, args.jobs))
+    {"text": print_text, "jsonl": print_jsonl, "sarif": print_sarif}[args.format](results)
 
 if __name__ == "__main__":
     main()
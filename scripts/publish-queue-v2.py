@@ -13,7 +13,7 @@ status: publish-ready を優先し、次に draft 記事を1日1本、ランダ
   - 公開時刻: 日付ベースのハッシュで 8:00-21:00 JST に決定
   - 休日制御: 土日は 50% の確率でスキップ
   - 連続制御: 3日連続公開したら1日休む
-  - レートリミット: 過去24hの公開数をチェック（上限4本/日）
+  - レートリミット: 過去24hの公開数を git 履歴インデックスでチェック（上限4本/日）
 
 使い方:
   python3 scripts/publish-queue-v2.py              # 通常実行（時刻チェックあり）
@@ -23,19 +23,21 @@ status: publish-ready を優先し、次に draft 記事を1日1本、ランダ
 """
 import argparse
 import hashlib
-import json
 import os
-import re
 import subprocess
 import sys
 import urllib.request
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from zenn_corpus import Article, load_corpus
+from zenn_events import EventLog, PublishState
+from zenn_history import load_history
+from zenn_slugcheck import SlugCollisionChecker
+from zenn_state import PUBLISH, REVERT, StateTransaction, TransitionError
+
 REPO_ROOT = Path(__file__).parent.parent
 ARTICLES_DIR = REPO_ROOT / "articles"
-FAILURE_LOG = Path(__file__).parent / ".publish-failures.json"
-PUBLISH_HISTORY = Path(__file__).parent / ".publish-history.json"
 DAILY_LIMIT = 4  # Zenn公式上限5、安全マージン1
 ZENN_PUBLICATION = "correlate_dev"
 COOLDOWN_HOURS = 48
@@ -80,57 +82,23 @@ def should_skip_weekend(today: datetime) -> bool:
     return h % 2 == 0
 
 
-def load_publish_history() -> dict:
-    """公開履歴を読み込み"""
-    if not PUBLISH_HISTORY.exists():
-        return {"dates": []}
-    try:
-        with open(PUBLISH_HISTORY, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"dates": []}
+def should_skip_consecutive(state: PublishState, today: datetime) -> bool:
+    """3日連続公開したら1日休む"""
+    return all(
+        state.published_on((today - timedelta(days=i)).strftime("%Y-%m-%d"))
+        for i in range(1, MAX_CONSECUTIVE_DAYS + 1)
+    )
 
 
-def save_publish_history(history: dict) -> None:
-    """公開履歴を保存"""
-    # 直近30日分のみ保持
-    cutoff = (datetime.now(JST) - timedelta(days=30)).strftime("%Y-%m-%d")
-    history["dates"] = [d for d in history["dates"] if d >= cutoff]
-    with open(PUBLISH_HISTORY, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+def record_failure(slug: str) -> None:
+    """失敗をイベントログに記録（クールダウン保護を有効化）"""
+    try:
+        EventLog().append(EventLog.event("failed", slug))
+    except Exception:
+        pass
 
 
-def should_skip_consecutive(history: dict, today: datetime) -> bool:
-    """3日連続公開したら1日休む"""
-    today_str = today.strftime("%Y-%m-%d")
-    recent = []
-    for i in range(1, MAX_CONSECUTIVE_DAYS + 1):
-        d = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-        recent.append(d in history.get("dates", []))
-    return all(recent)
-
-
-def parse_frontmatter(filepath: Path) -> dict:
-    """front matter をパースして dict を返す"""
-    lines = filepath.read_text(encoding="utf-8").splitlines()
-    if not lines or lines[0].strip() != "---":
-        return {}
-    end_idx = None
-    for i, line in enumerate(lines[1:], 1):
-        if line.strip() == "---":
-            end_idx = i
-            break
-    if end_idx is None:
-        return {}
-    fm = {}
-    for line in lines[1:end_idx]:
-        m = re.match(r'^(\w[\w_]*)\s*:\s*(.*)$', line)
-        if m:
-            fm[m.group(1)] = m.group(2).strip().strip('"').strip("'")
-    return fm
-
-
-def has_draft_markers(filepath: Path) -> str | None:
+def has_draft_markers(article: Article) -> str | None:
     """記事本文に未完成マーカーが含まれていないかチェック.
 
     完全一致マーカー（ドラフト終端等）は本文中のどこにあっても検出。
@@ -138,11 +106,10 @@ def has_draft_markers(filepath: Path) -> str | None:
     コードブロック内のサンプルコメントによる False Positive を軽減する。
     見つかった場合はマーカー文字列を返し、なければ None。
     """
-    content = filepath.read_text(encoding="utf-8")
     for marker in DRAFT_MARKERS_EXACT:
-        if marker in content:
+        if marker in article.text:
             return marker
-    for line in content.splitlines():
+    for line in article.lines:
         stripped = line.strip()
         for marker in DRAFT_MARKERS_LINE_START:
             if stripped.startswith(marker):
@@ -158,69 +125,45 @@ def find_publishable_articles() -> list[tuple[str, Path]]:
     """
     ready = []
     drafts = []
-    for article in sorted(ARTICLES_DIR.glob("*.md")):
-        fm = parse_frontmatter(article)
+    for slug, article in load_corpus(articles_dir=ARTICLES_DIR).items():
+        fm = article.fm
         if fm.get("published") != "false":
             continue
         # 未完成マーカーチェック
-        marker = has_draft_markers(article)
+        marker = article.memo("draft-marker/1", has_draft_markers)
         if marker:
-            print(f"  スキップ（未完成）: {article.stem} — 「{marker}」を検出")
+            print(f"  スキップ（未完成）: {slug} — 「{marker}」を検出")
             continue
         status = fm.get("status", "draft")
         if status == "publish-ready":
-            ready.append((article.stem, article))
+            ready.append((slug, article.path))
         elif status == "draft":
-            drafts.append((article.stem, article))
+            drafts.append((slug, article.path))
     return ready + drafts
 
 
-def publish_article(article_path: Path) -> bool:
-    """published: false → true, status: publish-ready → published に変更.
+def publish_article(slug: str, today_str: str) -> bool:
+    """published: false → true, status: publish-ready / draft → published に変更し、公開イベントを追記する.
 
-    frontmatter の範囲内のみを操作し、本文中の同名フィールドを誤置換しない。
+    zenn_state の PUBLISH 遷移で書き込むので、検証（published: false であること）・
+    front matter の範囲だけの置換・イベント追記に失敗した時の巻き戻しを REVERT と共有する。
     """
-    content = article_path.read_text(encoding="utf-8")
-    lines = content.split("\n")
-
-    if not lines or lines[0].strip() != "---":
-        return False
-
-    fm_end = None
-    for i, line in enumerate(lines[1:], 1):
-        if line.strip() == "---":
-            fm_end = i
-            break
-    if fm_end is None:
-        return False
-
-    published_changed = False
-    status_changed = False
-    for i in range(1, fm_end):
-        # published: false → true
-        if re.match(r"^published:\s*false\s*$", lines[i]):
-            lines[i] = re.sub(r"^(published:\s*)false", r"\1true", lines[i])
-            published_changed = True
-        # status: "publish-ready" or "draft" → "published"
-        if re.match(r'^status:\s*"?(publish-ready|draft)"?\s*$', lines[i]):
-            lines[i] = re.sub(
-                r'^(status:\s*)"?(publish-ready|draft)"?',
-                r'\1"published"',
-                lines[i],
-            )
-            status_changed = True
-
-    if not published_changed:
+    txn = StateTransaction()
+    txn.add(slug, PUBLISH)
+    txn.record("published", slug, date=today_str)
+    try:
+        changes = txn.commit()[slug]
+    except TransitionError as e:
+        for error in e.errors:
+            print(f"  ✗ {error}", file=sys.stderr)
         return False
 
-    if not status_changed:
+    if "status" not in changes:
         print(
-            f"  [WARN] {article_path.name}: published を変更しましたが "
+            f"  [WARN] {slug}.md: published を変更しましたが "
             f"status: publish-ready が見つかりません",
             file=sys.stderr,
         )
-
-    article_path.write_text("\n".join(lines), encoding="utf-8")
     return True
 
 
@@ -246,105 +189,50 @@ def check_slug_collision_global(slug: str) -> bool:
 
     True = 衝突あり（デプロイ時に全記事ブロックされる）
     False = 安全（未使用 or 判定不能）
+
+    公開直前の確認なのでキャッシュは読まずに必ず問い合わせる。
     """
-    url = f"https://zenn.dev/api/articles/{slug}"
-    try:
-        req = urllib.request.Request(url, method="HEAD")
-        req.add_header("User-Agent", "publish-queue-v2/1.0")
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            return resp.status == 200
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            return False  # 未使用 = 安全
-        return False  # 判定不能 → 安全側（既存動作を維持）
-    except Exception:
-        return False  # ネットワークエラー → 安全側
+    checker = SlugCollisionChecker(user_agent="publish-queue-v2/1.0")
+    collided = bool(checker.collisions([slug], fresh=True))
+    checker.save()
+    return collided
 
 
 def find_undeployed_articles() -> list[tuple[str, Path]]:
     """published: true だがZennに未デプロイの記事を検出.
 
-    publish-history に記録があり（スクリプトが公開処理済み）、
+    イベントログに公開記録があり（スクリプトが公開処理済み）、
     かつ Zenn で 200 が返らない記事を「未デプロイ」と判定する。
     """
-    history = load_publish_history()
-    published_dates = set(history.get("dates", []))
-    if not published_dates:
+    if not EventLog().state().published_dates:
         return []
 
     undeployed = []
-    for article in sorted(ARTICLES_DIR.glob("*.md")):
-        fm = parse_frontmatter(article)
+    for slug, article in load_corpus(articles_dir=ARTICLES_DIR).items():
+        fm = article.fm
         if fm.get("published") != "true":
             continue
         if fm.get("status") != "published":
             continue
-        slug = article.stem
         status = check_zenn_status(slug)
         if status != 200:
             print(f"  未デプロイ検出: {slug} (HTTP {status})")
-            undeployed.append((slug, article))
+            undeployed.append((slug, article.path))
     return undeployed
 
 
-def revert_article(article_path: Path) -> bool:
-    """published: true → false, status: published → draft に戻す"""
-    content = article_path.read_text(encoding="utf-8")
-    lines = content.split("\n")
-    if not lines or lines[0].strip() != "---":
-        return False
-    fm_end = None
-    for i, line in enumerate(lines[1:], 1):
-        if line.strip() == "---":
-            fm_end = i
-            break
-    if fm_end is None:
-        return False
-    changed = False
-    for i in range(1, fm_end):
-        if re.match(r"^published:\s*true\s*$", lines[i]):
-            lines[i] = re.sub(r"^(published:\s*)true", r"\1false", lines[i])
-            changed = True
-        if re.match(r'^status:\s*"?published"?\s*$', lines[i]):
-            lines[i] = re.sub(r'^(status:\s*)"?published"?', r'\1"draft"', lines[i])
-    if changed:
-        article_path.write_text("\n".join(lines), encoding="utf-8")
-    return changed
-
-
 def count_recent_deploys() -> int:
-    """当日に公開された記事数を .publish-history.json から取得.
+    """過去24hに公開された記事数を git 履歴インデックスから取得.
 
-    git log のコミットメッセージに依存せず、履歴ファイルを単一ソースとする。
-    日付単位で判定し、「今日既に公開したか」を確認する。
+    daily-publish / 予約公開 / 手動公開のどれで公開されたかに関係なく、
+    frontmatter の published: false → true の変更を数える。
+    取得に失敗した場合は安全側で上限扱いにする。
     """
-    history = load_publish_history()
-    today_str = datetime.now(JST).strftime("%Y-%m-%d")
-    return history.get("dates", []).count(today_str)
-
-
-def load_failures() -> dict:
-    """失敗ログを読み込み"""
-    if not FAILURE_LOG.exists():
-        return {}
     try:
-        with open(FAILURE_LOG, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def is_in_cooldown(slug: str, failures: dict) -> bool:
-    """記事が失敗クールダウン中か判定"""
-    if slug not in failures:
-        return False
-    try:
-        last_failed = datetime.fromisoformat(failures[slug]["last_failed"])
-        if last_failed.tzinfo is None:
-            last_failed = last_failed.replace(tzinfo=JST)
-        return datetime.now(JST) - last_failed < timedelta(hours=COOLDOWN_HOURS)
-    except (KeyError, ValueError):
-        return False
+        return load_history().deploys_since(hours=24)
+    except Exception as e:
+        print(f"  [WARN] git 履歴の取得失敗（安全側で上限適用）: {e}", file=sys.stderr)
+        return DAILY_LIMIT
 
 
 def main():
@@ -376,8 +264,8 @@ def main():
             sys.exit(0)
 
         # 連続公開チェック
-        history = load_publish_history()
-        if should_skip_consecutive(history, now):
+        state = EventLog().state(now)
+        if should_skip_consecutive(state, now):
             print(f"{MAX_CONSECUTIVE_DAYS}日連続公開済み — 本日は休止")
             sys.exit(0)
 
@@ -388,7 +276,7 @@ def main():
             sys.exit(0)
 
         # 既に今日公開済みかチェック
-        if today_str in history.get("dates", []):
+        if state.published_on(today_str):
             print("本日は既に公開済み — スキップ")
             sys.exit(0)
 
@@ -399,14 +287,23 @@ def main():
     undeployed = find_undeployed_articles()
     if undeployed:
         print(f"\n⚠ 未デプロイ記事 {len(undeployed)} 件を検出 — published: false に戻します")
-        for slug, path in undeployed:
-            if args.dry_run:
+        if args.dry_run:
+            for slug, path in undeployed:
                 print(f"  [DRY RUN] 戻す予定: {slug}")
-            else:
-                if revert_article(path):
-                    print(f"  ✓ {slug}: published → false に戻しました")
-                else:
-                    print(f"  ✗ {slug}: 戻し失敗", file=sys.stderr)
+        else:
+            # 全件を検証してからまとめて書き込む（1件でも戻せなければどれも変更しない）
+            txn = StateTransaction()
+            for slug, path in undeployed:
+                txn.add(path.stem, REVERT)
+            try:
+                txn.commit()
+            except TransitionError as e:
+                for error in e.errors:
+                    print(f"  ✗ {error}", file=sys.stderr)
+                print("  ✗ 戻し失敗（ファイルは変更していません）", file=sys.stderr)
+                sys.exit(1)
+            for slug, path in undeployed:
+                print(f"  ✓ {slug}: published → false に戻しました")
         if not args.dry_run:
             print("\nクリーンアップ完了。新規公開は次回の実行で行います。")
             # GitHub Actions output（commit対象があることを通知）
@@ -424,7 +321,7 @@ def main():
     # レートリミット確認
     recent_deploys = count_recent_deploys()
     remaining_quota = max(0, DAILY_LIMIT - recent_deploys)
-    print(f"当日デプロイ数: {recent_deploys} / 日次上限: {DAILY_LIMIT}")
+    print(f"過去24hデプロイ数: {recent_deploys} / 日次上限: {DAILY_LIMIT}")
 
     if remaining_quota == 0:
         print("レートリミットに到達済み。本日の公開をスキップします。")
@@ -432,12 +329,12 @@ def main():
 
     # 公開対象の記事を検索
     articles = find_publishable_articles()
-    failures = load_failures()
+    state = EventLog().state(now)
 
     # クールダウン中の記事を除外
     eligible = []
     for slug, path in articles:
-        if is_in_cooldown(slug, failures):
+        if state.in_cooldown(slug, COOLDOWN_HOURS, now):
             print(f"  クールダウン中: {slug}")
             continue
         eligible.append((slug, path))
@@ -460,17 +357,7 @@ def main():
             f"    デプロイすると全記事がブロックされます。\n"
             f"    → ファイルをリネームし、retired-slugs.txt に追記してください。"
         )
-        # 失敗をログに記録（クールダウン保護を有効化）
-        failures = load_failures()
-        failures[slug] = {
-            "count": failures.get(slug, {}).get("count", 0) + 1,
-            "last_failed": now.isoformat(),
-        }
-        try:
-            with open(FAILURE_LOG, "w", encoding="utf-8") as f:
-                json.dump(failures, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+        record_failure(slug)
         sys.exit(1)
     print("OK")
 
@@ -478,27 +365,14 @@ def main():
         print("--dry-run のため変更しません")
         sys.exit(0)
 
-    # 公開実行
-    if publish_article(path):
+    # 公開実行（記事の変更と公開履歴のイベントを1回で書き込む。30日より古いイベントは追記時に削除される）
+    if publish_article(path.stem, today_str):
         print(f"  ✓ {slug}: published → true")
     else:
         print(f"  ✗ {slug}: 変更失敗", file=sys.stderr)
-        # 失敗をログに記録（クールダウン保護を有効化）
-        failures = load_failures()
-        failures[slug] = {"last_failed": now.isoformat()}
-        try:
-            with open(FAILURE_LOG, "w", encoding="utf-8") as f:
-                json.dump(failures, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+        record_failure(slug)
         sys.exit(1)
 
-    # 公開履歴を更新
-    history = load_publish_history()
-    if today_str not in history["dates"]:
-        history["dates"].append(today_str)
-    save_publish_history(history)
-
     # GitHub Actions output
     github_output = os.environ.get("GITHUB_OUTPUT")
     if github_output:
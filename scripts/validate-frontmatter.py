@@ -13,19 +13,30 @@
   python3 scripts/validate-frontmatter.py          # 全記事チェック
   python3 scripts/validate-frontmatter.py --fix     # 自動修正モード
   python3 scripts/validate-frontmatter.py --ci      # CI用（エラー時 exit 1）
+  python3 scripts/validate-frontmatter.py --ci --staged        # ステージ済み記事のみ
+  python3 scripts/validate-frontmatter.py --since origin/main  # rev 以降の変更記事のみ
+  python3 scripts/validate-frontmatter.py --watch   # 保存された記事だけを再チェックし続ける（--poll で mtime 監視）
+
+--staged / --since では記事単位のチェックを変更記事だけに絞り、記事横断のチェック
+（スケジュール重複・日次上限・リタイア済み slug）は .zenn-cache/validate-index.json の
+slug 索引から計算する。索引は前回以降に変わった記事だけ更新する。
 
 pre-commit hook としても動作:
   .githooks/pre-commit から呼び出し（git config core.hooksPath .githooks）
 """
 
+import json
 import re
 import subprocess
 import sys
-import urllib.request
-import urllib.error
+import time
 from collections import defaultdict
 from pathlib import Path
 
+from zenn_corpus import CACHE_DIR, Article, atomic_write, load_corpus
+from zenn_slugcheck import SlugCollisionChecker
+from zenn_watch import ArticleWatcher
+
 ARTICLES_DIR = Path(__file__).resolve().parent.parent / "articles"
 RETIRED_SLUGS_FILE = Path(__file__).resolve().parent / "retired-slugs.txt"
 
@@ -38,36 +49,18 @@ SLUG_MIN_LEN = 12
 SLUG_MAX_LEN = 50
 SLUG_PATTERN = re.compile(r'^[a-z0-9_-]+$')
 TITLE_MAX_LEN = 70  # Zenn上限: 70文字
+SLUG_INDEX_FILE = CACHE_DIR / "validate-index.json"
+SLUG_INDEX_VERSION = 1
+SLUG_INDEX_KEYS = ("published", "published_at")  # 記事横断チェックが参照するキー
 
 
-def parse_frontmatter(filepath: Path) -> tuple[dict, list[str]]:
-    """front matter をパースして dict と生行リストを返す."""
-    lines = filepath.read_text(encoding="utf-8").splitlines()
-    if not lines or lines[0].strip() != "---":
-        return {}, lines
-
-    end_idx = None
-    for i, line in enumerate(lines[1:], 1):
-        if line.strip() == "---":
-            end_idx = i
-            break
-
-    if end_idx is None:
-        return {}, lines
-
-    fm_lines = lines[1:end_idx]
-    fm = {}
-    fm["_raw_lines"] = fm_lines
-    fm["_end_idx"] = end_idx
-
-    for line in fm_lines:
-        m = re.match(r'^(\w[\w_]*)\s*:\s*(.*)$', line)
-        if m:
-            key = m.group(1)
-            val = m.group(2).strip()
-            fm[key] = val
-
-    return fm, lines
+def frontmatter_dict(article: Article) -> dict:
+    """Article から check_* 用の front matter dict（値は引用符付きのまま）を作る."""
+    if article.fm_end is None:
+        return {}
+    fm = {"_raw_lines": article.fm_lines, "_end_idx": article.fm_end}
+    fm.update(article.raw_fm)
+    return fm
 
 
 def check_title_emoji_quoting(fm: dict, filepath: Path) -> list[str]:
@@ -184,63 +177,73 @@ def check_zenn_slug_collision(new_slugs: list[str]) -> list[str]:
     デプロイ時に全記事がブロックされる致命的エラーになる。
 
     新規記事（まだ Zenn にデプロイされていない = published: false）のみチェック。
+    問い合わせは zenn_slugcheck で並行実行し、確定結果は TTL 付きでキャッシュする。
+    403/429・ネットワークエラー等の判定不能はスキップ（安全側・オフライン対応）。
     """
+    checker = SlugCollisionChecker(user_agent="validate-frontmatter/1.0")
     errors = []
-    for slug in new_slugs:
-        try:
-            url = f"https://zenn.dev/api/articles/{slug}"
-            req = urllib.request.Request(url, method="HEAD")
-            req.add_header("User-Agent", "validate-frontmatter/1.0")
-            with urllib.request.urlopen(req, timeout=5) as resp:
-                if resp.status == 200:
-                    errors.append(
-                        f"  [SLUG] {slug}.md の slug は Zenn で既に使用されています（他アカウント衝突）\n"
-                        f"         → デプロイが全記事ブロックされます。ファイルをリネームしてください\n"
-                        f"         → リネーム後に retired-slugs.txt に旧 slug を追記"
-                    )
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                pass  # 未使用 = OK
-            # 403/429等は判定不能なのでスキップ（安全側）
-        except Exception:
-            pass  # ネットワークエラー時はスキップ（オフライン対応）
+    for slug in checker.collisions(new_slugs):
+        errors.append(
+            f"  [SLUG] {slug}.md の slug は Zenn で既に使用されています（他アカウント衝突）\n"
+            f"         → デプロイが全記事ブロックされます。ファイルをリネームしてください\n"
+            f"         → リネーム後に retired-slugs.txt に旧 slug を追記"
+        )
+    checker.save()
     return errors
 
 
-def check_schedule_conflicts(all_articles: dict) -> list[str]:
-    """published_at のスケジュール重複チェック."""
-    errors = []
-    schedule_map = defaultdict(list)
+class ScheduleIndex:
+    """published_at の枠 → slug と、日付 → slug の索引.
 
-    for name, fm in all_articles.items():
-        published_at = fm.get("published_at", "").strip('"').strip("'")
-        if published_at:
-            schedule_map[published_at].append(name)
+    スケジュール重複・日次上限の記事横断チェックはこの索引から作る。
+    --watch では保存された記事の分だけ update() で差し替える。
+    """
 
-    for dt, articles in schedule_map.items():
-        if len(articles) > 1:
-            names = ", ".join(articles)
-            errors.append(f"  [CONFLICT] {dt} に {len(articles)} 記事が重複: {names}")
+    def __init__(self, all_articles: dict | None = None):
+        self.slot_of: dict[str, str] = {}
+        self.slots: dict[str, dict[str, None]] = defaultdict(dict)  # 挿入順を保つ set として使う
+        self.days: dict[str, dict[str, None]] = defaultdict(dict)
+        for name, fm in (all_articles or {}).items():
+            self.update(name, fm)
+
+    def update(self, name: str, fm: dict | None) -> None:
+        """記事 name の枠を fm の published_at に差し替える（fm=None は削除）."""
+        old = self.slot_of.pop(name, None)
+        if old:
+            for index, key in ((self.slots, old), (self.days, old.split(" ")[0])):
+                index[key].pop(name, None)
+                if not index[key]:
+                    del index[key]
+        published_at = (fm or {}).get("published_at", "").strip('"').strip("'")
+        if published_at:
+            self.slot_of[name] = published_at
+            self.slots[published_at][name] = None
+            self.days[published_at.split(" ")[0]][name] = None
 
-    return errors
+    def conflicts(self) -> list[str]:
+        errors = []
+        for dt, articles in self.slots.items():
+            if len(articles) > 1:
+                names = ", ".join(articles)
+                errors.append(f"  [CONFLICT] {dt} に {len(articles)} 記事が重複: {names}")
+        return errors
 
+    def over_limit(self) -> list[str]:
+        errors = []
+        for date, articles in self.days.items():
+            if len(articles) > MAX_PER_DAY:
+                errors.append(f"  [RATE] {date} に {len(articles)} 記事（上限 {MAX_PER_DAY}）: {', '.join(articles)}")
+        return errors
 
-def check_daily_limits(all_articles: dict) -> list[str]:
-    """1日あたりの記事数上限チェック."""
-    errors = []
-    daily_map = defaultdict(list)
 
-    for name, fm in all_articles.items():
-        published_at = fm.get("published_at", "").strip('"').strip("'")
-        if published_at:
-            date_part = published_at.split(" ")[0]
-            daily_map[date_part].append(name)
+def check_schedule_conflicts(all_articles: dict) -> list[str]:
+    """published_at のスケジュール重複チェック."""
+    return ScheduleIndex(all_articles).conflicts()
 
-    for date, articles in daily_map.items():
-        if len(articles) > MAX_PER_DAY:
-            errors.append(f"  [RATE] {date} に {len(articles)} 記事（上限 {MAX_PER_DAY}）: {', '.join(articles)}")
 
-    return errors
+def check_daily_limits(all_articles: dict) -> list[str]:
+    """1日あたりの記事数上限チェック."""
+    return ScheduleIndex(all_articles).over_limit()
 
 
 def check_published_combo(fm: dict, filepath: Path) -> list[str]:
@@ -307,6 +310,192 @@ def check_title_length(fm: dict, filepath: Path) -> list[str]:
     return errors
 
 
+def check_article(name: str, fm: dict, filepath: Path) -> list[str]:
+    """記事単位のチェックをすべて実行する."""
+    errors = []
+    errors.extend(check_slug_format(name))
+    errors.extend(check_required_fields(fm, filepath))
+    errors.extend(check_title_length(fm, filepath))
+    errors.extend(check_published_combo(fm, filepath))
+    errors.extend(check_title_emoji_quoting(fm, filepath))
+    errors.extend(check_quoting(fm, filepath))
+    errors.extend(check_topics_format(fm, filepath))
+    errors.extend(check_status_field(fm, filepath))
+    return errors
+
+
+def git_lines(*args: str) -> list[str]:
+    """git コマンドを実行して出力行を返す（失敗時は空リスト）."""
+    try:
+        result = subprocess.run(
+            ["git", *args], capture_output=True, text=True, cwd=ARTICLES_DIR.parent
+        )
+    except OSError:
+        return []
+    if result.returncode != 0:
+        return []
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def is_article_path(rel: str) -> bool:
+    return rel.startswith("articles/") and rel.endswith(".md") and "/" not in rel[len("articles/"):]
+
+
+def changed_article_paths(since: str | None, staged: bool) -> list[str]:
+    """--since / --staged で指定された変更記事（リポジトリ相対パス、削除は除く）."""
+    if staged:
+        changed = git_lines("diff", "--cached", "--name-only", "--diff-filter=ACMR")
+    else:
+        changed = git_lines("diff", "--name-only", "--diff-filter=ACMR", since)
+    return sorted(f for f in set(changed) if is_article_path(f))
+
+
+def dirty_article_paths() -> list[str]:
+    """作業ツリー/ステージに変更がある管理下の記事（リポジトリ相対パス）."""
+    paths = []
+    for line in git_lines("status", "--porcelain", "--untracked-files=no", "--", "articles"):
+        for rel in line[3:].split(" -> "):
+            rel = rel.strip('"')
+            if is_article_path(rel):
+                paths.append(rel)
+    return paths
+
+
+def is_ancestor(old: str, new: str) -> bool:
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", old, new],
+        capture_output=True, cwd=ARTICLES_DIR.parent,
+    )
+    return result.returncode == 0
+
+
+def slug_index_entry(fm: dict) -> dict:
+    return {k: fm[k] for k in SLUG_INDEX_KEYS if k in fm}
+
+
+def load_slug_index() -> dict[str, dict]:
+    """記事横断チェック用の slug 索引を最新化して返す.
+
+    索引は {slug: {published, published_at}} と、同期した HEAD・未コミット記事を保持する。
+    前回の HEAD からのコミット差分と、前回/今回の未コミット記事だけを再読込する。
+    HEAD が辿れない（索引なし・履歴書き換え）場合は全記事から作り直す。
+    """
+    head = (git_lines("rev-parse", "HEAD") or [""])[0]
+    try:
+        data = json.loads(SLUG_INDEX_FILE.read_text(encoding="utf-8"))
+        if data.get("version") != SLUG_INDEX_VERSION:
+            data = None
+    except (OSError, ValueError):
+        data = None
+
+    dirty = dirty_article_paths()
+    if data and head and data.get("head") and is_ancestor(data["head"], head):
+        slugs = data["slugs"]
+        refresh = set(dirty) | set(data.get("dirty", []))
+        # --no-renames: リネームは旧パス（削除）と新パス（追加）の両方として扱い、旧 slug を索引から消す
+        refresh.update(f for f in git_lines("diff", "--name-only", "--no-renames", data["head"], head)
+                       if is_article_path(f))
+    else:
+        slugs = {}
+        refresh = set(git_lines("ls-files", "articles/*.md"))
+
+    for rel in refresh:
+        path = ARTICLES_DIR.parent / rel
+        slug = path.stem
+        if path.exists():
+            slugs[slug] = slug_index_entry(frontmatter_dict(load_corpus([path])[slug]))
+        else:
+            slugs.pop(slug, None)
+
+    try:
+        SLUG_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(SLUG_INDEX_FILE, json.dumps(
+            {"version": SLUG_INDEX_VERSION, "head": head, "dirty": sorted(dirty), "slugs": slugs},
+            ensure_ascii=False,
+        ))
+    except OSError:
+        pass
+    return slugs
+
+
+def print_errors(name: str, errors: list[str]) -> None:
+    print(f"{name}.md:")
+    for e in errors:
+        print(e)
+    print()
+
+
+def watch(polling: bool = False) -> None:
+    """articles/ を監視し、保存された記事だけを再チェックし続ける.
+
+    パース済みの記事と記事横断の索引（ScheduleIndex）をメモリに持ち、変更記事の
+    記事単位チェックを実行して索引の該当枠だけを差し替える。記事横断の問題は
+    新たに発生したもの・解消したものだけを表示する。Zenn への slug 衝突確認は行わない。
+    """
+    watcher = ArticleWatcher(ARTICLES_DIR, polling=polling)
+    tracked = {ARTICLES_DIR.parent / f for f in git_lines("ls-files", "articles/*.md")}
+    if not tracked:
+        tracked = set(ARTICLES_DIR.glob("*.md"))
+    retired = load_retired_slugs()
+    schedule = ScheduleIndex()
+    all_errors = {}
+
+    def refresh(name: str, record: Article) -> None:
+        fm = frontmatter_dict(record)
+        schedule.update(name, fm)
+        all_errors[name] = check_article(name, fm, record.path) + check_retired_slugs({name: fm}, retired)
+
+    for name, record in load_corpus(sorted(tracked)).items():
+        refresh(name, record)
+    for name, errors in sorted(all_errors.items()):
+        if errors:
+            print_errors(name, errors)
+    cross = schedule.conflicts() + schedule.over_limit()
+    for e in cross:
+        print(e)
+    total = sum(len(e) for e in all_errors.values()) + len(cross)
+    print(f"=== watching {ARTICLES_DIR} ({watcher.backend}): {len(all_errors)} articles, "
+          f"{total} issues — Ctrl-C で終了 ===", flush=True)
+
+    for paths in watcher:
+        start = time.perf_counter()
+        changed = []
+        for path in sorted(paths):
+            if path not in tracked and git_lines("check-ignore", str(path.relative_to(ARTICLES_DIR.parent))):
+                continue  # .gitignore で除外された記事は通常実行と同じく対象外
+            name = path.stem
+            if path.exists():
+                tracked.add(path)
+                refresh(name, load_corpus([path])[name])
+            else:
+                tracked.discard(path)
+                all_errors.pop(name, None)
+                schedule.update(name, None)
+            changed.append(name)
+        if not changed:
+            continue
+
+        now = schedule.conflicts() + schedule.over_limit()
+        added = [e for e in now if e not in cross]
+        resolved = [e for e in cross if e not in now]
+        cross = now
+        elapsed = (time.perf_counter() - start) * 1000
+
+        for name in changed:
+            if name not in all_errors:
+                print(f"{name}.md: 削除\n")
+            elif all_errors[name]:
+                print_errors(name, all_errors[name])
+            else:
+                print(f"{name}.md: OK\n")
+        for e in added:
+            print(e)
+        for e in resolved:
+            print(f"  [RESOLVED] {e.strip()}")
+        total = sum(len(e) for e in all_errors.values()) + len(cross)
+        print(f"--- {total} issues ({len(all_errors)} articles, {elapsed:.0f}ms) ---", flush=True)
+
+
 def fix_frontmatter(filepath: Path) -> bool:
     """front matter を自動修正. 変更があれば True."""
     content = filepath.read_text(encoding="utf-8")
@@ -377,6 +566,18 @@ def fix_frontmatter(filepath: Path) -> bool:
 def main():
     fix_mode = "--fix" in sys.argv
     ci_mode = "--ci" in sys.argv
+    staged_mode = "--staged" in sys.argv
+    since = None
+    if "--since" in sys.argv:
+        idx = sys.argv.index("--since")
+        if idx + 1 >= len(sys.argv):
+            print("ERROR: --since には rev を指定してください（例: --since origin/main）")
+            sys.exit(2)
+        since = sys.argv[idx + 1]
+        if not git_lines("rev-parse", "--verify", "--quiet", since + "^{commit}"):
+            print(f"ERROR: --since の rev が見つかりません: {since}")
+            sys.exit(2)
+    incremental = staged_mode or since is not None
 
     if fix_mode and ci_mode:
         print("⚠️  --fix と --ci は同時指定できません。--fix を優先します。")
@@ -386,40 +587,48 @@ def main():
         print(f"ERROR: {ARTICLES_DIR} が見つかりません")
         sys.exit(1)
 
-    # git管理下のファイルのみ検査（.gitignoreで除外されたファイルをスキップ）
-    try:
-        tracked = subprocess.run(
-            ["git", "ls-files", "articles/*.md"],
-            capture_output=True, text=True, cwd=ARTICLES_DIR.parent
-        ).stdout.strip().splitlines()
-        articles = sorted(ARTICLES_DIR.parent / f for f in tracked if f)
-    except Exception:
-        articles = sorted(ARTICLES_DIR.glob("*.md"))
+    if "--watch" in sys.argv:
+        try:
+            watch(polling="--poll" in sys.argv)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if incremental:
+        # 変更記事のみ検査（記事横断チェックは slug 索引から）
+        changed = changed_article_paths(since, staged_mode)
+        articles = [ARTICLES_DIR.parent / f for f in changed if (ARTICLES_DIR.parent / f).exists()]
+    else:
+        # git管理下のファイルのみ検査（.gitignoreで除外されたファイルをスキップ）
+        try:
+            tracked = subprocess.run(
+                ["git", "ls-files", "articles/*.md"],
+                capture_output=True, text=True, cwd=ARTICLES_DIR.parent
+            ).stdout.strip().splitlines()
+            articles = sorted(ARTICLES_DIR.parent / f for f in tracked if f)
+        except Exception:
+            articles = sorted(ARTICLES_DIR.glob("*.md"))
     all_fm = {}
     all_errors = {}
     total_errors = 0
 
     # Parse all articles
-    for article in articles:
-        fm, _ = parse_frontmatter(article)
-        name = article.stem
+    corpus = load_corpus(articles)
+    for name, record in corpus.items():
+        article = record.path
+        fm = frontmatter_dict(record)
         all_fm[name] = fm
 
-        errors = []
-        errors.extend(check_slug_format(name))
-        errors.extend(check_required_fields(fm, article))
-        errors.extend(check_title_length(fm, article))
-        errors.extend(check_published_combo(fm, article))
-        errors.extend(check_title_emoji_quoting(fm, article))
-        errors.extend(check_quoting(fm, article))
-        errors.extend(check_topics_format(fm, article))
-        errors.extend(check_status_field(fm, article))
-
+        errors = check_article(name, fm, article)
         if errors:
             all_errors[name] = errors
             total_errors += len(errors)
 
     # Cross-article checks
+    if incremental:
+        index = load_slug_index()
+        index.update({name: slug_index_entry(fm) for name, fm in all_fm.items()})
+        all_fm = index
     retired = load_retired_slugs()
     retired_errors = check_retired_slugs(all_fm, retired)
     schedule_errors = check_schedule_conflicts(all_fm)
@@ -484,17 +693,17 @@ def main():
                 print(e)
         return
 
-    print(f"=== Zenn Front Matter Validation ({len(articles)} articles) ===\n")
+    if incremental:
+        print(f"=== Zenn Front Matter Validation ({len(articles)} changed / {len(all_fm)} articles) ===\n")
+    else:
+        print(f"=== Zenn Front Matter Validation ({len(articles)} articles) ===\n")
 
     if not all_errors and not retired_errors and not schedule_errors and not daily_errors and not slug_collision_errors:
         print("ALL PASS — 全記事の front matter が正常です")
         sys.exit(0)
 
     for name, errors in sorted(all_errors.items()):
-        print(f"{name}.md:")
-        for e in errors:
-            print(e)
-        print()
+        print_errors(name, errors)
 
     if slug_collision_errors:
         print("⚠ Zenn Slug Collision (デプロイ全記事ブロック):")
@@ -0,0 +1,230 @@
+"""修正スクリプト用のコンテンツアドレス型バックアップストア.
+
+書き換え前のファイル内容を sha256 をキーに1回だけ保存し、実行（run）ごとに
+パス → ハッシュのマニフェストを残す。同じ内容は何度バックアップしても1つの
+オブジェクトになり、バックアップするのは書き換えるファイルだけなので、
+ディスク使用量と所要時間は変更された内容の分だけ増える（コーパス全体の大きさに依らない）。
+
+  .fix-backup/
+    objects/ab/cdef....zst   書き換え前の内容（sha256 の先頭2文字でディレクトリを分ける）
+    objects/ab/cdef....z     zstandard が無い環境では zlib で圧縮
+    runs/<run_id>.json       {"id", "label", "created_at", "files": {相対パス: sha256}}
+
+ハッシュは圧縮前のバイト列に対して取る。圧縮形式はファイル名の拡張子で判別し、
+拡張子なしのオブジェクト（非圧縮）も読める。
+
+使い方:
+  from zenn_backup import BackupRun
+  run = BackupRun("fix-bold")
+  run.add(path)             # 書き換える前に呼ぶ（現在のファイル内容を保存）
+  run.close()               # マニフェストを書き出す（ファイルが無ければ何もしない）
+
+  python3 scripts/fix-backup.py list
+  python3 scripts/fix-backup.py restore --run <id>
+  python3 scripts/fix-backup.py gc --keep 20
+"""
+
+import hashlib
+import json
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from zenn_corpus import REPO_ROOT, atomic_write
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BACKUP_ROOT = REPO_ROOT / ".fix-backup"
+RUN_TIME_FORMAT = "%Y%m%d-%H%M%S"
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+SUFFIXES = (".zst", ".z", "")
+
+
+def _compress(data: bytes) -> tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), ".zst"
+    return zlib.compress(data, ZLIB_LEVEL), ".z"
+
+
+def _decompress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstd で圧縮されたオブジェクトの復元には zstandard が必要です")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if suffix == ".z":
+        return zlib.decompress(data)
+    return data
+
+
+def object_path(root: Path, digest: str) -> Path | None:
+    """保存済みオブジェクトのパス（無ければ None）."""
+    base = root / "objects" / digest[:2] / digest[2:]
+    for suffix in SUFFIXES:
+        path = base.with_name(base.name + suffix)
+        if path.exists():
+            return path
+    return None
+
+
+def put_object(root: Path, data: bytes) -> str:
+    """data を保存して sha256 を返す（既にあれば書かない）."""
+    digest = hashlib.sha256(data).hexdigest()
+    if object_path(root, digest) is None:
+        packed, suffix = _compress(data)
+        path = root / "objects" / digest[:2] / (digest[2:] + suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, packed)
+    return digest
+
+
+def get_object(root: Path, digest: str) -> bytes:
+    path = object_path(root, digest)
+    if path is None:
+        raise FileNotFoundError(f"オブジェクトがありません: {digest}")
+    data = _decompress(path.read_bytes(), path.suffix if path.suffix in (".zst", ".z") else "")
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise RuntimeError(f"オブジェクトが壊れています: {path}")
+    return data
+
+
+def _relpath(path: Path) -> str:
+    try:
+        return str(path.resolve().relative_to(REPO_ROOT))
+    except ValueError:
+        return str(path.resolve())
+
+
+class BackupRun:
+    """1回の修正実行分のバックアップ."""
+
+    def __init__(self, label: str, root: Path = BACKUP_ROOT):
+        self.root = root
+        self.label = label
+        self.started = datetime.now().astimezone()
+        self.id = f"{self.started.strftime(RUN_TIME_FORMAT)}-{label}"
+        self.files: dict[str, str] = {}
+
+    def add(self, path: Path, data: bytes | None = None) -> str:
+        """path の書き換え前の内容を保存する（data 省略時は現在のファイル内容）."""
+        if data is None:
+            data = path.read_bytes()
+        digest = put_object(self.root, data)
+        self.files[_relpath(path)] = digest
+        return digest
+
+    def close(self) -> Path | None:
+        if not self.files:
+            return None
+        runs = self.root / "runs"
+        runs.mkdir(parents=True, exist_ok=True)
+        # 同じ秒・同じラベルの実行はサフィックスで区別する
+        run_id = self.id
+        n = 1
+        while (runs / f"{run_id}.json").exists():
+            n += 1
+            run_id = f"{self.id}-{n}"
+        self.id = run_id
+        manifest = runs / f"{run_id}.json"
+        atomic_write(manifest, json.dumps({
+            "id": run_id,
+            "label": self.label,
+            "created_at": self.started.isoformat(timespec="seconds"),
+            "files": self.files,
+        }, ensure_ascii=False, indent=2))
+        return manifest
+
+
+def list_runs(root: Path = BACKUP_ROOT) -> list[dict]:
+    """マニフェストを古い順に返す."""
+    runs = []
+    for path in (root / "runs").glob("*.json"):
+        try:
+            runs.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return sorted(runs, key=lambda r: (r.get("created_at", ""), r.get("id", "")))
+
+
+def load_run(run_id: str, root: Path = BACKUP_ROOT) -> dict:
+    path = root / "runs" / f"{run_id}.json"
+    if not path.exists():
+        raise FileNotFoundError(f"run がありません: {run_id}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def restore_run(run_id: str, paths: list[str] | None = None, dry_run: bool = False,
+                root: Path = BACKUP_ROOT) -> tuple[list[str], Path | None]:
+    """run の書き換え前の内容に戻し、戻したパスと「戻す直前」のバックアップを返す.
+
+    paths を指定した場合はそのファイルだけを戻す。現在の内容と同じファイルは書かない。
+    戻す前の内容は restore-<run_id> という run として保存するので、restore 自体も戻せる。
+    """
+    run = load_run(run_id, root)
+    wanted = {_relpath(Path(p)) for p in paths} if paths else None
+    undo = BackupRun(f"restore-{run_id}", root)
+    restored = []
+    for rel, digest in sorted(run["files"].items()):
+        if wanted is not None and rel not in wanted:
+            continue
+        path = Path(rel) if Path(rel).is_absolute() else REPO_ROOT / rel
+        data = get_object(root, digest)
+        current = path.read_bytes() if path.exists() else None
+        if current == data:
+            continue
+        restored.append(rel)
+        if dry_run:
+            continue
+        if current is not None:
+            undo.add(path, current)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, data)
+    return restored, (None if dry_run else undo.close())
+
+
+def gc(keep: int | None = None, days: float | None = None, dry_run: bool = False,
+       root: Path = BACKUP_ROOT) -> tuple[list[str], int, int]:
+    """古い run を削除し、どの run からも参照されないオブジェクトを消す.
+
+    keep: 新しい順にこの数の run を残す。days: これより古い run を消す。
+    両方指定した場合はどちらかに当たる run を消す。
+    (削除した run_id, 削除したオブジェクト数, 解放したバイト数) を返す。
+    """
+    runs = list_runs(root)
+    cutoff = datetime.now().astimezone() - timedelta(days=days) if days is not None else None
+    dropped = []
+    for k, run in enumerate(runs):
+        too_many = keep is not None and k < len(runs) - keep
+        try:
+            too_old = cutoff is not None and datetime.fromisoformat(run["created_at"]) < cutoff
+        except (KeyError, ValueError):
+            too_old = False
+        if too_many or too_old:
+            dropped.append(run["id"])
+
+    live = {d for run in runs if run["id"] not in dropped for d in run["files"].values()}
+    removed = freed = 0
+    for path in (root / "objects").glob("*/*"):
+        digest = path.parent.name + path.name.split(".", 1)[0]
+        if digest in live and not path.name.endswith(".tmp"):
+            continue
+        removed += 1
+        freed += path.stat().st_size
+        if not dry_run:
+            path.unlink()
+    if not dry_run:
+        for run_id in dropped:
+            (root / "runs" / f"{run_id}.json").unlink()
+        for d in (root / "objects").glob("*"):
+            if d.is_dir() and not any(d.iterdir()):
+                d.rmdir()
+    return dropped, removed, freed
+
+
+def store_size(root: Path = BACKUP_ROOT) -> tuple[int, int]:
+    """(オブジェクト数, 合計バイト数)."""
+    paths = [p for p in (root / "objects").glob("*/*") if p.is_file()]
+    return len(paths), sum(p.stat().st_size for p in paths)
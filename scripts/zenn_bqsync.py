@@ -0,0 +1,507 @@
+"""記事メタデータの BigQuery 同期（前回同期からの差分だけを送る）.
+
+各記事を BigQuery の1行（article_row）に変換し、行内容の sha256 を
+.zenn-cache/bq-sync/manifest.json（前回成功した同期のマニフェスト）と比べて
+  - upsert:    追加・変更された行
+  - tombstone: マニフェストにあるが記事が無くなった行の id
+だけを同期 API（SYNC_API_URL）に送る。変更が無ければリクエストは送らない。
+
+送信は記事を1件ずつ読んで NDJSON の1行にし、その場で gzip 圧縮して
+非圧縮 CHUNK_BYTES ごとのチャンクに区切る（全行をメモリに載せない）。チャンクは
+タイムアウト・接続エラー・429/5xx なら指数バックオフ + ジッターで MAX_ATTEMPTS 回まで
+送り直し、成功するたびにその分をマニフェストに書き込む。送る前には送信中のチャンクの
+本文と変更を書き残しておき、途中で失敗した次回はまずそのチャンクをそのまま送り直してから、
+残りの差分を同じアップロードセッションの続きとして送る。
+
+送信先の URL や行の形式（SCHEMA_VERSION）が変わった場合・--full 指定時は全行を送り直す。
+行の計算結果は Article.memo でコーパスキャッシュに保存し、変更のない記事は本文を読まない。
+
+プロトコル（1チャンク = 1リクエスト）:
+  POST SYNC_API_URL
+    Content-Type: application/x-ndjson / Content-Encoding: gzip
+    X-Sync-Session: セッション id（同期1回分。中断した同期の再開時は同じ id）
+    X-Sync-Chunk:   セッション内のチャンク番号（0 始まり）
+    X-Resume-Token: 直前のチャンクの応答で受け取った resume_token（最初は空）
+    X-Sync-Digest:  送る本文（gzip 済み）の sha256
+    本文の各行: {"op": "upsert", "row": {...}} / {"op": "delete", "id": "zenn-slug"}
+  200 {"resume_token": "...", ...}
+    サーバーは (セッション, チャンク番号) で冪等に扱う（応答が失われて送り直した
+    チャンクは再適用せず同じ応答を返す）。トークンが合わない・適用済みのチャンクと
+    ダイジェストが違う場合は 409 を返し、クライアントは新しいセッションで送り直す。
+
+使い方:
+  python3 scripts/zenn_bqsync.py                 # SYNC_API_URL へ差分を同期（未設定なら dry run）
+  python3 scripts/zenn_bqsync.py --dry-run       # 差分の表示のみ（マニフェストも更新しない）
+  python3 scripts/zenn_bqsync.py --full          # マニフェストを無視して全行を送る
+  python3 scripts/zenn_bqsync.py --serve-stub 8765 [--stub-faults 503,drop]
+      # オフライン確認用の同期 API スタブ（http://127.0.0.1:8765/）。
+      # 受け取った行をメモリ上のテーブルに反映し、GET でテーブルを返す。
+      # --stub-faults は先頭のリクエストから順に返す障害（HTTP ステータス /
+      # drop = 適用後に応答せず切断）
+  SYNC_API_URL=http://127.0.0.1:8765/ python3 scripts/zenn_bqsync.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+from zenn_corpus import ARTICLES_DIR, CACHE_DIR, ZENN_ARTICLES_URL, Article, atomic_write, load_article
+from zenn_metrics import METRICS_KEY, scan_metrics
+
+MANIFEST_FILE = CACHE_DIR / "bq-sync" / "manifest.json"
+SCHEMA_VERSION = 3  # article_row の列や計算方法を変えたら上げる（全行を送り直す）
+CHUNK_BYTES = 256 * 1024  # 非圧縮の NDJSON でこのサイズを超えないようにチャンクを区切る
+REQUEST_TIMEOUT = 30
+MAX_ATTEMPTS = 4
+RETRY_BASE_SEC = 2.0
+RETRY_MAX_SEC = 60.0
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def count_words(body: str) -> int:
+    """日本語＋英語の文字数（マークダウン記法除去後）"""
+    cleaned = re.sub(r'```.*?```', '', body, flags=re.DOTALL)
+    cleaned = re.sub(r'`[^`]+`', '', cleaned)
+    cleaned = re.sub(r'[#*\[\]()>!|_~-]', '', cleaned)
+    cleaned = re.sub(r'\s+', '', cleaned)
+    return len(cleaned)
+
+
+def article_row(article: Article) -> dict:
+    """記事 → BigQuery の1行."""
+    slug = article.slug
+    meta = article.fm
+    body = article.body
+    article_type = meta.get("type", "tech")
+    published = article.is_published()
+    published_at_raw = meta.get("published_at", None)
+    return {
+        "id": f"zenn-{slug}",
+        "title": meta.get("title", slug),
+        "platform": "zenn_idea" if article_type == "idea" else "zenn_tech",
+        "article_type": article_type,
+        "status": "published" if published else "draft",
+        "source_content_id": slug,
+        "source_tags": ",".join(article.topics),
+        "published_url": f"{ZENN_ARTICLES_URL}/{slug}" if published else "",
+        "published_at": str(published_at_raw) if published_at_raw else "",
+        "publication_name": meta.get("publication_name", ""),
+        "word_count": count_words(body),
+        "code_example_count": article.memo(METRICS_KEY, scan_metrics)["code_block_count"],
+        "da_review_count": 0,
+        "da_feedback": "",
+    }
+
+
+def row_hash(row: dict) -> str:
+    canonical = json.dumps(row, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# ---- 差分 ----
+
+@dataclass
+class Change:
+    op: str  # "upsert" / "delete"
+    id: str
+    hash: str | None = None
+    line: bytes = b""  # NDJSON の1行（改行付き）
+
+
+def iter_changes(manifest: dict[str, str], articles_dir: Path = ARTICLES_DIR) -> Iterator[Change]:
+    """マニフェストと違う行を記事のファイル名順に、続いて消えた行の tombstone を返す.
+
+    記事は1件ずつ読み、行を作ったら本文を破棄する（メモリに残るのは id の集合だけ）。
+    """
+    seen = set()
+    for path in sorted(articles_dir.glob("*.md")):
+        article = load_article(path)
+        row = article.memo(f"bq-row/{SCHEMA_VERSION}", article_row)
+        article.release()
+        seen.add(row["id"])
+        digest = row_hash(row)
+        if manifest.get(row["id"]) != digest:
+            line = json.dumps({"op": "upsert", "row": row}, ensure_ascii=False) + "\n"
+            yield Change("upsert", row["id"], digest, line.encode("utf-8"))
+    for id_ in sorted(manifest.keys() - seen):
+        line = json.dumps({"op": "delete", "id": id_}) + "\n"
+        yield Change("delete", id_, line=line.encode("utf-8"))
+
+
+def gzip_chunks(changes: Iterator[Change], limit: int = CHUNK_BYTES) -> Iterator[tuple[bytes, list[Change]]]:
+    """変更を非圧縮 limit バイト以内（1行が limit を超える場合はその1行）の
+    gzip 済み NDJSON に区切り、(圧縮済みの本文, 含まれる変更) を返す."""
+    comp, parts, items, size = None, [], [], 0
+    for change in changes:
+        if comp is not None and size + len(change.line) > limit:
+            parts.append(comp.flush())
+            yield b"".join(parts), items
+            comp = None
+        if comp is None:
+            comp, parts, items, size = zlib.compressobj(6, zlib.DEFLATED, 31), [], [], 0
+        parts.append(comp.compress(change.line))
+        items.append(Change(change.op, change.id, change.hash))  # 行本体は保持しない
+        size += len(change.line)
+    if comp is not None:
+        parts.append(comp.flush())
+        yield b"".join(parts), items
+
+
+# ---- マニフェスト ----
+
+def body_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def target_key(url: str) -> str:
+    """送信先ごとのマニフェストの識別子（URL が変わったら全行を送り直す）."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class Manifest:
+    """前回までに同期した id → 行のハッシュと、中断したアップロードの再開位置.
+
+    resume["inflight"] は再開位置で送りかけたチャンクの変更と本文のダイジェスト
+    （本文は inflight_path）。同じ (セッション, チャンク番号) で別の内容を送らないよう、
+    再開時はまずこれをそのまま送り直す。
+    """
+
+    path: Path
+    url: str
+    rows: dict[str, str] = field(default_factory=dict)
+    resume: dict | None = None  # {"session", "chunk", "token", "inflight"?: {"digest", "items"}}
+
+    @classmethod
+    def load(cls, path: Path, url: str) -> "Manifest":
+        """送信先・スキーマが違えば空のマニフェスト."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path, url)
+        if data.get("schema") != SCHEMA_VERSION or data.get("target") != target_key(url):
+            return cls(path, url)
+        return cls(path, url, data.get("rows", {}), data.get("resume"))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"schema": SCHEMA_VERSION, "target": target_key(self.url),
+                "rows": dict(sorted(self.rows.items()))}
+        if self.resume:
+            data["resume"] = self.resume
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=1))
+
+    @property
+    def inflight_path(self) -> Path:
+        return self.path.with_name(f"{self.path.stem}.inflight.gz")
+
+    def apply(self, items: list[Change]) -> None:
+        for change in items:
+            if change.op == "upsert":
+                self.rows[change.id] = change.hash
+            else:
+                self.rows.pop(change.id, None)
+
+    def stage(self, resume: dict, body: bytes, items: list[Change]) -> None:
+        """resume の位置で送るチャンクを送る前に書き残す."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.inflight_path, body)
+        self.resume = {**resume, "inflight": {"digest": body_digest(body),
+                                              "items": [[c.op, c.id, c.hash] for c in items]}}
+        self.save()
+
+    def staged(self) -> tuple[bytes, list[Change]] | None:
+        """前回送りかけたチャンクの (本文, 変更). 無い・本文が失われていれば None."""
+        inflight = (self.resume or {}).get("inflight")
+        if not inflight:
+            return None
+        try:
+            body = self.inflight_path.read_bytes()
+        except OSError:
+            return None
+        if body_digest(body) != inflight["digest"]:
+            return None
+        return body, [Change(op, id_, hash_) for op, id_, hash_ in inflight["items"]]
+
+    def ack(self, items: list[Change], resume_token: str) -> None:
+        """送りかけたチャンクが受け付けられた. 変更を反映し、再開位置を次のチャンクに進める."""
+        self.apply(items)
+        self.resume = {"session": self.resume["session"], "chunk": self.resume["chunk"] + 1,
+                       "token": resume_token}
+        self.save()
+
+
+# ---- 送信 ----
+
+class ResumeRejected(Exception):
+    """サーバーが X-Resume-Token を受け付けなかった（409）."""
+
+
+def retry_delay(attempt: int, retry_after: str | None = None) -> float:
+    """attempt 回目（1 始まり）の失敗後の待ち秒数. Retry-After があればそれに従う."""
+    if retry_after:
+        try:
+            return min(float(retry_after), RETRY_MAX_SEC)
+        except ValueError:
+            pass
+    return min(RETRY_BASE_SEC * 2 ** (attempt - 1), RETRY_MAX_SEC) * random.uniform(0.5, 1.0)
+
+
+def post_chunk(url: str, token: str, body: bytes, session: str, chunk: int, resume_token: str) -> dict:
+    """1チャンクを送り、応答を返す. 一時的な失敗は MAX_ATTEMPTS 回まで送り直す."""
+    headers = {
+        "Content-Type": "application/x-ndjson",
+        "Content-Encoding": "gzip",
+        "X-Sync-Session": session,
+        "X-Sync-Chunk": str(chunk),
+        "X-Resume-Token": resume_token,
+        "X-Sync-Digest": body_digest(body),
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        retry_after = None
+        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
+                return json.loads(resp.read().decode("utf-8") or "{}")
+        except urllib.error.HTTPError as e:
+            if e.code == 409:
+                raise ResumeRejected(f"chunk {chunk}: resume token rejected") from e
+            if e.code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS:
+                raise
+            retry_after = e.headers.get("Retry-After")
+            error = f"HTTP {e.code}"
+        except (urllib.error.URLError, http.client.HTTPException, ConnectionError, socket.timeout) as e:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            error = str(e)
+        delay = retry_delay(attempt, retry_after)
+        print(f"  chunk {chunk}: {error} — {delay:.1f}s 後に再送 ({attempt}/{MAX_ATTEMPTS - 1})")
+        time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def sync(url: str, token: str = "", full: bool = False, dry_run: bool = False,
+         articles_dir: Path = ARTICLES_DIR, manifest_path: Path = MANIFEST_FILE) -> bool:
+    """差分を同期し、送れたチャンクをマニフェストに反映する. 全チャンク成功で True."""
+    manifest = Manifest(manifest_path, url) if full else Manifest.load(manifest_path, url)
+    full_sync = not manifest.rows
+    counts = {"upsert": 0, "delete": 0}
+
+    def changes():
+        for change in iter_changes(manifest.rows, articles_dir):
+            counts[change.op] += 1
+            print(f"  {'+' if change.op == 'upsert' else '-'} {change.id}")
+            yield change
+
+    if dry_run or not url:
+        for _ in changes():
+            pass
+        print(f"{counts['upsert']} upsert, {counts['delete']} delete{' (full sync)' if full_sync else ''}")
+        if not url:
+            print("SYNC_API_URL not set. Dry run only.")
+        return True
+
+    if token:
+        print("Using authenticated request with ID token from Workload Identity Federation")
+    else:
+        print("Warning: No ID token available, trying unauthenticated")
+    def new_session() -> dict:
+        return {"session": uuid.uuid4().hex, "chunk": 0, "token": ""}
+
+    resume = manifest.resume or new_session()
+    staged = manifest.staged()
+    if manifest.resume:
+        print(f"Resuming upload session {resume['session']} at chunk {resume['chunk']}")
+        if "inflight" in resume and staged is None:
+            # 送りかけたチャンクの本文が無い: 同じチャンク番号で別の内容を送らないよう新しいセッションにする
+            resume = new_session()
+            print(f"  interrupted chunk is missing — new session {resume['session']}")
+
+    ok, sent = True, 0
+
+    def send(body: bytes, items: list[Change], replay: bool = False) -> None:
+        """resume の位置に1チャンク送り、受け付けられたらマニフェストに反映する."""
+        nonlocal resume, sent
+        manifest.stage(resume, body, items)
+        try:
+            result = post_chunk(url, token, body, resume["session"], resume["chunk"], resume["token"])
+        except ResumeRejected:
+            resume = new_session()
+            print(f"  resume rejected — new session {resume['session']}")
+            if replay:
+                return  # 前回のチャンクは捨て、残りの変更は差分として送り直す
+            manifest.stage(resume, body, items)
+            result = post_chunk(url, token, body, resume["session"], resume["chunk"], resume["token"])
+        sent += len(body)
+        manifest.ack(items, result.get("resume_token", ""))
+        resume = manifest.resume
+        print(f"  chunk {resume['chunk'] - 1}: {len(items)} rows, {len(body)} bytes gzip → "
+              f"{json.dumps(result, ensure_ascii=False)}")
+
+    try:
+        if staged is not None:
+            print(f"  resending interrupted chunk {resume['chunk']} ({len(staged[1])} rows)")
+            send(*staged, replay=True)
+        for body, items in gzip_chunks(changes(), CHUNK_BYTES):
+            send(body, items)
+    except Exception as e:
+        print(f"Sync failed at chunk {resume['chunk']}: {e}")
+        ok = False
+
+    print(f"{counts['upsert']} upsert, {counts['delete']} delete{' (full sync)' if full_sync else ''}, "
+          f"{sent} bytes sent")
+    if ok:
+        if not sent:
+            print("No changes since last sync.")
+        if manifest.resume is not None or not manifest.path.exists():
+            manifest.resume = None  # 同期完了（次回は新しいセッション）
+            manifest.save()
+        manifest.inflight_path.unlink(missing_ok=True)
+    return ok
+
+
+# ---- オフライン確認用スタブ ----
+
+class StubTable:
+    """同期 API のスタブが持つテーブル（id → 行）とアップロードセッション.
+
+    faults には先頭のリクエストから順に返す障害を入れる（HTTP ステータスの int か、
+    "drop" = チャンクを適用した後に応答せず切断）。
+    """
+
+    def __init__(self, faults: list | None = None):
+        self.rows: dict[str, dict] = {}
+        self.sessions: dict[str, dict] = {}  # session → {"token", "acks": {chunk: (ダイジェスト, 応答)}}
+        self.requests = 0
+        self.faults = list(faults or [])
+        self.lock = threading.Lock()
+
+    def apply(self, session: str, chunk: int, resume_token: str, digest: str,
+              lines: list[dict]) -> tuple[int, dict]:
+        """(ステータス, 応答)."""
+        with self.lock:
+            state = self.sessions.setdefault(session, {"token": "", "acks": {}})
+            if chunk in state["acks"]:
+                acked_digest, ack = state["acks"][chunk]
+                if acked_digest != digest:
+                    return 409, {"error": "chunk already applied with a different body"}
+                return 200, ack  # 応答が失われたチャンクの再送
+            if resume_token != state["token"] or chunk != len(state["acks"]):
+                return 409, {"error": "resume token mismatch", "expected_chunk": len(state["acks"])}
+            upserted = deleted = 0
+            for line in lines:
+                if line["op"] == "upsert":
+                    self.rows[line["row"]["id"]] = line["row"]
+                    upserted += 1
+                elif self.rows.pop(line["id"], None) is not None:
+                    deleted += 1
+            state["token"] = hashlib.sha256(f"{session}:{chunk}".encode()).hexdigest()[:16]
+            ack = {"resume_token": state["token"], "upserted": upserted, "deleted": deleted,
+                   "rows": len(self.rows)}
+            state["acks"][chunk] = (digest, ack)
+            return 200, ack
+
+
+def make_stub_server(port: int = 0, table: StubTable | None = None) -> ThreadingHTTPServer:
+    """同期 API のスタブ（127.0.0.1:port、0 なら空きポート）. server.table でテーブルを参照できる."""
+    table = table or StubTable()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, body: dict) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status in (429, 503):
+                self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with table.lock:
+                table.requests += 1
+                fault = table.faults.pop(0) if table.faults else None
+            if isinstance(fault, int):
+                self._reply(fault, {"error": "injected fault"})
+                return
+            digest = body_digest(body)
+            if self.headers.get("X-Sync-Digest", digest) != digest:
+                self._reply(400, {"error": "digest mismatch"})
+                return
+            try:
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+                chunk = int(self.headers.get("X-Sync-Chunk", 0))
+            except (OSError, ValueError):
+                self._reply(400, {"error": "invalid gzip ndjson"})
+                return
+            status, ack = table.apply(self.headers.get("X-Sync-Session", ""), chunk,
+                                      self.headers.get("X-Resume-Token", ""), digest, lines)
+            if fault == "drop":
+                self.close_connection = True  # 適用したが応答が届かない
+                return
+            self._reply(status, ack)
+
+        def do_GET(self):
+            with table.lock:
+                self._reply(200, {"requests": table.requests, "rows": table.rows})
+
+        def log_message(self, fmt, *args):
+            print(f"[stub] {self.command} {self.path} {args[1] if len(args) > 1 else ''}", file=sys.stderr)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.table = table
+    return server
+
+
+def parse_faults(value: str) -> list:
+    return [int(f) if f.isdigit() else f for f in value.split(",") if f]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="記事メタデータを BigQuery に差分同期")
+    parser.add_argument("--dry-run", action="store_true", help="差分の表示のみ（送信・マニフェスト更新なし）")
+    parser.add_argument("--full", action="store_true", help="マニフェストを無視して全行を送る")
+    parser.add_argument("--url", default=os.environ.get("SYNC_API_URL", ""), help="同期 API（既定: SYNC_API_URL）")
+    parser.add_argument("--serve-stub", type=int, metavar="PORT", help="同期 API のスタブを起動する")
+    parser.add_argument("--stub-faults", type=parse_faults, default=[], metavar="LIST",
+                        help="スタブが順に返す障害（例: 503,drop,429）")
+    args = parser.parse_args()
+
+    if args.serve_stub is not None:
+        server = make_stub_server(args.serve_stub, StubTable(args.stub_faults))
+        print(f"BigQuery sync stub: http://127.0.0.1:{server.server_address[1]}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if not sync(args.url, os.environ.get("ID_TOKEN", ""), full=args.full, dry_run=args.dry_run):
+        print("BigQuery sync incomplete: the next run resumes from the last acknowledged chunk")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
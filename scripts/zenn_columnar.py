@@ -0,0 +1,75 @@
+"""記事単位のテーブルを列指向ファイルに書き出す（BigQuery への一括ロード用）.
+
+pyarrow があれば Parquet（zstd 圧縮）、無い環境では同じ列の NDJSON に書く
+（拡張子で判別する。どちらも `bq load` でそのまま読める）。
+Parquet は read_table でメモリマップして読める（pyarrow が必要）。
+
+列の型は文字列で宣言し、pyarrow がある時だけ Arrow の型に変換する:
+  "string" / "int64" / "float64" / "bool"
+  ("list", 要素の型)                      例: ("list", "string")
+  ("struct", [(名前, 型), ...])           例: ("list", ("struct", [("language", "string"), ("blocks", "int64")]))
+  ("dictionary", "string")                値の種類が少ない列（type / emoji / topics 等）を辞書エンコードする
+
+使い方:
+  from zenn_columnar import read_table, write_table
+  path = write_table(Path("out.parquet"), rows, [("slug", "string"), ("count", "int64")])
+  # → 実際に書いたパス（pyarrow が無ければ out.ndjson）
+  table = read_table(path)  # pyarrow.Table
+"""
+
+import json
+from pathlib import Path
+
+from zenn_corpus import atomic_write
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+PARQUET_COMPRESSION = "zstd"
+
+
+def arrow_type(spec):
+    """列の型宣言 → pyarrow の型."""
+    if isinstance(spec, tuple):
+        kind, inner = spec
+        if kind == "list":
+            return pyarrow.list_(arrow_type(inner))
+        if kind == "struct":
+            return pyarrow.struct([(name, arrow_type(t)) for name, t in inner])
+        if kind == "dictionary":
+            return pyarrow.dictionary(pyarrow.int32(), arrow_type(inner))
+        raise ValueError(f"unknown column type: {spec}")
+    return {
+        "string": pyarrow.string(),
+        "int64": pyarrow.int64(),
+        "float64": pyarrow.float64(),
+        "bool": pyarrow.bool_(),
+    }[spec]
+
+
+def write_table(path: Path, rows: list[dict], columns: list[tuple[str, object]]) -> Path:
+    """rows を columns の列順で書き出し、書いたファイルのパスを返す."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    names = [name for name, _ in columns]
+    if pyarrow is not None:
+        schema = pyarrow.schema([(name, arrow_type(spec)) for name, spec in columns])
+        table = pyarrow.Table.from_pylist([{n: row.get(n) for n in names} for row in rows], schema=schema)
+        tmp = path.with_name(f".{path.name}.tmp")
+        pyarrow.parquet.write_table(table, tmp, compression=PARQUET_COMPRESSION)
+        tmp.replace(path)
+        return path
+    path = path.with_suffix(".ndjson")
+    atomic_write(path, "".join(
+        json.dumps({n: row.get(n) for n in names}, ensure_ascii=False) + "\n" for row in rows
+    ))
+    return path
+
+
+def read_table(path: Path, columns: list[str] | None = None):
+    """write_table で書いた Parquet をメモリマップして pyarrow.Table で返す（辞書エンコードは保たれる）."""
+    if pyarrow is None:
+        raise RuntimeError("Parquet の読み込みには pyarrow が必要です（pip install pyarrow）")
+    return pyarrow.parquet.read_table(path, columns=columns, memory_map=True)
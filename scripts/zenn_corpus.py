@@ -0,0 +1,386 @@
+"""Zenn 記事コーパスの共通ローダー.
+
+articles/*.md を1ファイルにつき1回だけ読み込み、front matter・本文オフセット・
+コードフェンス位置・行インデックスを持つ Article レコードを返す。
+各スクリプトはこのレコードを使い、記事ファイルを自前で再読込・再分割しない。
+
+パース結果は .zenn-cache/corpus.json に (path, size, mtime_ns, sha256) をキーに
+永続化する。変更のないファイルはキャッシュから復元され、本文は必要になるまで
+読み込まない。ZENN_CACHE=0 でキャッシュを無効化できる。
+
+使い方:
+  from zenn_corpus import load_corpus
+  corpus = load_corpus()              # slug → Article（ファイル名順）
+  for slug, article in corpus.items():
+      article.fm.get("published")     # 引用符を除いた値
+      article.raw_fm.get("title")     # 引用符付きの生の値
+      article.body                    # front matter 以降の本文
+      article.memo("lint/1", fn)      # fn(article) の結果をキャッシュに保存
+
+.github/scripts/ など scripts/ 外から使う場合は sys.path に scripts/ を追加する。
+"""
+
+import atexit
+import bisect
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ARTICLES_DIR = REPO_ROOT / "articles"
+CACHE_DIR = REPO_ROOT / ".zenn-cache"
+CACHE_FILE = CACHE_DIR / "corpus.json"
+CACHE_VERSION = 1  # パーサーや Article の構造を変えたら上げる
+ZENN_ARTICLES_URL = "https://zenn.dev/correlate_dev/articles"  # 公開記事の URL（末尾に slug）
+
+FM_KEY_RE = re.compile(r'^(\w[\w_]*)\s*:\s*(.*)$')
+FENCE_RE = re.compile(r'^(```+|~~~+)')
+HEADING_RE = re.compile(r'^#{1,6} ')
+
+
+def atomic_write(path: Path, content: str | bytes) -> None:
+    """一時ファイル経由でアトミックに書き込む（bytes はそのまま書く）."""
+    dir_ = path.parent
+    fd, tmp_path = tempfile.mkstemp(dir=dir_, suffix=".tmp")
+    try:
+        if isinstance(content, bytes):
+            fh = os.fdopen(fd, "wb")
+        else:
+            fh = os.fdopen(fd, "w", encoding="utf-8")
+        with fh:
+            fh.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class Article:
+    """1記事分のパース結果.
+
+    行番号はすべて 0 始まり（lines のインデックス）。
+    fm_end は閉じ `---` の行番号で、front matter が無い/閉じていない場合は None。
+    fences はコードフェンスの (開始行, 終了行) で、未閉じの場合の終了行は len(lines)。
+    text / lines / line_offsets は初回アクセス時にファイルから読み込む。
+    """
+
+    path: Path
+    raw_fm: dict[str, str]
+    fm_lines: list[str]
+    fm_end: int | None
+    body_line: int
+    body_start: int
+    fences: list[tuple[int, int]] = field(default_factory=list)
+    stats: dict[str, int] = field(default_factory=dict)
+    derived: dict = field(default_factory=dict)
+    sha256: str = ""
+
+    @property
+    def slug(self) -> str:
+        return self.path.stem
+
+    @property
+    def filename(self) -> str:
+        return self.path.name
+
+    @cached_property
+    def text(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+    @cached_property
+    def lines(self) -> list[str]:
+        return self.text.splitlines()
+
+    @cached_property
+    def line_offsets(self) -> list[int]:
+        offsets = []
+        pos = 0
+        for ln in self.text.splitlines(keepends=True):
+            offsets.append(pos)
+            pos += len(ln)
+        return offsets
+
+    @cached_property
+    def fm(self) -> dict[str, str]:
+        """引用符を除いた front matter の値."""
+        return {k: v.strip('"').strip("'") for k, v in self.raw_fm.items()}
+
+    @property
+    def body(self) -> str:
+        return self.text[self.body_start:]
+
+    @property
+    def line_count(self) -> int:
+        """`text.split("\\n")` と同じ数え方の行数（末尾改行も1行と数える）."""
+        return self.stats["line_count"]
+
+    @property
+    def topics(self) -> list[str]:
+        """インライン配列形式の topics をリストで返す（それ以外は空リスト）."""
+        val = self.raw_fm.get("topics", "")
+        if not (val.startswith("[") and val.endswith("]")):
+            return []
+        return [t.strip().strip('"').strip("'") for t in val[1:-1].split(",") if t.strip()]
+
+    def is_published(self) -> bool:
+        return self.fm.get("published") == "true"
+
+    def release(self) -> None:
+        """読み込んだ本文（text / lines / line_offsets）を破棄する. 次に参照した時に読み直す."""
+        for name in ("text", "lines", "line_offsets"):
+            self.__dict__.pop(name, None)
+
+    def line_at(self, offset: int) -> int:
+        """文字オフセットを含む行番号を返す."""
+        return bisect.bisect_right(self.line_offsets, offset) - 1
+
+    def in_fence(self, line_no: int) -> bool:
+        """行がコードフェンス（開始・終了行を含む）の中にあるか."""
+        i = bisect.bisect_right(self.fences, (line_no, float("inf"))) - 1
+        return i >= 0 and self.fences[i][0] <= line_no <= self.fences[i][1]
+
+    def memo(self, key: str, fn):
+        """fn(article) の結果を derived[key] に保存して返す.
+
+        結果は JSON 化可能な値に限る。記事の内容が変わると破棄される。
+        ロジックを変えたら key のバージョン部分（"lint/2" 等）を上げる。
+        """
+        if key not in self.derived:
+            self.derived[key] = fn(self)
+        return self.derived[key]
+
+
+def scan_frontmatter(lines: list[str]) -> tuple[dict[str, str], list[str], int | None]:
+    """front matter の (生の値 dict, 行リスト, 閉じ行番号) を返す."""
+    if not lines or lines[0].strip() != "---":
+        return {}, [], None
+    for i, line in enumerate(lines[1:], 1):
+        if line.strip() == "---":
+            fm_lines = lines[1:i]
+            raw = {}
+            for fm_line in fm_lines:
+                m = FM_KEY_RE.match(fm_line)
+                if m:
+                    raw[m.group(1)] = m.group(2).strip()
+            return raw, fm_lines, i
+    return {}, [], None
+
+
+def scan_fences(lines: list[str], start: int = 0) -> list[tuple[int, int]]:
+    """コードフェンスの (開始行, 終了行) を返す.
+
+    閉じフェンスは開始と同じ文字で同じ長さ以上、後続が空白のみの行。
+    """
+    fences = []
+    open_line = None
+    open_mark = ""
+    for i in range(start, len(lines)):
+        m = FENCE_RE.match(lines[i].lstrip())
+        if not m:
+            continue
+        mark = m.group(1)
+        if open_line is None:
+            open_line = i
+            open_mark = mark
+        elif (
+            mark[0] == open_mark[0]
+            and len(mark) >= len(open_mark)
+            and not lines[i].lstrip()[len(mark):].strip()
+        ):
+            fences.append((open_line, i))
+            open_line = None
+    if open_line is not None:
+        fences.append((open_line, len(lines)))
+    return fences
+
+
+def body_stats(text: str, lines: list[str], body_line: int, fences: list[tuple[int, int]]) -> dict[str, int]:
+    """本文の基本統計（行数・文字数・見出し数・フェンス数）."""
+    fenced = set()
+    for start, end in fences:
+        fenced.update(range(start, end + 1))
+    headings = [
+        ln for i, ln in enumerate(lines[body_line:], body_line)
+        if i not in fenced and HEADING_RE.match(ln)
+    ]
+    return {
+        "line_count": text.count("\n") + 1,
+        "body_lines": max(0, len(lines) - body_line),
+        "chars": len(text),
+        "headings": len(headings),
+        "h2": sum(1 for h in headings if h.startswith("## ")),
+        "fences": len(fences),
+    }
+
+
+def decode_text(data: bytes) -> str:
+    """Path.read_text() と同じく UTF-8 デコード + 改行を \\n に正規化する."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def parse_article(path: Path, text: str, sha256: str = "") -> Article:
+    """記事テキストを Article にパースする."""
+    lines = text.splitlines()
+    raw_fm, fm_lines, fm_end = scan_frontmatter(lines)
+    if fm_end is None:
+        body_line = 0
+        body_start = 0
+    else:
+        body_line = fm_end + 1
+        body_start = sum(len(ln) for ln in text.splitlines(keepends=True)[:body_line])
+    fences = scan_fences(lines, body_line)
+
+    article = Article(
+        path=path,
+        raw_fm=raw_fm,
+        fm_lines=fm_lines,
+        fm_end=fm_end,
+        body_line=body_line,
+        body_start=body_start,
+        fences=fences,
+        stats=body_stats(text, lines, body_line, fences),
+        sha256=sha256 or hashlib.sha256(text.encode("utf-8")).hexdigest(),
+    )
+    article.__dict__["text"] = text
+    article.__dict__["lines"] = lines
+    return article
+
+
+# ---- 永続キャッシュ ----
+
+class CorpusCache:
+    """パース結果の永続キャッシュ（.zenn-cache/corpus.json）.
+
+    エントリは記事の絶対パスをキーに size / mtime_ns / sha256 とパース結果、
+    memo() の結果を保持する。size と mtime_ns が一致すればファイルを読まずに復元し、
+    一致しなくても sha256 が同じならパースを再利用する。
+    save() 時に存在しなくなったファイルのエントリを削除する。
+    """
+
+    def __init__(self, path: Path = CACHE_FILE):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.loaded: dict[str, Article] = {}
+        self.snapshot = ""
+        try:
+            raw = path.read_text(encoding="utf-8")
+            data = json.loads(raw)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("entries", {})
+                self.snapshot = raw
+        except (OSError, ValueError):
+            pass
+
+    def load(self, path: Path) -> Article:
+        key = str(path.resolve())
+        st = os.stat(key)
+        entry = self.entries.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            article = self.loaded.get(key) or self._restore(path, entry)
+        else:
+            data = Path(key).read_bytes()
+            sha = hashlib.sha256(data).hexdigest()
+            if entry and entry["sha256"] == sha:
+                article = self._restore(path, entry)
+            else:
+                article = parse_article(path, decode_text(data), sha)
+        self.entries[key] = self._entry(article, st)
+        self.loaded[key] = article
+        return article
+
+    @staticmethod
+    def _entry(article: Article, st: os.stat_result) -> dict:
+        return {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": article.sha256,
+            "article": {
+                "raw_fm": article.raw_fm,
+                "fm_lines": article.fm_lines,
+                "fm_end": article.fm_end,
+                "body_line": article.body_line,
+                "body_start": article.body_start,
+                "fences": article.fences,
+                "stats": article.stats,
+            },
+            "derived": article.derived,
+        }
+
+    @staticmethod
+    def _restore(path: Path, entry: dict) -> Article:
+        a = entry["article"]
+        return Article(
+            path=path,
+            raw_fm=a["raw_fm"],
+            fm_lines=a["fm_lines"],
+            fm_end=a["fm_end"],
+            body_line=a["body_line"],
+            body_start=a["body_start"],
+            fences=[tuple(f) for f in a["fences"]],
+            stats=a["stats"],
+            derived=entry.get("derived", {}),
+            sha256=entry["sha256"],
+        )
+
+    def save(self) -> None:
+        """削除済みファイルのエントリを除いて書き出す（内容が変わった時のみ）."""
+        for key in [k for k in self.entries if k not in self.loaded and not os.path.exists(k)]:
+            del self.entries[key]
+        raw = json.dumps({"version": CACHE_VERSION, "entries": self.entries}, ensure_ascii=False)
+        if raw == self.snapshot:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, raw)
+        self.snapshot = raw
+
+
+_cache: CorpusCache | None = None
+
+
+def get_cache() -> CorpusCache | None:
+    """プロセス共通のキャッシュ（ZENN_CACHE=0 なら None）. 終了時に自動保存する."""
+    global _cache
+    if os.environ.get("ZENN_CACHE", "1") == "0":
+        return None
+    if _cache is None:
+        _cache = CorpusCache()
+        atexit.register(_save_cache)
+    return _cache
+
+
+def _save_cache() -> None:
+    try:
+        _cache.save()
+    except OSError:
+        pass  # キャッシュ書き込み失敗は無視（読み取り専用環境など）
+
+
+def load_article(path: Path, cache: bool = True) -> Article:
+    path = Path(path)
+    store = get_cache() if cache else None
+    if store is None:
+        return parse_article(path, path.read_text(encoding="utf-8"))
+    return store.load(path)
+
+
+def load_corpus(paths=None, articles_dir: Path = ARTICLES_DIR, cache: bool = True) -> dict[str, Article]:
+    """記事を読み込んで slug → Article の dict を返す（パス順）.
+
+    paths 未指定時は articles_dir/*.md をすべて対象にする。
+    """
+    if paths is None:
+        paths = articles_dir.glob("*.md")
+    corpus = {}
+    for path in sorted(Path(p) for p in paths):
+        article = load_article(path, cache)
+        corpus[article.slug] = article
+    return corpus
@@ -0,0 +1,466 @@
+"""Discord Webhook への通知（公開・公開失敗・リトライ予約をまとめて送る）.
+
+各スクリプトは通知を Notice（種別 + slug）として deliver() に渡す。deliver は
+  1. 前回までに届けられなかった通知（スプール）と今回の通知を合わせ、
+  2. 種別ごとに1つの embed（行が多ければ複数）にまとめ、
+  3. 1メッセージ MAX_EMBEDS 個・合計 MAX_MESSAGE_CHARS 文字以内に詰めて、
+  4. 1本の keep-alive 接続で順に送る。
+送信は Discord のレート制限ヘッダーに従う（X-RateLimit-Remaining が 0 なら
+X-RateLimit-Reset-After だけ待つ。429 は retry_after / Retry-After だけ待って送り直す）。
+5xx・接続エラーは指数バックオフ + ジッターで MAX_ATTEMPTS 回まで送り直し、それでも
+届かなければ残りの通知を .zenn-cache/discord-spool/ に書いて次回の実行で送る
+（Webhook ごとに別ファイル。SPOOL_MAX_AGE_DAYS より古い通知は捨てる）。
+400 など送り直しても通らない応答の通知はスプールせずに捨てる。
+Webhook には冪等キーが無いので、応答だけが失われた場合は同じメッセージが2回届くことがある。
+
+Webhook の URL が空なら何も送らず、スプールもしない（通知を止めている間に溜めない）。
+
+使い方:
+  from zenn_discord import Notice, deliver, webhook_url
+  deliver([Notice("published", slug) for slug in slugs], webhook_url())
+
+  python3 scripts/zenn_discord.py               # スプールに残った通知を送る
+  python3 scripts/zenn_discord.py --list        # スプールの内容を表示
+  python3 scripts/zenn_discord.py --serve-stub 8766 [--stub-faults 503,429,drop]
+      # オフライン確認用の Webhook スタブ（http://127.0.0.1:8766/webhook）。
+      # Discord と同じ上限（embed 数・文字数）で検証し、レート制限ヘッダーと 429 を返す。
+      # GET で受け取ったメッセージを返す
+  DISCORD_WEBHOOK_CONTENT=http://127.0.0.1:8766/webhook python3 scripts/notify-discord-publish.py
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from zenn_corpus import CACHE_DIR, ZENN_ARTICLES_URL, atomic_write
+
+WEBHOOK_ENV = "DISCORD_WEBHOOK_CONTENT"
+SPOOL_DIR = CACHE_DIR / "discord-spool"
+SPOOL_MAX_AGE_DAYS = 7
+
+# Discord の上限
+MAX_EMBEDS = 10
+MAX_DESCRIPTION_CHARS = 4096
+MAX_MESSAGE_CHARS = 6000  # 1メッセージの全 embed の title + description + footer の合計
+LINES_PER_EMBED = 25
+
+REQUEST_TIMEOUT = 10
+MAX_ATTEMPTS = 4
+RETRY_BASE_SEC = 1.0
+MAX_WAIT_SEC = 60.0  # これより長いレート制限はこの実行では待たずにスプールする
+JST = timezone(timedelta(hours=9))
+
+# 種別 → (embed のタイトル, 色, 行の下に添える説明)
+KINDS = {
+    "published": ("📝 Zenn {n}本 公開", 3066993, ""),
+    "failed": ("🚨 Zenn公開失敗検知 {n}件", 15158332,
+               "published: true のまま維持。次回push時にZennが自動リトライします。\n"
+               "確認: https://zenn.dev/dashboard"),
+    "retry": ("🔁 リトライ予約 {n}件", 15105570, ""),
+}
+
+
+@dataclass
+class Notice:
+    """通知1件. detail は種別ごとの補足（retry なら予約時刻）."""
+
+    kind: str
+    slug: str
+    title: str = ""
+    detail: str = ""
+    ts: str = field(default_factory=lambda: datetime.now(JST).isoformat(timespec="seconds"))
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+    def line(self) -> str:
+        url = f"{ZENN_ARTICLES_URL}/{self.slug}"
+        if self.kind == "published":
+            return f"- [{self.slug}]({url})"
+        if self.kind == "failed":
+            title = f" ({self.title[:30]}...)" if self.title else ""
+            return f"- `{self.slug}`{title}"
+        return f"- [{self.slug}]({url}) → {self.detail} に予約"
+
+
+def webhook_url() -> str:
+    return os.environ.get(WEBHOOK_ENV, "")
+
+
+# ---- まとめる ----
+
+def build_embeds(notices: list[Notice]) -> list[tuple[dict, list[str]]]:
+    """通知を種別ごと（KINDS の順）の embed にまとめ、(embed, 含まれる通知の id) を返す."""
+    embeds = []
+    for kind, (title, color, note) in KINDS.items():
+        group = [n for n in notices if n.kind == kind]
+        if not group:
+            continue
+        limit = MAX_DESCRIPTION_CHARS - len(note) - 2
+        parts, part, size = [], [], 0
+        for notice in group:
+            line = notice.line()
+            if part and (len(part) >= LINES_PER_EMBED or size + len(line) + 1 > limit):
+                parts.append(part)
+                part, size = [], 0
+            part.append((notice, line))
+            size += len(line) + 1
+        parts.append(part)
+        for i, part in enumerate(parts, 1):
+            heading = title.format(n=len(group)) + (f" ({i}/{len(parts)})" if len(parts) > 1 else "")
+            description = "\n".join(line for _, line in part)
+            if note:
+                description += "\n\n" + note
+            embed = {"title": heading, "description": description[:MAX_DESCRIPTION_CHARS],
+                     "color": color, "timestamp": part[0][0].ts}
+            embeds.append((embed, [n.id for n, _ in part]))
+    return embeds
+
+
+def embed_chars(embed: dict) -> int:
+    return len(embed.get("title", "")) + len(embed.get("description", "")) + len(embed.get("footer", {}).get("text", ""))
+
+
+def build_messages(notices: list[Notice]) -> list[tuple[dict, list[str]]]:
+    """embed を MAX_EMBEDS 個・MAX_MESSAGE_CHARS 文字以内のメッセージに詰める."""
+    messages, embeds, ids, size = [], [], [], 0
+    for embed, embed_ids in build_embeds(notices):
+        chars = embed_chars(embed)
+        if embeds and (len(embeds) >= MAX_EMBEDS or size + chars > MAX_MESSAGE_CHARS):
+            messages.append(({"embeds": embeds}, ids))
+            embeds, ids, size = [], [], 0
+        embeds.append(embed)
+        ids.extend(embed_ids)
+        size += chars
+    if embeds:
+        messages.append(({"embeds": embeds}, ids))
+    return messages
+
+
+# ---- スプール ----
+
+def spool_path(url: str, spool_dir: Path = SPOOL_DIR) -> Path:
+    """Webhook ごとのスプール（URL にトークンが含まれるのでハッシュをファイル名にする）."""
+    return spool_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}.jsonl"
+
+
+def load_spool(path: Path) -> list[Notice]:
+    """スプールの通知（SPOOL_MAX_AGE_DAYS より古いもの・壊れた行は捨てる）."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return []
+    cutoff = datetime.now(JST) - timedelta(days=SPOOL_MAX_AGE_DAYS)
+    notices = []
+    for line in text.splitlines():
+        try:
+            notice = Notice(**json.loads(line))
+            if datetime.fromisoformat(notice.ts) >= cutoff:
+                notices.append(notice)
+        except (TypeError, ValueError):
+            continue
+    return notices
+
+
+def save_spool(path: Path, notices: list[Notice]) -> None:
+    if not notices:
+        path.unlink(missing_ok=True)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(path, "".join(json.dumps(asdict(n), ensure_ascii=False) + "\n" for n in notices))
+
+
+# ---- 送信 ----
+
+class DeliveryFailed(Exception):
+    """送り直しても届かなかった（次回の実行に回す）."""
+
+
+class Rejected(Exception):
+    """送り直しても通らない応答（400 など）."""
+
+
+class Webhook:
+    """1本の keep-alive 接続で送る Webhook クライアント（レート制限ヘッダーに従う）."""
+
+    def __init__(self, url: str, sleep=time.sleep):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.netloc
+        query = f"{parts.query}&wait=true" if parts.query else "wait=true"
+        self.path = f"{parts.path or '/'}?{query}"  # wait=true: 作成したメッセージを 200 で返させる
+        self.conn = None
+        self.ready_at = 0.0  # バケットが空になった時、次に送れる時刻（monotonic）
+        self.sleep = sleep
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _request(self, body: bytes) -> tuple[int, dict, bytes]:
+        if self.conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self.conn = cls(self.host, timeout=REQUEST_TIMEOUT)
+        try:
+            self.conn.request("POST", self.path, body=body, headers={
+                "Content-Type": "application/json",
+                "User-Agent": "zenn-content-notifier",
+            })
+            resp = self.conn.getresponse()
+            data = resp.read()
+        except BaseException:
+            self.close()
+            raise
+        if resp.will_close:
+            self.close()
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, data
+
+    def _wait(self, seconds: float) -> None:
+        if seconds > MAX_WAIT_SEC:
+            raise DeliveryFailed(f"rate limited for {seconds:.0f}s")
+        if seconds > 0:
+            self.sleep(seconds)
+
+    def post(self, payload: dict) -> None:
+        """1メッセージを送る. 届かなければ DeliveryFailed、通らなければ Rejected."""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        error = ""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self._wait(self.ready_at - time.monotonic())
+            try:
+                status, headers, data = self._request(body)
+            except (OSError, http.client.HTTPException) as e:
+                status, headers, data = None, {}, b""
+                error = str(e) or type(e).__name__
+            if status is not None and headers.get("x-ratelimit-remaining") == "0":
+                self.ready_at = time.monotonic() + float(headers.get("x-ratelimit-reset-after", 0) or 0)
+            if status is not None and 200 <= status < 300:
+                return
+            if status == 429:
+                try:
+                    delay = float(json.loads(data or b"{}").get("retry_after"))
+                except (TypeError, ValueError, AttributeError):
+                    delay = float(headers.get("retry-after", 1) or 1)
+                print(f"  Discord: 429 — {delay:.1f}s 待って再送 ({attempt}/{MAX_ATTEMPTS - 1})")
+                self._wait(delay)
+                error = "HTTP 429"
+                continue
+            if status is not None and status < 500:
+                raise Rejected(f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}")
+            if status is not None:
+                error = f"HTTP {status}"
+            if attempt < MAX_ATTEMPTS:
+                delay = RETRY_BASE_SEC * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+                print(f"  Discord: {error} — {delay:.1f}s 後に再送 ({attempt}/{MAX_ATTEMPTS - 1})")
+                self._wait(delay)
+        raise DeliveryFailed(error)
+
+
+def dedupe(notices: list[Notice]) -> list[Notice]:
+    """同じ (kind, slug, detail) の通知を ts が最も新しい1件にまとめる（並びは最初に現れた位置）.
+
+    毎時の検証が同じ記事の失敗をスプールに積み続けても、届くのは1行になる。
+    """
+    latest: dict[tuple[str, str, str], Notice] = {}
+    for n in notices:
+        key = (n.kind, n.slug, n.detail)
+        if key not in latest or n.ts >= latest[key].ts:
+            latest[key] = n
+    return list(latest.values())
+
+
+def deliver(notices: list[Notice], url: str, spool_dir: Path = SPOOL_DIR) -> bool:
+    """スプールの通知と notices をまとめて送る. 届かなかった分はスプールに残す.
+
+    全て送れた（または URL が空）なら True. 通知の失敗で呼び出し元を止めないよう例外は投げない。
+    """
+    if not url:
+        print(f"{WEBHOOK_ENV} not set, skipping Discord notification")
+        return True
+    path = spool_path(url, spool_dir)
+    spooled = load_spool(path)
+    pending = dedupe(spooled + notices)
+    if not pending:
+        return True
+    if spooled:
+        print(f"Discord: 前回届かなかった通知 {len(spooled)}件を合わせて送ります")
+
+    delivered: set[str] = set()
+    messages = build_messages(pending)
+    with Webhook(url) as hook:
+        for i, (payload, ids) in enumerate(messages, 1):
+            try:
+                hook.post(payload)
+            except Rejected as e:
+                print(f"Discord: メッセージ {i}/{len(messages)} が拒否されました（破棄）: {e}", file=sys.stderr)
+            except DeliveryFailed as e:
+                print(f"Discord: メッセージ {i}/{len(messages)} を送れませんでした: {e}", file=sys.stderr)
+                break
+            delivered.update(ids)
+
+    rest = [n for n in pending if n.id not in delivered]
+    try:
+        save_spool(path, rest)
+    except OSError as e:
+        print(f"Discord: スプールを保存できませんでした: {e}", file=sys.stderr)
+    sent = len(pending) - len(rest)
+    print(f"Discord: {sent}件の通知を送信" + (f"、{len(rest)}件は次回に送ります" if rest else ""))
+    return not rest
+
+
+# ---- オフライン確認用スタブ ----
+
+class StubWebhook:
+    """Webhook スタブが受け取ったメッセージとレート制限のバケット.
+
+    limit 件 / window 秒を超えると 429 を返す。faults には先頭のリクエストから順に返す
+    障害を入れる（HTTP ステータスの int か、"drop" = 受け取った後に応答せず切断）。
+    """
+
+    def __init__(self, faults: list | None = None, limit: int = 5, window: float = 2.0):
+        self.messages: list[dict] = []
+        self.requests = 0
+        self.faults = list(faults or [])
+        self.limit = limit
+        self.window = window
+        self.sent: list[float] = []  # 直近 window 秒に受け付けた時刻
+        self.lock = threading.Lock()
+
+    def validate(self, payload: dict) -> str:
+        """Discord が 400 を返す内容ならその理由."""
+        embeds = payload.get("embeds", [])
+        if not embeds and not payload.get("content"):
+            return "empty message"
+        if len(embeds) > MAX_EMBEDS:
+            return f"{len(embeds)} embeds (max {MAX_EMBEDS})"
+        if any(len(e.get("description", "")) > MAX_DESCRIPTION_CHARS for e in embeds):
+            return "embed description too long"
+        if sum(embed_chars(e) for e in embeds) > MAX_MESSAGE_CHARS:
+            return "embeds too large"
+        return ""
+
+    def bucket(self) -> tuple[int, float]:
+        """(残り件数, リセットまでの秒数)."""
+        now = time.monotonic()
+        self.sent = [t for t in self.sent if now - t < self.window]
+        reset_after = self.window - (now - self.sent[0]) if self.sent else self.window
+        return self.limit - len(self.sent), reset_after
+
+
+def make_stub_server(port: int = 0, stub: StubWebhook | None = None) -> ThreadingHTTPServer:
+    """Webhook のスタブ（127.0.0.1:port、0 なら空きポート）. server.stub で受信内容を参照できる."""
+    stub = stub or StubWebhook()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def _reply(self, status: int, body: dict, headers: dict | None = None) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with stub.lock:
+                stub.requests += 1
+                fault = stub.faults.pop(0) if stub.faults else None
+                if isinstance(fault, int):
+                    extra = {"Retry-After": "0"} if fault in (429, 503) else {}
+                    self._reply(fault, {"message": "injected fault", "retry_after": 0}, extra)
+                    return
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self._reply(400, {"message": "Cannot send an empty message", "code": 50006})
+                    return
+                if reason := stub.validate(payload):
+                    self._reply(400, {"message": f"Invalid Form Body: {reason}", "code": 50035})
+                    return
+                remaining, reset_after = stub.bucket()
+                if remaining <= 0:
+                    self._reply(429, {"message": "You are being rate limited.", "retry_after": round(reset_after, 3),
+                                      "global": False},
+                                {"Retry-After": str(max(1, round(reset_after))), "X-RateLimit-Limit": str(stub.limit),
+                                 "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                                 "X-RateLimit-Scope": "user"})
+                    return
+                stub.sent.append(time.monotonic())
+                stub.messages.append(payload)
+                remaining, reset_after = stub.bucket()
+                headers = {"X-RateLimit-Limit": str(stub.limit), "X-RateLimit-Remaining": str(remaining),
+                           "X-RateLimit-Reset-After": f"{reset_after:.3f}", "X-RateLimit-Bucket": "stub"}
+            if fault == "drop":
+                self.close_connection = True  # 受け取ったが応答が届かない
+                return
+            self._reply(200, {"id": str(len(stub.messages)), **payload}, headers)
+
+        def do_GET(self):
+            with stub.lock:
+                self._reply(200, {"requests": stub.requests, "messages": stub.messages})
+
+        def log_message(self, fmt, *args):
+            print(f"[stub] {self.command} {self.path} {args[1] if len(args) > 1 else ''}", file=sys.stderr)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.stub = stub
+    return server
+
+
+def parse_faults(value: str) -> list:
+    return [int(f) if f.isdigit() else f for f in value.split(",") if f]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discord 通知のスプールを送る")
+    parser.add_argument("--url", default=webhook_url(), help=f"Webhook（既定: {WEBHOOK_ENV}）")
+    parser.add_argument("--list", action="store_true", help="スプールの内容を表示する（送らない）")
+    parser.add_argument("--serve-stub", type=int, metavar="PORT", help="Webhook のスタブを起動する")
+    parser.add_argument("--stub-faults", type=parse_faults, default=[], metavar="LIST",
+                        help="スタブが順に返す障害（例: 503,429,drop）")
+    args = parser.parse_args()
+
+    if args.serve_stub is not None:
+        server = make_stub_server(args.serve_stub, StubWebhook(args.stub_faults))
+        print(f"Discord webhook stub: http://127.0.0.1:{server.server_address[1]}/webhook")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.list:
+        if not args.url:
+            print(f"{WEBHOOK_ENV} not set")
+            return
+        for notice in load_spool(spool_path(args.url)):
+            print(f"{notice.ts} {notice.kind:9s} {notice.slug} {notice.detail}")
+        return
+
+    if not deliver([], args.url):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""公開処理の追記専用イベントログ（公開履歴・失敗記録・リトライキューの共通ソース）.
+
+scripts/.publish-events.jsonl に1行1イベントの JSON を追記し、状態は読み込み時に
+イベントを時刻順に再生して作る。従来の3つの JSON ファイル
+（scripts/.publish-history.json / scripts/.publish-failures.json /
+.github/scripts/.zenn-retry-queue.json）を置き換える。
+
+イベント（共通キー: id, ts（JST の ISO 8601）, type, slug）:
+  published          公開した（date: "YYYY-MM-DD"）
+  failed             公開失敗（count: 件数。省略時 1。旧失敗ログからの移行時のみ 2 以上）
+  failure_cleared    公開を確認したので失敗記録を消す
+  failure_abandoned  失敗回数が上限に達したので手動対応に回す（失敗記録から外す）
+  queued             リトライキューに追加（title, file）
+  dequeued           リトライキューから外した（予約済み・ファイル無し）
+
+ビュー（PublishState）:
+  published_dates   公開した日付（"published today" / 連続公開の判定）
+  failures          slug → {count, last_failed}（クールダウン判定・失敗通知）
+  retry_queue       キューに残っている記事（追加順）
+
+保持期間: RETENTION_DAYS より古いイベントは再生しない（公開履歴・失敗記録・
+リトライキューとも30日）。追記のたびに期限切れの行を落として書き直す（compact）。
+
+同時実行:
+  - 同じチェックアウト内では .zenn-cache/publish-events.lock の flock で追記・compact を直列化する
+  - 別の run とは git でマージする。行の追加・削除だけなので .gitattributes の
+    merge=union で衝突せず、重複行は id で1回だけ再生する。compact で消えた行が
+    マージで戻っても期限切れなので再生されない
+
+使い方:
+  from zenn_events import EventLog
+  log = EventLog()
+  state = log.state()
+  state.published_on("2026-05-01"); state.in_cooldown("my-slug", hours=48)
+  log.append(log.event("published", "my-slug", date="2026-05-01"))
+
+  python3 scripts/zenn_events.py show      # 現在のビュー
+  python3 scripts/zenn_events.py compact   # 期限切れイベントを削除
+"""
+
+import json
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from zenn_corpus import REPO_ROOT
+
+try:
+    import fcntl
+except ImportError:  # Windows: ロックなし（CI は Linux）
+    fcntl = None
+
+# リポジトリルートからの相対パス
+EVENT_LOG = Path("scripts/.publish-events.jsonl")
+LOCK_FILE = Path(".zenn-cache/publish-events.lock")
+LEGACY_HISTORY = Path("scripts/.publish-history.json")
+LEGACY_FAILURES = Path("scripts/.publish-failures.json")
+LEGACY_RETRY_QUEUE = Path(".github/scripts/.zenn-retry-queue.json")
+
+RETENTION_DAYS = 30
+JST = timezone(timedelta(hours=9))
+EVENT_TYPES = {"published", "failed", "failure_cleared", "failure_abandoned", "queued", "dequeued"}
+
+
+def parse_ts(ts: str) -> datetime:
+    moment = datetime.fromisoformat(ts)
+    return moment if moment.tzinfo else moment.replace(tzinfo=JST)
+
+
+@dataclass
+class PublishState:
+    """イベントを再生した結果."""
+
+    published_dates: list[str] = field(default_factory=list)
+    failures: dict[str, dict] = field(default_factory=dict)
+    retry_queue: list[dict] = field(default_factory=list)
+
+    def published_on(self, date: str) -> bool:
+        return date in self.published_dates
+
+    def in_cooldown(self, slug: str, hours: float, now: datetime | None = None) -> bool:
+        """最後の失敗から hours 時間以内か."""
+        entry = self.failures.get(slug)
+        if not entry:
+            return False
+        try:
+            last_failed = parse_ts(entry["last_failed"])
+        except (KeyError, ValueError):
+            return False
+        return (now or datetime.now(JST)) - last_failed < timedelta(hours=hours)
+
+    def queued(self, slug: str) -> bool:
+        return any(item["slug"] == slug for item in self.retry_queue)
+
+
+def replay(events: list[dict]) -> PublishState:
+    """時刻順のイベントからビューを作る."""
+    state = PublishState()
+    dates = set()
+    queue: dict[str, dict] = {}
+    for e in events:
+        kind, slug = e["type"], e.get("slug", "")
+        if kind == "published":
+            dates.add(e["date"])
+        elif kind == "failed":
+            entry = state.failures.setdefault(slug, {"count": 0, "last_failed": e["ts"]})
+            entry["count"] += e.get("count", 1)
+            entry["last_failed"] = e["ts"]
+        elif kind in ("failure_cleared", "failure_abandoned"):
+            state.failures.pop(slug, None)
+        elif kind == "queued":
+            queue.setdefault(slug, {
+                "slug": slug, "title": e.get("title", slug), "file": e.get("file", ""), "detected_at": e["ts"],
+            })
+        elif kind == "dequeued":
+            queue.pop(slug, None)
+    state.published_dates = sorted(dates)
+    state.retry_queue = list(queue.values())
+    return state
+
+
+class EventLog:
+    """scripts/.publish-events.jsonl の読み書き."""
+
+    def __init__(self, root: Path = REPO_ROOT):
+        self.root = Path(root)
+        self.path = self.root / EVENT_LOG
+
+    @staticmethod
+    def event(type: str, slug: str = "", ts: datetime | None = None, **data) -> dict:
+        """新しいイベント（id と JST の ts を付ける）."""
+        if type not in EVENT_TYPES:
+            raise ValueError(f"unknown event type: {type}")
+        moment = (ts or datetime.now(JST)).astimezone(JST)
+        return {"id": uuid.uuid4().hex[:12], "ts": moment.isoformat(), "type": type, "slug": slug, **data}
+
+    def _read(self) -> list[dict]:
+        """ファイルの全イベント（壊れた行は無視、id の重複は最初の1件）."""
+        try:
+            raw = self.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return self._legacy_events()
+        events, seen = [], set()
+        for line in raw.splitlines():
+            try:
+                e = json.loads(line)
+                parse_ts(e["ts"])
+            except (ValueError, KeyError, TypeError):
+                continue  # 途中で中断した追記など
+            if e.get("id") in seen:
+                continue
+            seen.add(e.get("id"))
+            events.append(e)
+        return events
+
+    def events(self, now: datetime | None = None) -> list[dict]:
+        """保持期間内のイベント（時刻順）."""
+        cutoff = (now or datetime.now(JST)) - timedelta(days=RETENTION_DAYS)
+        live = [e for e in self._read() if parse_ts(e["ts"]) >= cutoff]
+        return sorted(live, key=lambda e: parse_ts(e["ts"]))
+
+    def state(self, now: datetime | None = None) -> PublishState:
+        return replay(self.events(now))
+
+    @contextmanager
+    def _locked(self):
+        lock_path = self.root / LOCK_FILE
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def append(self, *events: dict) -> None:
+        """イベントを追記し、期限切れの行があれば落とす."""
+        if not events:
+            return
+        lines = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+        with self._locked():
+            if not self.path.exists():
+                self._write(self._legacy_events())
+            with open(self.path, "rb") as fh:
+                if fh.seek(0, os.SEEK_END) and (fh.seek(-1, os.SEEK_END), fh.read(1))[1] != b"\n":
+                    lines = "\n" + lines  # 中断した追記の残り（壊れた行）と混ざらないようにする
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(lines)
+                fh.flush()
+                os.fsync(fh.fileno())
+            self._compact_locked()
+
+    def compact(self, now: datetime | None = None) -> int:
+        """期限切れイベントを削除して書き直し、削除した件数を返す."""
+        with self._locked():
+            return self._compact_locked(now)
+
+    def _compact_locked(self, now: datetime | None = None) -> int:
+        if not self.path.exists():
+            return 0
+        every = self._read()
+        live = self.events(now)
+        if len(live) == len(every):
+            return 0
+        self._write(live)
+        return len(every) - len(live)
+
+    def _write(self, events: list[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _legacy_events(self) -> list[dict]:
+        """旧 JSON ファイル（イベントログが無い場合のみ）をイベントに変換する."""
+        def load(rel, default):
+            try:
+                return json.loads((self.root / rel).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return default
+
+        events = []
+        for date in load(LEGACY_HISTORY, {}).get("dates", []):
+            events.append(self.event("published", ts=parse_ts(f"{date}T00:00:00+09:00"), date=date))
+        for slug, entry in load(LEGACY_FAILURES, {}).items():
+            try:
+                ts = parse_ts(entry["last_failed"])
+            except (KeyError, ValueError):
+                continue
+            events.append(self.event("failed", slug, ts=ts, count=entry.get("count", 1)))
+        for item in load(LEGACY_RETRY_QUEUE, []):
+            try:
+                ts = parse_ts(item["detected_at"])
+            except (KeyError, ValueError):
+                ts = None
+            events.append(self.event("queued", item["slug"], ts=ts,
+                                     title=item.get("title", item["slug"]), file=item.get("file", "")))
+        return sorted(events, key=lambda e: parse_ts(e["ts"]))
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    log = EventLog()
+    if command == "compact":
+        print(f"削除したイベント: {log.compact()}件")
+    elif command == "show":
+        state = log.state()
+        print(json.dumps({
+            "published_dates": state.published_dates,
+            "failures": state.failures,
+            "retry_queue": state.retry_queue,
+        }, ensure_ascii=False, indent=2))
+    else:
+        print("使い方: python3 scripts/zenn_events.py [show|compact]", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1165 @@
+"""CommonMark の強調判定で `**` がそのまま表示される箇所の検出（HTML レンダリングなし）.
+
+`）**は` や `**word **` のように left/right-flanking の条件を満たさない `**` は
+強調にならず、Zenn 上で literal asterisk として表示される。
+この判定を python-commonmark（CommonMark 0.29）と同じ規則で、HTML を作らずに行う。
+
+  1. ブロック解析: 行ごとにコンテナ（引用・リスト項目）の継続と新しいブロックの開始を
+     判定し、段落・見出しの本文だけを集める。コードブロックは中身を見ない。
+     HTML ブロックは生のまま出力に含まれるので、そのまま残る `**` を数える
+  2. インライン解析: 段落・見出しの本文をバックスラッシュエスケープ・インラインコード・
+     リンク・自動リンク・生 HTML・文字参照の順に読み、`*` / `_` の区切り文字列を
+     flanking 規則（Unicode の空白・句読点の判定も commonmark と同じ）で
+     開き/閉じに分類して delimiter stack で対応付ける
+  3. 対応しなかった区切り文字と、エスケープ・文字参照・リンク先 URL の `*` を
+     レンダリング結果と同じ順に並べ、<pre> / <code> の中身を除いて `**` を探す
+
+`*` を含まない段落のインライン解析と、トップレベルのコードフェンスの中身の走査を省く。
+python-commonmark の結果との一致と速度は scripts/bench-flanking.py で確認する。
+計測では python-commonmark でのレンダリングに比べて corpus 7〜10倍・perturbed 6〜7倍・
+fuzz 3〜4倍で、目標の10倍には届いていない（所要時間の大半はブロック解析の行ごとの処理）。
+
+使い方:
+  from zenn_flanking import literal_bold
+  for line, col in literal_bold(article.body):   # 0 始まりの (行, 列)
+      ...
+"""
+
+import bisect
+import html
+import re
+
+CODE_INDENT = 4
+ESCAPABLE = r"""[!"#$%&'()*+,./:;<=>?@[\\\]^_`{|}~-]"""
+ENTITY = r"&(?:#x[a-f0-9]{1,6}|#[0-9]{1,7}|[a-z][a-z0-9]{1,31});"
+TAGNAME = r"[A-Za-z][A-Za-z0-9-]*"
+ATTRIBUTE = (
+    r"""(?:\s+[a-zA-Z_:][a-zA-Z0-9:._-]*"""
+    r"""(?:\s*=\s*(?:[^"'=<>`\x00-\x20]+|'[^']*'|"[^"]*"))?)"""
+)
+OPENTAG = "<" + TAGNAME + ATTRIBUTE + r"*\s*/?>"
+CLOSETAG = "</" + TAGNAME + r"\s*[>]"
+HTMLTAG = (
+    "(?:" + OPENTAG + "|" + CLOSETAG + r"|<!---->|<!--(?:-?[^>-])(?:-?[^-])*-->"
+    r"|[<][?].*?[?][>]|<![A-Z]+\s+[^>]*>|<!\[CDATA\[[\s\S]*?\]\]>)"
+)
+
+# ブロック
+THEMATIC_BREAK_RE = re.compile(r"^(?:(?:\*[ \t]*){3,}|(?:_[ \t]*){3,}|(?:-[ \t]*){3,})[ \t]*$")
+MAYBE_SPECIAL = frozenset("#`~*+_=<>0123456789-")
+LINE_START_SPECIAL = MAYBE_SPECIAL | {" ", "\t"}
+CONTAINERS = frozenset(("document", "block_quote", "list", "item"))
+ORDERED_MARKER_RE = re.compile(r"(\d{1,9})([.)])")
+ATX_MARKER_RE = re.compile(r"^#{1,6}(?:[ \t]+|$)")
+FENCE_LIKE_RE = re.compile(r"\n[ \t]*[`~]")
+CODE_FENCE_RE = re.compile(r"^`{3,}(?!.*`)|^~{3,}")
+CLOSING_FENCE_RE = re.compile(r"(?:`{3,}|~{3,})(?= *$)")
+SETEXT_RE = re.compile(r"^(?:=+|-+)[ \t]*$")
+HTML_BLOCK_OPEN = [
+    None,
+    re.compile(r"^<(?:script|pre|style)(?:\s|>|$)", re.I),
+    re.compile(r"^<!--"),
+    re.compile(r"^<[?]"),
+    re.compile(r"^<![A-Z]"),
+    re.compile(r"^<!\[CDATA\["),
+    re.compile(
+        r"^<[/]?(?:address|article|aside|base|basefont|blockquote|body|caption|center|col|"
+        r"colgroup|dd|details|dialog|dir|div|dl|dt|fieldset|figcaption|figure|footer|form|"
+        r"frame|frameset|h1|head|header|hr|html|iframe|legend|li|link|main|menu|menuitem|"
+        r"nav|noframes|ol|optgroup|option|p|param|section|source|title|summary|table|"
+        r"tbody|td|tfoot|th|thead|title|tr|track|ul)(?:\s|[/]?[>]|$)",
+        re.I,
+    ),
+    re.compile("^(?:" + OPENTAG + "|" + CLOSETAG + r")\s*$", re.I),
+]
+HTML_BLOCK_CLOSE = [
+    None,
+    re.compile(r"<\/(?:script|pre|style)>", re.I),
+    re.compile(r"-->"),
+    re.compile(r"\?>"),
+    re.compile(r">"),
+    re.compile(r"\]\]>"),
+]
+
+# インライン
+PUNCTUATION_RE = re.compile(
+    r'[!"#$%&\'()*+,\-./:;<=>?@\[\]\\^_`{|}~\xA1\xA7\xAB\xB6\xB7\xBB'
+    r'\xBF;·՚-՟։֊־׀׃'
+    r'׆׳״؉؊،؍؛؞؟'
+    r'٪-٭۔܀-܍߷-߹࠰-࠾'
+    r'࡞।॥॰૰෴๏๚๛༄-༒'
+    r'༔༺-༽྅࿐-࿔࿙࿚၊-၏჻'
+    r'፠-፨᐀᙭᙮᚛᚜᛫-᛭᜵᜶'
+    r'។-៖៘-៚᠀-᠊᥄᥅᨞᨟᪠-'
+    r'᪦᪨-᪭᭚-᭠᯼-᯿᰻-᰿᱾᱿'
+    r'᳀-᳇᳓‐-‧‰-⁃⁅-⁑⁓-⁞'
+    r'⁽⁾₍₎⌈-⌋〈〉❨-❵⟅'
+    r'⟆⟦-⟯⦃-⦘⧘-⧛⧼⧽⳹-⳼'
+    r'⳾⳿⵰⸀-⸮⸰-⹂、-〃〈-】'
+    r'〔-〟〰〽゠・꓾꓿꘍-꘏꙳'
+    r'꙾꛲-꛷꡴-꡷꣎꣏꣸-꣺꣼꤮'
+    r'꤯꥟꧁-꧍꧞꧟꩜-꩟꫞꫟꫰'
+    r'꫱꯫﴾﴿︐-︙︰-﹒﹔-﹡﹣'
+    r'﹨﹪﹫！-＃％-＊，-／：；'
+    r'？＠［-］＿｛｝｟-･]'
+)
+WHITESPACE_RE = re.compile(r"\s")
+ESCAPABLE_RE = re.compile(ESCAPABLE)
+ENTITY_RE = re.compile(ENTITY, re.I)
+ENTITY_OR_ESCAPE_RE = re.compile(r"\\" + ESCAPABLE + "|" + ENTITY, re.I)
+TICKS_RE = re.compile(r"`+")
+MAIN_RE = re.compile(r"[^\n`\[\]\\!<&*_'\"]+")
+HTML_TAG_RE = re.compile(HTMLTAG, re.I)
+EMAIL_AUTOLINK_RE = re.compile(
+    r"<([a-zA-Z0-9.!#$%&'*+\/=?^_`{|}~-]+@[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
+    r"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*)>"
+)
+AUTOLINK_RE = re.compile(r"<[A-Za-z][A-Za-z0-9.+-]{1,31}:[^<>\x00-\x20]*>", re.I)
+LINK_TITLE_RE = re.compile(
+    r'(?:"(\\' + ESCAPABLE + r'|[^"\x00])*"'
+    r"|'(\\" + ESCAPABLE + r"|[^'\x00])*'"
+    r"|\((\\" + ESCAPABLE + r"|[^()\x00])*\))"
+)
+LINK_DEST_BRACES_RE = re.compile(r"<(?:[^<>\n\\\x00]|\\.)*>")
+LINK_LABEL_RE = re.compile(r"\[(?:[^\\\[\]]|\\.){0,1000}\]")
+SPNL_RE = re.compile(r" *(?:\n *)?")
+SPACE_AT_EOL_RE = re.compile(r" *(?:\n|$)")
+LABEL_SPACE_RE = re.compile(r"[ \t\r\n]+")
+
+# 出力（old: レンダリング後の HTML からコード部分を除く正規表現と同じ）
+PRE_RE = re.compile(r"<pre[^>]*>.*?</pre>", re.S)
+CODE_RE = re.compile(r"<code[^>]*>.*?</code>", re.S)
+
+
+def _unescape(s: str) -> str:
+    if "\\" not in s and "&" not in s:
+        return s
+    return ENTITY_OR_ESCAPE_RE.sub(lambda m: m.group()[1] if m.group()[0] == "\\" else html.unescape(m.group()), s)
+
+
+def _normalize_label(label: str) -> str:
+    return LABEL_SPACE_RE.sub(" ", label[1:-1].strip()).casefold()
+
+
+class _Block:
+    # 種別ごとにしか使わない属性はクラス属性を既定値にする
+    children = ()     # コンテナ（document / block_quote / list / item）だけ list を持つ
+    is_open = True
+    data = None       # list: リスト種別、item: (marker_offset, padding)
+    html_type = 0
+    fence_char = ""   # フェンスコードブロックのみ
+    fence_length = 0
+    fence_offset = 0
+
+    def __init__(self, t, parent):
+        self.t = t
+        self.parent = parent
+        self.lines = []   # (行番号, 行内の開始位置, 内容)
+        if t in CONTAINERS:
+            self.children = []
+
+
+# ---------------------------------------------------------------------------
+# ブロック解析（commonmark.blocks.Parser.incorporate_line と同じ手順）
+
+
+class _BlockParser:
+    def __init__(self):
+        self.doc = _Block("document", None)
+        self.tip = self.doc
+        self.oldtip = self.doc
+        self.leaves: list[_Block] = []
+        self.refmap: dict[str, tuple[str, str]] = {}
+        self.all_closed = True
+        self.last_matched = self.doc
+
+    # --- 行内の位置 ---
+    def find_next_nonspace(self):
+        ln = self.ln
+        i = self.offset
+        cols = self.column
+        n = len(ln)
+        while i < n:
+            c = ln[i]
+            if c == " ":
+                cols += 1
+            elif c == "\t":
+                cols += 4 - cols % 4
+            else:
+                break
+            i += 1
+        self.blank = i >= n
+        self.next_nonspace = i
+        self.next_nonspace_column = cols
+        self.indent = cols - self.column
+        self.indented = self.indent >= CODE_INDENT
+
+    def advance_next_nonspace(self):
+        self.offset = self.next_nonspace
+        self.column = self.next_nonspace_column
+        self.partial_tab = False
+
+    def advance_offset(self, count, columns):
+        ln = self.ln
+        if not self.has_tab:
+            count = min(count, len(ln) - self.offset)
+            self.offset += count
+            self.column += count
+            self.partial_tab = False
+            return
+        while count > 0 and self.offset < len(ln):
+            if ln[self.offset] == "\t":
+                to_tab = 4 - self.column % 4
+                if columns:
+                    self.partial_tab = to_tab > count
+                    adv = min(count, to_tab)
+                    self.column += adv
+                    self.offset += 0 if self.partial_tab else 1
+                    count -= adv
+                else:
+                    self.partial_tab = False
+                    self.column += to_tab
+                    self.offset += 1
+                    count -= 1
+            else:
+                self.partial_tab = False
+                self.offset += 1
+                self.column += 1
+                count -= 1
+
+    def add_line(self):
+        prefix = ""
+        if self.partial_tab:
+            self.offset += 1
+            prefix = " " * (4 - self.column % 4)
+        self.tip.lines.append((self.line_no, self.offset - len(prefix), prefix + self.ln[self.offset:]))
+
+    # --- ブロックの追加と終了 ---
+    def add_child(self, t):
+        while not self._can_contain(self.tip, t):
+            self.finalize(self.tip)
+        block = _Block(t, self.tip)
+        self.tip.children.append(block)
+        self.tip = block
+        if t not in CONTAINERS:
+            self.leaves.append(block)
+        return block
+
+    @staticmethod
+    def _can_contain(parent, t):
+        pt = parent.t
+        if pt in ("document", "block_quote", "item"):
+            return t != "item"
+        if pt == "list":
+            return t == "item"
+        return False
+
+    def close_unmatched_blocks(self):
+        if not self.all_closed:
+            while self.oldtip is not self.last_matched:
+                parent = self.oldtip.parent
+                self.finalize(self.oldtip)
+                self.oldtip = parent
+            self.all_closed = True
+
+    def finalize(self, block):
+        block.is_open = False
+        if block.t == "paragraph":
+            self._extract_references(block)
+        self.tip = block.parent
+
+    def _extract_references(self, block):
+        """段落の先頭にあるリンク参照定義を refmap に登録し、本文から除く."""
+        if not block.lines or not block.lines[0][2].startswith("["):
+            return
+        content = "".join(text + "\n" for _, _, text in block.lines)
+        consumed = 0
+        while content.startswith("[", consumed):
+            n = _parse_reference(content, consumed, self.refmap)
+            if not n:
+                break
+            consumed += n
+        if consumed:
+            _drop_prefix(block, consumed)
+            if not "".join(text for _, _, text in block.lines).strip():
+                block.t = "removed"
+
+    # --- 1行の取り込み ---
+    def incorporate_line(self, ln: str, line_no: int):
+        self.ln = ln
+        self.has_tab = "\t" in ln
+        self.line_no = line_no
+        self.offset = 0
+        self.column = 0
+        self.blank = False
+        self.partial_tab = False
+        self.oldtip = self.tip
+
+        container = self.doc
+        while container.children and container.children[-1].is_open:
+            container = container.children[-1]
+            self.find_next_nonspace()
+            rv = self.continue_(container)
+            if rv == 2:
+                return
+            if rv == 1:
+                container = container.parent
+                break
+
+        self.all_closed = container is self.oldtip
+        self.last_matched = container
+
+        matched_leaf = container.t in ("code_block", "html_block")
+        while not matched_leaf:
+            self.find_next_nonspace()
+            if not self.indented and (self.blank or ln[self.next_nonspace] not in MAYBE_SPECIAL):
+                self.advance_next_nonspace()
+                break
+            res = self.block_start(container)
+            if res == 0:
+                self.advance_next_nonspace()
+                break
+            container = self.tip
+            if res == 2:
+                matched_leaf = True
+
+        if not self.all_closed and not self.blank and self.tip.t == "paragraph":
+            self.add_line()  # 遅延継続行
+            return
+        self.close_unmatched_blocks()
+        t = container.t
+        if t in ("code_block", "html_block", "paragraph"):
+            self.add_line()
+            if (t == "html_block" and 1 <= container.html_type <= 5
+                    and HTML_BLOCK_CLOSE[container.html_type].search(ln, self.offset)):
+                self.finalize(container)
+        elif self.offset < len(ln) and not self.blank:
+            self.add_child("paragraph")
+            self.advance_next_nonspace()
+            self.add_line()
+
+    def fast_line(self, ln: str, line_no: int) -> bool:
+        """コンテナの外（トップレベル）で結果が明らかな行を一般の手順を通さずに処理する.
+
+        フェンスの中身と閉じ、見出し・区切り線の次の行、ATX 見出し、フェンスの開始、
+        行頭が空白でも特殊文字でもない行（段落の継続か新しい段落）が対象。処理したら True。
+        """
+        tip = self.tip
+        if tip.parent is not self.doc and tip is not self.doc:
+            return False
+        if tip.t == "code_block" and tip.fence_char:
+            rest = ln.lstrip(" \t")
+            if rest[:1] != tip.fence_char:
+                return True
+            indent = len(ln) - len(rest)
+            if "\t" in ln[:indent]:
+                return False
+            if indent <= 3:
+                m = CLOSING_FENCE_RE.match(ln, indent)
+                if m and len(m.group()) >= tip.fence_length:
+                    self.finalize(tip)
+            return True
+        if tip.t in ("heading", "thematic_break"):
+            self.finalize(tip)
+            tip = self.doc
+        c = ln[:1]
+        if (c == "#" or c == "`" or c == "~") and tip.t in ("document", "paragraph"):
+            if c == "#":
+                m = ATX_MARKER_RE.match(ln)
+                if m:
+                    self.add_child("heading").lines.append((line_no, m.end(), _strip_atx(ln[m.end():])))
+                    return True
+            else:
+                m = CODE_FENCE_RE.match(ln)
+                if m:
+                    block = self.add_child("code_block")
+                    block.fence_char = c
+                    block.fence_length = len(m.group())
+                    block.fence_offset = 0
+                    return True
+            return False
+        if not c:
+            if tip.t == "paragraph" and not ln:
+                self.finalize(tip)
+            return tip.t in ("document", "paragraph")
+        if c in " \t" or c in MAYBE_SPECIAL:
+            return False
+        if tip.t == "paragraph":
+            tip.lines.append((line_no, 0, ln))
+            return True
+        if tip is self.doc:
+            self.add_child("paragraph").lines.append((line_no, 0, ln))
+            return True
+        return False
+
+    def continue_(self, container):
+        t = container.t
+        ln = self.ln
+        if t == "block_quote":
+            if not self.indented and self.next_nonspace < len(ln) and ln[self.next_nonspace] == ">":
+                self.advance_next_nonspace()
+                self.advance_offset(1, False)
+                if self.offset < len(ln) and ln[self.offset] in " \t":
+                    self.advance_offset(1, True)
+                return 0
+            return 1
+        if t == "item":
+            marker_offset, padding = container.data
+            if self.blank:
+                if not container.children:
+                    return 1
+                self.advance_next_nonspace()
+            elif self.indent >= marker_offset + padding:
+                self.advance_offset(marker_offset + padding, True)
+            else:
+                return 1
+            return 0
+        if t in ("list", "document"):
+            return 0
+        if t in ("heading", "thematic_break"):
+            return 1
+        if t == "code_block":
+            if container.fence_char:
+                m = None
+                if self.indent <= 3 and self.next_nonspace < len(ln) and ln[self.next_nonspace] == container.fence_char:
+                    m = CLOSING_FENCE_RE.match(ln, self.next_nonspace)
+                if m and len(m.group()) >= container.fence_length:
+                    self.finalize(container)
+                    return 2
+                i = container.fence_offset
+                while i > 0 and self.offset < len(ln) and ln[self.offset] in " \t":
+                    self.advance_offset(1, True)
+                    i -= 1
+            elif self.indent >= CODE_INDENT:
+                self.advance_offset(CODE_INDENT, True)
+            elif self.blank:
+                self.advance_next_nonspace()
+            else:
+                return 1
+            return 0
+        if t == "html_block":
+            return 1 if self.blank and container.html_type in (6, 7) else 0
+        if t == "paragraph":
+            return 1 if self.blank else 0
+        return 0
+
+    def block_start(self, container) -> int:
+        ln = self.ln
+        nn = self.next_nonspace
+        c = ln[nn] if nn < len(ln) else ""
+        rest = ln[nn:]
+        if not self.indented:
+            # 引用
+            if c == ">":
+                self.advance_next_nonspace()
+                self.advance_offset(1, False)
+                if self.offset < len(ln) and ln[self.offset] in " \t":
+                    self.advance_offset(1, True)
+                self.close_unmatched_blocks()
+                self.add_child("block_quote")
+                return 1
+            # ATX 見出し
+            m = ATX_MARKER_RE.match(rest) if c == "#" else None
+            if m:
+                self.advance_next_nonspace()
+                self.advance_offset(len(m.group()), False)
+                self.close_unmatched_blocks()
+                heading = self.add_child("heading")
+                heading.lines.append((self.line_no, self.offset, _strip_atx(ln[self.offset:])))
+                self.offset = len(ln)
+                return 2
+            # コードフェンス
+            m = CODE_FENCE_RE.match(rest) if c in "`~" else None
+            if m:
+                self.close_unmatched_blocks()
+                block = self.add_child("code_block")
+                block.fence_char = m.group()[0]
+                block.fence_length = len(m.group())
+                block.fence_offset = self.indent
+                self.advance_next_nonspace()
+                self.advance_offset(len(m.group()), False)
+                return 2
+            # HTML ブロック
+            if c == "<":
+                for html_type in range(1, 8):
+                    if HTML_BLOCK_OPEN[html_type].match(rest) and (html_type < 7 or container.t != "paragraph"):
+                        self.close_unmatched_blocks()
+                        block = self.add_child("html_block")
+                        block.html_type = html_type
+                        return 2
+            # setext 見出し（直前の段落を見出しにする）
+            if container.t == "paragraph" and c in "=-" and SETEXT_RE.match(rest):
+                self.close_unmatched_blocks()
+                self._extract_references(container)
+                if container.t == "paragraph" and "".join(t for _, _, t in container.lines):
+                    container.t = "heading"
+                    container.is_open = False
+                    self.tip = container.parent
+                    self.offset = len(ln)
+                    return 2
+                container.t = "paragraph" if container.t != "removed" else "removed"
+            # 区切り線
+            if c in "*_-" and THEMATIC_BREAK_RE.match(rest):
+                self.close_unmatched_blocks()
+                self.add_child("thematic_break")
+                self.offset = len(ln)
+                return 2
+        # リスト項目
+        if not self.indented or container.t == "list":
+            data = self.parse_list_marker(container)
+            if data:
+                self.close_unmatched_blocks()
+                if self.tip.t != "list" or self.tip.data != data[2]:
+                    lst = self.add_child("list")
+                    lst.data = data[2]
+                item = self.add_child("item")
+                item.data = data[:2]
+                return 1
+        # インデントコード
+        if self.indented and self.tip.t != "paragraph" and not self.blank:
+            self.advance_offset(CODE_INDENT, True)
+            self.close_unmatched_blocks()
+            block = self.add_child("code_block")
+            block.fence_char = ""
+            return 2
+        return 0
+
+    def parse_list_marker(self, container):
+        """(marker_offset, padding, リスト種別) または None."""
+        if self.indent >= 4:
+            return None
+        ln = self.ln
+        nn = self.next_nonspace
+        c = ln[nn] if nn < len(ln) else ""
+        if c in "*+-":
+            marker = c
+            kind = ("bullet", c)
+        else:
+            m = ORDERED_MARKER_RE.match(ln, nn)
+            if not m or (container.t == "paragraph" and m.group(1) != "1"):
+                return None
+            marker = m.group()
+            kind = ("ordered", m.group(2))
+        after = nn + len(marker)
+        if after < len(ln) and ln[after] not in " \t":
+            return None
+        if container.t == "paragraph" and not ln[after:].strip(" \t\f\v\r\n"):
+            return None
+        marker_offset = self.indent
+        self.advance_next_nonspace()
+        self.advance_offset(len(marker), True)
+        if not self.has_tab:
+            # タブが無ければ列と位置は同じ
+            spaces = 0
+            while spaces < 5 and after + spaces < len(ln) and ln[after + spaces] == " ":
+                spaces += 1
+            if spaces >= 5 or spaces < 1 or after + spaces >= len(ln):
+                padding = len(marker) + 1
+                spaces = min(spaces, 1)
+            else:
+                padding = len(marker) + spaces
+            self.offset += spaces
+            self.column += spaces
+            return marker_offset, padding, kind
+        start_col = self.column
+        start_offset = self.offset
+        while True:
+            self.advance_offset(1, True)
+            nxt = ln[self.offset] if self.offset < len(ln) else None
+            if not (self.column - start_col < 5 and nxt in (" ", "\t")):
+                break
+        blank_item = self.offset >= len(ln)
+        spaces = self.column - start_col
+        if spaces >= 5 or spaces < 1 or blank_item:
+            padding = len(marker) + 1
+            self.column = start_col
+            self.offset = start_offset
+            if self.offset < len(ln) and ln[self.offset] in " \t":
+                self.advance_offset(1, True)
+        else:
+            padding = len(marker) + spaces
+        return marker_offset, padding, kind
+
+    def parse(self, lines: list[str]):
+        doc = self.doc
+        # フェンスを閉じ得る行（先頭の空白を除いて ` か ~ で始まる行）。トップレベルのフェンス内は
+        # 次の候補行まで読み飛ばす
+        fence_like = []
+        text = "\n" + "\n".join(lines)
+        line_no = -1
+        last = 0
+        for m in FENCE_LIKE_RE.finditer(text):
+            line_no += text.count("\n", last, m.end())
+            last = m.end()
+            fence_like.append(line_no)
+        n = len(lines)
+        special = LINE_START_SPECIAL
+        fast_line = self.fast_line
+        no = -1
+        while no + 1 < n:
+            no += 1
+            ln = lines[no]
+            tip = self.tip
+            # トップレベルのフェンス内と段落の継続行（大半の行）はここで済ませる
+            if tip.parent is doc:
+                if tip.fence_char:
+                    k = bisect.bisect_left(fence_like, no)
+                    if k == len(fence_like):
+                        break
+                    no = fence_like[k]
+                    ln = lines[no]
+                elif not ln:
+                    if tip.t == "paragraph" or tip.t == "heading" or tip.t == "thematic_break":
+                        self.finalize(tip)
+                        continue
+                elif tip.t == "paragraph" and ln[0] not in special:
+                    tip.lines.append((no, 0, ln))
+                    continue
+            elif tip is doc and (not ln or ln[0] not in special):
+                if ln:
+                    self.add_child("paragraph").lines.append((no, 0, ln))
+                continue
+            if not fast_line(ln, no):
+                self.incorporate_line(ln, no)
+        while self.tip is not None:
+            self.finalize(self.tip)
+
+
+def _strip_atx(content: str) -> str:
+    """ATX 見出しの閉じ `#` 列を除く."""
+    if "#" not in content:
+        return content
+    return re.sub(r"[ \t]+#+[ \t]*$", "", re.sub(r"^[ \t]*#+[ \t]*$", "", content))
+
+
+def _drop_prefix(block: _Block, n: int):
+    """段落の本文の先頭 n 文字（改行を含む）を除く."""
+    lines = block.lines
+    while lines and n > 0:
+        no, start, text = lines[0]
+        if n > len(text):
+            n -= len(text) + 1
+            lines.pop(0)
+        else:
+            lines[0] = (no, start + n, text[n:])
+            n = 0
+
+
+def _parse_reference(s: str, pos: int, refmap: dict) -> int:
+    """s[pos:] の先頭のリンク参照定義を登録して消費した文字数を返す（commonmark.parseReference）."""
+    start = pos
+    m = LINK_LABEL_RE.match(s, pos)
+    if not m or len(m.group()) > 1001 or len(m.group()) == 2:
+        return 0
+    label = m.group()
+    pos = m.end()
+    if s[pos:pos + 1] != ":":
+        return 0
+    pos = SPNL_RE.match(s, pos + 1).end()
+    dest, pos = _link_destination(s, pos)
+    if dest is None:
+        return 0
+    before_title = pos
+    pos = SPNL_RE.match(s, pos).end()
+    title = None
+    if pos != before_title:
+        m = LINK_TITLE_RE.match(s, pos)
+        if m:
+            title = _unescape(m.group()[1:-1])
+            pos = m.end()
+    if title is None:
+        title = ""
+        pos = before_title
+    m = SPACE_AT_EOL_RE.match(s, pos)
+    if m is None:
+        if title == "":
+            return 0
+        pos = before_title
+        m = SPACE_AT_EOL_RE.match(s, pos)
+        if m is None:
+            return 0
+    pos = m.end()
+    key = _normalize_label(label)
+    if key == "":
+        return 0
+    refmap.setdefault(key, (dest, title))
+    return pos - start
+
+
+def _link_destination(s: str, pos: int) -> tuple[str | None, int]:
+    m = LINK_DEST_BRACES_RE.match(s, pos)
+    if m:
+        return _unescape(m.group()[1:-1]), m.end()
+    if s[pos:pos + 1] == "<":
+        return None, pos
+    start = pos
+    parens = 0
+    n = len(s)
+    while pos < n:
+        c = s[pos]
+        if c == "\\" and ESCAPABLE_RE.match(s, pos + 1):
+            pos += 2
+        elif c == "(":
+            pos += 1
+            parens += 1
+        elif c == ")":
+            if parens < 1:
+                break
+            pos += 1
+            parens -= 1
+        elif c in " \t\n\x0b\x0c\x0d":
+            break
+        else:
+            pos += 1
+    if pos == start and s[pos:pos + 1] != ")":
+        return None, start
+    return _unescape(s[start:pos]), pos
+
+
+# ---------------------------------------------------------------------------
+# インライン解析（commonmark.inlines.InlineParser と同じ手順）
+#
+# 出力は部品のリスト。("t", 文字列, 元の位置) は `*` を含み得るテキスト、
+# PLAIN は `*` を含まないテキストと改行（連続するものは1つ）、
+# ("d", delim) は区切り文字列、("c", 中身, 位置) はインラインコード、
+# ("<", is_image, dest, title) / (">", is_image) はリンク・画像の開始と終了、
+# ("h", 生 HTML, 位置) は生 HTML。
+
+PLAIN = ("t", "", None)
+
+
+def _parse_inlines(subject: str, refmap: dict) -> list:
+    out: list = []
+    n = len(subject)
+    pos = 0
+    delims = None    # delimiter stack の先頭
+    brackets = None  # 角括弧 stack の先頭
+
+    def text(s, at=None):
+        # `*` を含まない文字列は位置も中身も要らないので、連続するものを1つにまとめる
+        if at is None or "*" not in s:
+            if not out or out[-1] is not PLAIN:
+                out.append(PLAIN)
+        else:
+            out.append(("t", s, at))
+
+    while pos < n:
+        c = subject[pos]
+        if c == "\n":
+            pos += 1
+            text("\n")
+            while pos < n and subject[pos] == " ":
+                pos += 1
+        elif c == "\\":
+            pos += 1
+            if pos < n and subject[pos] == "\n":
+                pos += 1
+                text("\n")
+            elif pos < n and ESCAPABLE_RE.match(subject, pos):
+                text(subject[pos], pos)
+                pos += 1
+            else:
+                text("\\")
+        elif c == "`":
+            m = TICKS_RE.match(subject, pos)
+            ticks = m.group()
+            after = m.end()
+            close = TICKS_RE.search(subject, after)
+            while close and close.group() != ticks:
+                close = TICKS_RE.search(subject, close.end())
+            if close:
+                contents = subject[after:close.start()].replace("\n", " ")
+                shift = 0
+                if contents.lstrip(" ") and contents[0] == contents[-1] == " ":
+                    contents = contents[1:-1]
+                    shift = 1
+                out.append(("c", contents, after + shift))
+                pos = close.end()
+            else:
+                text(ticks)
+                pos = after
+        elif c == "*" or c == "_":
+            start = pos
+            while pos < n and subject[pos] == c:
+                pos += 1
+            before = subject[start - 1] if start > 0 else "\n"
+            after = subject[pos] if pos < n else "\n"
+            after_ws = bool(WHITESPACE_RE.match(after)) or after == "\xa0"
+            after_p = bool(PUNCTUATION_RE.match(after))
+            before_ws = bool(WHITESPACE_RE.match(before)) or before == "\xa0"
+            before_p = bool(PUNCTUATION_RE.match(before))
+            left = not after_ws and (not after_p or before_ws or before_p)
+            right = not before_ws and (not before_p or after_ws or after_p)
+            if c == "_":
+                can_open = left and (not right or before_p)
+                can_close = right and (not left or after_p)
+            else:
+                can_open = left
+                can_close = right
+            d = {"cc": c, "num": pos - start, "orig": pos - start, "at": start,
+                 "open": can_open, "close": can_close, "prev": delims, "next": None,
+                 "opened": False, "closed": False}
+            if delims is not None:
+                delims["next"] = d
+            delims = d
+            out.append(("d", d))
+        elif c == "[" or (c == "!" and subject[pos + 1:pos + 2] == "["):
+            is_image = c == "!"
+            index = pos + 1 if is_image else pos
+            out.append(("t", "![" if is_image else "[", None))  # リンクになれば置き換える
+            if brackets is not None:
+                brackets["after"] = True
+            brackets = {"piece": len(out) - 1, "prev": brackets, "delim": delims,
+                        "index": index, "image": is_image, "active": True}
+            pos += 2 if is_image else 1
+        elif c == "]":
+            pos += 1
+            opener = brackets
+            if opener is None:
+                text("]")
+                continue
+            if not opener["active"]:
+                text("]")
+                brackets = opener["prev"]
+                continue
+            start = pos
+            matched = False
+            dest = title = None
+            if pos < n and subject[pos] == "(":
+                p = SPNL_RE.match(subject, pos + 1).end()
+                dest, p = _link_destination(subject, p)
+                if dest is not None:
+                    p = SPNL_RE.match(subject, p).end()
+                    if subject[p - 1] in " \t\n\x0b\x0c\x0d":
+                        m = LINK_TITLE_RE.match(subject, p)
+                        if m:
+                            title = _unescape(m.group()[1:-1])
+                            p = m.end()
+                    p = SPNL_RE.match(subject, p).end()
+                    if p < n and subject[p] == ")":
+                        pos = p + 1
+                        matched = True
+            if not matched:
+                m = LINK_LABEL_RE.match(subject, pos)
+                label_len = len(m.group()) if m and len(m.group()) <= 1001 else 0
+                if label_len > 2:
+                    reflabel = subject[pos:pos + label_len]
+                else:
+                    reflabel = subject[opener["index"]:start]
+                if label_len:
+                    pos += label_len
+                link = refmap.get(_normalize_label(reflabel)) if reflabel else None
+                if link:
+                    dest, title = link
+                    matched = True
+                else:
+                    pos = start
+            if matched:
+                out[opener["piece"]] = ("<", opener["image"], dest, title or "")
+                out.append((">", opener["image"]))
+                delims = _process_emphasis(delims, opener["delim"])
+                brackets = opener["prev"]
+                if not opener["image"]:
+                    b = brackets
+                    while b is not None:
+                        if not b["image"]:
+                            b["active"] = False
+                        b = b["prev"]
+            else:
+                brackets = opener["prev"]
+                text("]")
+        elif c == "<":
+            m = EMAIL_AUTOLINK_RE.match(subject, pos) or AUTOLINK_RE.match(subject, pos)
+            if m:
+                dest = m.group()[1:-1]
+                if m.re is EMAIL_AUTOLINK_RE:
+                    href = "mailto:" + dest
+                else:
+                    href = dest
+                out.append(("<", False, href, ""))
+                text(dest, pos + 1)
+                out.append((">", False))
+                pos = m.end()
+                continue
+            m = HTML_TAG_RE.match(subject, pos)
+            if m:
+                out.append(("h", m.group(), pos))
+                pos = m.end()
+            else:
+                text("<")
+                pos += 1
+        elif c == "&":
+            m = ENTITY_RE.match(subject, pos)
+            if m:
+                text(html.unescape(m.group()), pos)
+                pos = m.end()
+            else:
+                text("&")
+                pos += 1
+        elif c == "!":
+            text("!")
+            pos += 1
+        else:
+            m = MAIN_RE.match(subject, pos)
+            if m:
+                text(m.group())
+                pos = m.end()
+            else:
+                text(c)
+                pos += 1
+
+    _process_emphasis(delims, None)
+    return out
+
+
+def _remove_delim(top, d):
+    if d["prev"] is not None:
+        d["prev"]["next"] = d["next"]
+    if d["next"] is None:
+        top = d["prev"]
+    else:
+        d["next"]["prev"] = d["prev"]
+    return top
+
+
+def _process_emphasis(top, bottom):
+    """delimiter stack の bottom より上を処理し、残った stack の先頭を返す."""
+    openers_bottom = {"*": bottom, "_": bottom}
+    closer = top
+    while closer is not None and closer["prev"] is not bottom:
+        closer = closer["prev"]
+    while closer is not None:
+        if not closer["close"]:
+            closer = closer["next"]
+            continue
+        opener = closer["prev"]
+        found = False
+        odd_match = False
+        cc = closer["cc"]
+        while opener is not None and opener is not bottom and opener is not openers_bottom[cc]:
+            odd_match = ((closer["open"] or opener["close"]) and closer["orig"] % 3 != 0
+                         and (opener["orig"] + closer["orig"]) % 3 == 0)
+            if opener["cc"] == cc and opener["open"] and not odd_match:
+                found = True
+                break
+            opener = opener["prev"]
+        old_closer = closer
+        if not found:
+            closer = closer["next"]
+        else:
+            use = 2 if closer["num"] >= 2 and opener["num"] >= 2 else 1
+            opener["num"] -= use
+            closer["num"] -= use
+            opener["opened"] = True
+            closer["closed"] = True
+            if opener["next"] is not closer:
+                opener["next"] = closer
+                closer["prev"] = opener
+            if opener["num"] == 0:
+                top = _remove_delim(top, opener)
+            if closer["num"] == 0:
+                nxt = closer["next"]
+                top = _remove_delim(top, closer)
+                closer = nxt
+        if not found and not odd_match:
+            openers_bottom[cc] = old_closer["prev"]
+            if not old_closer["open"]:
+                top = _remove_delim(top, old_closer)
+    while top is not None and top is not bottom:
+        top = _remove_delim(top, top)
+    return top
+
+
+# ---------------------------------------------------------------------------
+# レンダリング結果の骨格（`*` の位置だけを追跡）
+
+
+class _Skeleton:
+    def __init__(self):
+        self.parts: list[str] = []
+        self.size = 0
+        self.stars: dict[int, tuple[int, int]] = {}  # 骨格内の位置 → (行, 列)
+
+    def emit(self, s: str, where=None):
+        """where は s の各文字の元の位置を返す関数（s に `*` が含まれるときだけ呼ぶ）."""
+        if not s:
+            return
+        if where is not None and "*" in s:
+            i = s.find("*")
+            while i != -1:
+                loc = where(i)
+                if loc is not None:
+                    self.stars[self.size + i] = loc
+                i = s.find("*", i + 1)
+        self.parts.append(s)
+        self.size += len(s)
+
+
+def _escape(s: str) -> str:
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def _render_inlines(sk: _Skeleton, pieces: list, locate):
+    """インラインの部品を骨格に出力する.
+
+    `*` を含まない文字列は "x" 1文字で代える（エスケープ後の本文は `<` `>` を含まないので、
+    タグの対応や `**` の隣接は変わらない）。
+    """
+    emit = sk.emit
+    plain = 0  # 画像の alt 内ではタグを出さない
+    for piece in pieces:
+        kind = piece[0]
+        if kind == "t" or kind == "c":
+            _, s, at = piece
+            if kind == "c" and not plain:
+                emit("<code>x</code>")
+            elif at is None or "*" not in s:
+                emit("x")
+            else:
+                emit(_escape(s), lambda i, at=at: locate(at + i))
+        elif kind == "d":
+            d = piece[1]
+            if d["closed"] and not plain:
+                emit("</em>")
+            if d["num"]:
+                emit(d["cc"] * d["num"], lambda i, at=d["at"]: locate(at + i))
+            if d["opened"] and not plain:
+                emit("<em>")
+        elif kind == "<":
+            _, is_image, dest, title = piece
+            if is_image:
+                if not plain:
+                    emit('<img src="')
+                    emit(_escape(dest) or "x", lambda i: None)
+                    emit('" alt="')
+                plain += 1
+            elif not plain:
+                emit('<a href="')
+                emit(_escape(dest) or "x", lambda i: None)
+                if title:
+                    emit('" title="')
+                    emit(_escape(title), lambda i: None)
+                emit('">')
+        elif kind == ">":
+            if piece[1]:
+                plain -= 1
+                if not plain:
+                    emit('" />')
+            elif not plain:
+                emit("</a>")
+        else:
+            _, s, at = piece
+            emit(s, lambda i, at=at: locate(at + i))
+
+
+def _locator(lines: list[tuple[int, int, str]], lstrip: int):
+    """本文（行を改行でつないで先頭の空白を除いたもの）の位置 → (行, 列)."""
+    starts = []
+    total = 0
+    for no, col, text in lines:
+        starts.append((total, no, col))
+        total += len(text) + 1
+
+    def locate(i):
+        i += lstrip
+        lo, hi = 0, len(starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if starts[mid][0] <= i:
+                lo = mid
+            else:
+                hi = mid - 1
+        base, no, col = starts[lo]
+        return no, col + i - base
+
+    return locate
+
+
+def _skeleton(lines: list[str]) -> _Skeleton:
+    parser = _BlockParser()
+    parser.parse(lines)
+    sk = _Skeleton()
+    # `*` を含まない段落・コードブロック・区切り線は、前後のタグで区切られるので省いてよい。
+    # ただし生 HTML の <pre> / <code> が閉じずに残っていると、除去範囲の終わりが変わるので出力する
+    raw_html = False
+    for block in parser.leaves:
+        t = block.t
+        if t in ("paragraph", "heading"):
+            if len(block.lines) == 1:
+                content = block.lines[0][2] + "\n"
+            else:
+                content = "".join(text + "\n" for _, _, text in block.lines)
+            if "*" in content or "&" in content or "<" in content or (raw_html and "`" in content):
+                subject = content.strip()
+                lstrip = len(content) - len(content.lstrip())
+                pieces = _parse_inlines(subject, parser.refmap)
+                raw_html = raw_html or any(piece[0] == "h" for piece in pieces)
+                sk.emit("\n<p>")
+                _render_inlines(sk, pieces, _locator(block.lines, lstrip))
+                sk.emit("</p>\n")
+            elif raw_html:
+                sk.emit("\n<p>x</p>\n")
+        elif t == "html_block":
+            text = "\n".join(text for _, _, text in block.lines)
+            text = re.sub(r"(\n *)+$", "", text + "\n")
+            sk.emit("\n")
+            sk.emit(text, _locator(block.lines, 0))
+            sk.emit("\n")
+            raw_html = True
+        elif not raw_html:
+            pass
+        elif t == "code_block":
+            sk.emit("\n<pre><code></code></pre>\n")
+        elif t == "thematic_break":
+            sk.emit("\n<hr />\n")
+    return sk
+
+
+def literal_bold(text: str) -> list[tuple[int, int]]:
+    """text を CommonMark としてレンダリングしたとき、<pre> / <code> の外に `**` が
+    そのまま残る箇所の (行, 列)（0 始まり、`**` の1文字目）を返す.
+
+    位置が元の本文に対応しない `**`（リンク先 URL の中など）は (-1, -1)。
+    """
+    if text.count("*") < 2 and "&" not in text:
+        return []
+    lines = re.split(r"\r\n|\n|\r", text) if "\r" in text else text.split("\n")
+    if text.endswith("\n"):
+        lines.pop()
+    sk = _skeleton(lines)
+    rendered = "".join(sk.parts)
+    if rendered.count("*") < 2:
+        return []
+
+    # <pre> → <code> の順に除く（marks は除いた後の位置 → 骨格内の位置の対応）
+    cleaned, marks = rendered, [(0, 0)]
+    for regex in (PRE_RE, CODE_RE):
+        cleaned, marks = _remove(cleaned, marks, regex)
+    starts = [at for at, _ in marks]
+    found = []
+    i = cleaned.find("**")
+    while i != -1:
+        at, orig = marks[bisect.bisect_right(starts, i) - 1]
+        found.append(sk.stars.get(orig + i - at, (-1, -1)))
+        i = cleaned.find("**", i + 2)
+    return found
+
+
+def _remove(s: str, marks: list[tuple[int, int]], regex) -> tuple[str, list[tuple[int, int]]]:
+    """s から regex に当たる部分を除き、位置の対応 marks（(s 内の位置, 骨格内の位置) の昇順）を付け直す."""
+    starts = [at for at, _ in marks]
+    out = []
+    new_marks = []
+    size = last = 0
+    for m in list(regex.finditer(s)) + [None]:
+        end = m.start() if m else len(s)
+        if last < end:
+            k = bisect.bisect_right(starts, last) - 1
+            new_marks.append((size, marks[k][1] + last - marks[k][0]))
+            for at, orig in marks[k + 1:bisect.bisect_left(starts, end)]:
+                new_marks.append((size + at - last, orig))
+            out.append(s[last:end])
+            size += end - last
+        if m:
+            last = m.end()
+    return "".join(out), new_marks or [(0, 0)]
@@ -0,0 +1,160 @@
+"""記事 front matter のキー単位の書き換え（公開・差し戻し・予約・ロールバックの共通処理）.
+
+ファイルを先頭から閉じ `---` まで1行ずつ読み、front matter のトップレベルのキーだけを
+置換・追加・削除する。本文は読み込まずにチャンク単位で一時ファイルへ流し、
+os.replace でアトミックに差し替える。本文中の `published: true` のような行には触れない。
+
+  - 既存キーの置換: `key:` と値の間の空白、行末の改行（\\n / \\r\\n）はそのまま
+  - 削除: キー行と、続くブロック値の行（インデント・`- ` で始まる行）を消す
+  - 追加: insert_after のキーの直後（無ければ閉じ `---` の直前）に `key: value` を挿入
+
+値は Article.raw_fm と同じく引用符を含む生の文字列で受け渡す（`"published"` / `true`）。
+
+使い方:
+  from zenn_frontmatter import patch_frontmatter, unquote
+
+  def publish(fm):  # fm: キー → 生の値
+      return {"published": "true"} if unquote(fm.get("published", "")) == "false" else {}
+
+  changes = patch_frontmatter(path, publish)   # 実際に変わったキー → 新しい値（None は削除）
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+FM_KEY_RE = re.compile(rb"^(\w[\w_]*)[ \t]*:[ \t]*(.*?)[ \t]*(\r?\n)?$")
+COPY_CHUNK = 1 << 20
+
+
+def unquote(value: str) -> str:
+    """生の値から引用符を除く（Article.fm と同じ）."""
+    return value.strip('"').strip("'")
+
+
+def _read_header(fh) -> list[bytes] | None:
+    """先頭 `---` から閉じ `---` までの行（改行付き）. front matter が無い/閉じていなければ None."""
+    first = fh.readline()
+    if first.strip() != b"---":
+        return None
+    header = [first]
+    while True:
+        line = fh.readline()
+        if not line:
+            return None
+        header.append(line)
+        if line.strip() == b"---":
+            return header
+
+
+def _key_blocks(header: list[bytes]) -> dict[str, list[tuple[int, int]]]:
+    """トップレベルのキー → (キー行, ブロック値を含む終端の次の行) の範囲のリスト（出現順）."""
+    blocks: dict[str, list[tuple[int, int]]] = {}
+    key, start = None, 0
+    last = len(header) - 1  # 閉じ `---`
+    for i in range(1, last + 1):
+        line = header[i]
+        if i < last and line[:1] in (b" ", b"\t", b"-"):
+            continue  # 直前のキーのブロック値
+        if key is not None:
+            blocks.setdefault(key, []).append((start, i))
+            key = None
+        m = FM_KEY_RE.match(line) if i < last else None
+        if m:
+            key, start = m.group(1).decode("ascii"), i
+    return blocks
+
+
+def _patch_header(header: list[bytes], edit, insert_after: str | None):
+    """(新しいヘッダー行, 適用した変更)."""
+    blocks = _key_blocks(header)
+    # 同じキーが複数あれば scan_frontmatter と同じく最後の値を見る
+    raw = {key: FM_KEY_RE.match(header[ranges[-1][0]]).group(2).decode("utf-8")
+           for key, ranges in blocks.items()}
+
+    changes = {}
+    for key, value in edit(dict(raw)).items():
+        if value is None and key in raw or value is not None and raw.get(key) != value:
+            changes[key] = value
+    if not changes:
+        return header, {}
+
+    newline = b"\r\n" if header[0].endswith(b"\r\n") else b"\n"
+    replaced: dict[int, list[bytes]] = {}
+    added = []
+    for key, value in changes.items():
+        if key not in blocks:
+            added.append(f"{key}: {value}".encode("utf-8") + newline)
+            continue
+        for start, end in blocks[key]:
+            if value is None:
+                replaced[start] = []
+            else:
+                m = FM_KEY_RE.match(header[start])
+                prefix = header[start][:m.start(2)]
+                if not prefix.endswith((b" ", b"\t")):
+                    prefix += b" "
+                replaced[start] = [prefix + value.encode("utf-8") + (m.group(3) or newline)]
+            for i in range(start + 1, end):
+                replaced[i] = []
+    anchor = blocks[insert_after][-1][1] if insert_after in blocks else len(header) - 1
+
+    out = []
+    for i, line in enumerate(header):
+        if i == anchor:
+            out.extend(added)
+        out.extend(replaced.get(i, [line]))
+    return out, changes
+
+
+def stage_frontmatter(path: Path, edit: Callable[[dict[str, str]], dict[str, str | None]],
+                      insert_after: str | None = None) -> tuple[Path | None, dict[str, str | None]]:
+    """patch_frontmatter の書き込み前半. 変更後の内容を同じディレクトリの一時ファイルに書く.
+
+    (一時ファイル, 適用した変更) を返す（変更が無ければ (None, {})）。呼び出し側が
+    os.replace で差し替えるか、不要になったら削除する（zenn_state のバッチ書き込み用）。
+    """
+    path = Path(path)
+    tmp_path = None
+    try:
+        with open(path, "rb") as src:
+            header = _read_header(src)
+            if header is None:
+                return None, {}
+            header, changes = _patch_header(header, edit, insert_after)
+            if not changes:
+                return None, {}
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as dst:
+                dst.writelines(header)
+                shutil.copyfileobj(src, dst, COPY_CHUNK)
+        shutil.copymode(path, tmp_path)
+    except Exception:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        raise
+    return Path(tmp_path), changes
+
+
+def patch_frontmatter(path: Path, edit: Callable[[dict[str, str]], dict[str, str | None]],
+                      insert_after: str | None = None) -> dict[str, str | None]:
+    """front matter の生の値を edit に渡し、返された変更を適用して書き戻す.
+
+    edit はキー → 生の値の dict を受け取り、{キー: 新しい値}（None で削除）を返す。
+    現在と同じ値・存在しないキーの削除は無視する。実際に適用した変更を返し、
+    変更が無い・front matter が無い/閉じていない場合はファイルに触れず {} を返す。
+    """
+    tmp_path, changes = stage_frontmatter(path, edit, insert_after)
+    if tmp_path is not None:
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    return changes
@@ -0,0 +1,191 @@
+"""記事の git 履歴インデックス（公開レート計算・最終更新・初回公開の共通ソース）.
+
+`git log -p -U0 -- articles` を解析し、コミットごとに
+  - touched:  変更された記事の slug
+  - publish:  published: false → true（または published: true で新規追加）
+  - rollback: published: true → false
+を .zenn-cache/history.json に保存する。
+
+2回目以降は前回の HEAD から現在の HEAD までのコミットだけを追加で解析する。
+前回の HEAD が現在の履歴に含まれない（rebase / force push / shallow clone）場合のみ
+全履歴から作り直す。
+
+published 行の変更は先頭 FRONTMATTER_MAX_LINES 行以内で、ファイル内で最初に現れるもの
+（= frontmatter）だけを数え、本文のコードブロックに書かれた `published: true` を誤検出しない。
+
+使い方:
+  from zenn_history import load_history
+  history = load_history()
+  history.deploys_since(hours=24)   # 過去24hに公開された記事数
+  history.last_modified("my-slug")  # 最終コミット時刻（datetime / None）
+  history.first_published("my-slug")
+"""
+
+import bisect
+import json
+import re
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from zenn_corpus import CACHE_DIR, REPO_ROOT, atomic_write
+
+HISTORY_FILE = CACHE_DIR / "history.json"
+HISTORY_VERSION = 1
+FRONTMATTER_MAX_LINES = 20
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+PUBLISHED_RE = re.compile(r"^published:\s*(true|false)\s*$")
+ARTICLE_PATH_RE = re.compile(r"^articles/([^/]+)\.md$")
+
+
+def _git(repo: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, cwd=repo, timeout=120,
+    )
+
+
+def parse_log(text: str) -> list[dict]:
+    """`git log -p -U0 --no-renames --format=%x00%H %ct` の出力をコミット単位に分解する（新しい順）."""
+    commits: list[dict] = []
+    commit = None
+    slug = None
+    in_header = False
+    deleted = False
+    flags: dict[str, dict[str, str]] = {}
+    old_line = new_line = 0
+
+    def flush():
+        if commit is None:
+            return
+        for s, change in flags.items():
+            if change.get("+") == "true" and change.get("-") != "true":
+                commit["publish"].append(s)
+            elif change.get("-") == "true" and change.get("+") == "false":
+                commit["rollback"].append(s)
+
+    for line in text.splitlines():
+        if line.startswith("\0"):
+            flush()
+            sha, ts = line[1:].split()
+            commit = {"sha": sha, "time": int(ts), "touched": [], "publish": [], "rollback": []}
+            commits.append(commit)
+            flags = {}
+            slug = None
+        elif commit is None:
+            continue
+        elif line.startswith("diff --git "):
+            m = ARTICLE_PATH_RE.match(line.split(" b/", 1)[-1])
+            slug = m.group(1) if m else None
+            if slug and slug not in commit["touched"]:
+                commit["touched"].append(slug)
+            in_header = True
+            deleted = False
+        elif in_header:
+            if line == "+++ /dev/null":
+                deleted = True
+            elif line.startswith("@@"):
+                in_header = False
+        if line.startswith("@@"):
+            m = HUNK_RE.match(line)
+            if m:
+                old_line, new_line = int(m.group(1)), int(m.group(3))
+        elif not in_header and slug and line[:1] in ("+", "-"):
+            lineno = new_line if line[0] == "+" else old_line
+            m = PUBLISHED_RE.match(line[1:])
+            if m and lineno <= FRONTMATTER_MAX_LINES and not deleted:
+                flags.setdefault(slug, {}).setdefault(line[0], m.group(1))
+            if line[0] == "+":
+                new_line += 1
+            else:
+                old_line += 1
+    flush()
+    return commits
+
+
+class HistoryIndex:
+    """コミット → slug → publish / rollback の分類と、その派生ビュー."""
+
+    def __init__(self, head: str = "", commits: list[dict] | None = None):
+        self.head = head
+        self.commits: list[dict] = []  # 古い順
+        self.last_touched: dict[str, int] = {}
+        self.first_publish: dict[str, int] = {}
+        self.publish_times: list[tuple[int, str]] = []  # (time, slug) 時刻順
+        self.extend(commits or [])
+
+    def extend(self, commits: list[dict]) -> None:
+        """古い順のコミットを追加し、派生ビューを更新する."""
+        for commit in commits:
+            self.commits.append(commit)
+            t = commit["time"]
+            for slug in commit["touched"]:
+                self.last_touched[slug] = max(t, self.last_touched.get(slug, 0))
+            for slug in commit["publish"]:
+                self.first_publish.setdefault(slug, t)
+                bisect.insort(self.publish_times, (t, slug))
+
+    def deploys_since(self, hours: float = 24, now: datetime | None = None) -> int:
+        """直近 hours 時間に公開（published → true）された記事数（slug 単位で重複除外）."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - timedelta(hours=hours)).timestamp()
+        start = bisect.bisect_left(self.publish_times, (cutoff, ""))
+        return len({slug for _, slug in self.publish_times[start:]})
+
+    def last_modified(self, slug: str) -> datetime | None:
+        t = self.last_touched.get(slug)
+        return datetime.fromtimestamp(t, timezone.utc) if t else None
+
+    def first_published(self, slug: str) -> datetime | None:
+        t = self.first_publish.get(slug)
+        return datetime.fromtimestamp(t, timezone.utc) if t else None
+
+    def to_json(self) -> dict:
+        return {"version": HISTORY_VERSION, "head": self.head, "commits": self.commits}
+
+
+def _read_log(repo: Path, rev_range: str) -> list[dict]:
+    result = _git(repo, "log", "-p", "-U0", "--no-renames", "--no-color",
+                  "--format=%x00%H %ct", rev_range, "--", "articles")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return list(reversed(parse_log(result.stdout)))
+
+
+def load_history(repo: Path = REPO_ROOT, index_path: Path | None = HISTORY_FILE) -> HistoryIndex:
+    """インデックスを読み込み、HEAD までの差分を取り込んで返す.
+
+    git が使えない場合は RuntimeError。
+    """
+    head_result = _git(repo, "rev-parse", "HEAD")
+    if head_result.returncode != 0:
+        raise RuntimeError(head_result.stderr.strip())
+    head = head_result.stdout.strip()
+
+    data = None
+    if index_path is not None:
+        try:
+            data = json.loads(index_path.read_text(encoding="utf-8"))
+            if data.get("version") != HISTORY_VERSION:
+                data = None
+        except (OSError, ValueError):
+            data = None
+
+    if data and data.get("head") == head:
+        return HistoryIndex(head, data["commits"])
+
+    base = data.get("head") if data else None
+    if base and _git(repo, "merge-base", "--is-ancestor", base, head).returncode == 0:
+        index = HistoryIndex(head, data["commits"])
+        index.extend(_read_log(repo, f"{base}..{head}"))
+    else:
+        # 初回 or 履歴の書き換え: 全履歴から作り直す
+        index = HistoryIndex(head, _read_log(repo, head))
+
+    if index_path is not None:
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(index_path, json.dumps(index.to_json(), ensure_ascii=False))
+        except OSError:
+            pass
+    return index
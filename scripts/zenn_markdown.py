@@ -0,0 +1,246 @@
+"""記事 Markdown の共通トークナイザ.
+
+行を先頭から1回だけ走査し、ブロック種別と行内スパンを付けた Line を順に返す。
+fix-bold / fix-emdash / fix-single-emdash / lint-bold-emdash はこの結果だけを見て判定し、
+front matter・フェンス・インラインコードを各自の正規表現で追跡しない。
+
+ブロック種別（Line.block）:
+  FRONTMATTER  先頭 `---` から閉じ `---` まで（区切り行を含む。閉じが無ければ front matter なし）
+  FENCE        コードフェンス（開始・終了行を含む）
+               閉じは開始と同じ文字で同じ長さ以上、後続が空白のみの行（zenn_corpus.scan_fences と同じ）
+  HEADING      `#`〜`######` + 空白（行頭 3 スペースまで）
+  BLOCKQUOTE   `>` で始まる行
+  TABLE        `|` で始まる行（cells にセル内容の範囲）
+  TEXT         上記以外の本文
+  BLANK        空行
+FRONTMATTER / FENCE の区切り行（`---`、フェンス行）は marker=True。
+
+行内スパン（Line.spans, FRONTMATTER / FENCE / BLANK 以外）:
+  CODE         インラインコード。開始と同じ長さのバッククォート列で閉じる（`` a`b `` も1スパン）
+  LINK_TEXT    [text](url) / ![alt](src) の角括弧の中
+  LINK_URL     同じく丸括弧の中
+  TEXT         それ以外
+スパンは行を隙間なく覆い、start / end は行内の文字位置（end は含まない）。
+
+使い方:
+  from zenn_markdown import tokenize, TEXT, CODE
+  for line in tokenize(text.split("\\n")):
+      if line.block in (FRONTMATTER, FENCE):
+          continue
+      for span in line.spans:
+          if span.kind == TEXT:
+              ...
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+FRONTMATTER = "frontmatter"
+FENCE = "fence"
+HEADING = "heading"
+BLOCKQUOTE = "blockquote"
+TABLE = "table"
+TEXT = "text"
+BLANK = "blank"
+
+CODE = "code"
+LINK_TEXT = "link_text"
+LINK_URL = "link_url"
+
+FENCE_RE = re.compile(r"^(```+|~~~+)")
+HEADING_RE = re.compile(r"^ {0,3}#{1,6}(?:\s|$)")
+BLOCKQUOTE_RE = re.compile(r"^ {0,3}>")
+LINK_RE = re.compile(r"!?\[([^\]]*)\]\(([^)]*)\)")
+BACKTICKS_RE = re.compile(r"`+")
+
+
+@dataclass
+class Span:
+    kind: str
+    start: int
+    end: int
+
+
+@dataclass
+class Line:
+    """1行分のトークン. no は 0 始まりの行番号."""
+
+    no: int
+    text: str
+    block: str
+    marker: bool = False
+    spans: list[Span] = field(default_factory=list)
+    cells: list[tuple[int, int]] = field(default_factory=list)
+
+    def span_text(self, span: Span) -> str:
+        return self.text[span.start:span.end]
+
+    def code_mask(self) -> list[bool]:
+        """インラインコード内の文字位置を True にしたマスク."""
+        mask = [False] * len(self.text)
+        for span in self.spans:
+            if span.kind == CODE:
+                mask[span.start:span.end] = [True] * (span.end - span.start)
+        return mask
+
+    def without_code(self) -> str:
+        """インラインコードを除いた行."""
+        return "".join(self.text[s.start:s.end] for s in self.spans if s.kind != CODE)
+
+    def find(self, old: str, kinds=(TEXT, LINK_TEXT),
+             protect: list[tuple[int, int]] = ()) -> list[int]:
+        """kinds のスパン内で old が現れる位置（重ならないもの、行頭からの文字位置）.
+
+        protect に含まれる範囲（テーブルのプレースホルダセル等）は除く。
+        スパンを持たない行（FRONTMATTER 等）は行全体を対象にする。
+        """
+        spans = self.spans or [Span(TEXT, 0, len(self.text))]
+        found = []
+        for span in spans:
+            if span.kind not in kinds:
+                continue
+            at = self.text.find(old, span.start, span.end)
+            while at != -1:
+                if not any(a <= at and at + len(old) <= b for a, b in protect):
+                    found.append(at)
+                at = self.text.find(old, at + len(old), span.end)
+        return found
+
+    def replace(self, old: str, new: str, kinds=(TEXT, LINK_TEXT),
+                protect: list[tuple[int, int]] = ()) -> tuple[str, int]:
+        """kinds のスパン内の old を new に置換した行と置換数を返す（対象は find と同じ）."""
+        out = []
+        pos = 0
+        found = self.find(old, kinds, protect)
+        for at in found:
+            out.append(self.text[pos:at])
+            out.append(new)
+            pos = at + len(old)
+        out.append(self.text[pos:])
+        return "".join(out), len(found)
+
+
+def code_spans(line: str) -> list[tuple[int, int]]:
+    """インラインコードの (開始, 終了) 位置（終了は閉じバッククォートの次）."""
+    spans = []
+    runs = [(m.start(), m.end()) for m in BACKTICKS_RE.finditer(line)]
+    k = 0
+    while k < len(runs):
+        start, end = runs[k]
+        # 同じ長さのバッククォート列を探す（長さが違う列は中身の一部）
+        for close in range(k + 1, len(runs)):
+            if runs[close][1] - runs[close][0] == end - start:
+                spans.append((start, runs[close][1]))
+                k = close + 1
+                break
+        else:
+            k += 1  # 閉じが無いバッククォート列は通常の文字
+    return spans
+
+
+def inline_spans(line: str) -> list[Span]:
+    """行をインラインコード・リンク・テキストのスパンに分割する."""
+    if "`" not in line and "[" not in line:
+        return [Span(TEXT, 0, len(line))] if line else []
+    spans: list[Span] = []
+    pos = 0
+
+    def add_text(start: int, end: int):
+        if start >= end:
+            return
+        # インラインコードの外側だけリンクを探す
+        cursor = start
+        for m in LINK_RE.finditer(line, start, end):
+            if m.start() > cursor:
+                spans.append(Span(TEXT, cursor, m.start()))
+            spans.append(Span(TEXT, m.start(), m.start(1)))
+            spans.append(Span(LINK_TEXT, m.start(1), m.end(1)))
+            spans.append(Span(TEXT, m.end(1), m.start(2)))
+            spans.append(Span(LINK_URL, m.start(2), m.end(2)))
+            spans.append(Span(TEXT, m.end(2), m.end()))
+            cursor = m.end()
+        if cursor < end:
+            spans.append(Span(TEXT, cursor, end))
+
+    for start, end in code_spans(line):
+        add_text(pos, start)
+        spans.append(Span(CODE, start, end))
+        pos = end
+    add_text(pos, len(line))
+    return [s for s in spans if s.start < s.end]
+
+
+def table_cells(line: str, spans: list[Span]) -> list[tuple[int, int]]:
+    """テーブル行のセル内容の範囲（インラインコード内の `|` は区切りとみなさない）."""
+    separators = []
+    for s in spans:
+        if s.kind == CODE:
+            continue
+        i = line.find("|", s.start, s.end)
+        while i != -1:
+            if i == 0 or line[i - 1] != "\\":
+                separators.append(i)
+            i = line.find("|", i + 1, s.end)
+    return [(a + 1, b) for a, b in zip(separators, separators[1:])]
+
+
+def frontmatter_end(lines: list[str]) -> int | None:
+    """閉じ `---` の行番号（front matter が無い/閉じていない場合は None）."""
+    if not lines or lines[0].strip() != "---":
+        return None
+    for i in range(1, len(lines)):
+        if lines[i].strip() == "---":
+            return i
+    return None
+
+
+def tokenize(lines: list[str] | Iterable[str]) -> Iterator[Line]:
+    """行のリストを先頭から1回走査して Line を順に返す."""
+    lines = list(lines)
+    fm_end = frontmatter_end(lines)
+    open_mark = ""
+    for no, text in enumerate(lines):
+        if fm_end is not None and no <= fm_end:
+            yield Line(no, text, FRONTMATTER, marker=no in (0, fm_end))
+            continue
+
+        stripped = text.lstrip()
+        m = FENCE_RE.match(stripped)
+        if open_mark:
+            closes = (
+                m is not None
+                and m.group(1)[0] == open_mark[0]
+                and len(m.group(1)) >= len(open_mark)
+                and not stripped[len(m.group(1)):].strip()
+            )
+            if closes:
+                open_mark = ""
+            yield Line(no, text, FENCE, marker=closes)
+            continue
+        if m:
+            open_mark = m.group(1)
+            yield Line(no, text, FENCE, marker=True)
+            continue
+
+        if not stripped:
+            yield Line(no, text, BLANK)
+            continue
+        spans = inline_spans(text)
+        if HEADING_RE.match(text):
+            yield Line(no, text, HEADING, spans=spans)
+        elif BLOCKQUOTE_RE.match(text):
+            yield Line(no, text, BLOCKQUOTE, spans=spans)
+        elif stripped.startswith("|"):
+            yield Line(no, text, TABLE, spans=spans, cells=table_cells(text, spans))
+        else:
+            yield Line(no, text, TEXT, spans=spans)
+
+
+def unclosed_fence(tokens: list[Line]) -> int | None:
+    """最後まで閉じていないフェンスの開始行番号（無ければ None）."""
+    open_no = None
+    for line in tokens:
+        if line.block == FENCE and line.marker:
+            open_no = line.no if open_no is None else None
+    return open_no
@@ -0,0 +1,196 @@
+"""記事ごとの集計指標（BigQuery のダッシュボード用に事前計算する）.
+
+zenn_markdown.tokenize の1回の走査で次の指標を求める:
+  - 見出し: レベルごとの数（heading_h1〜h6）と最大の深さ
+  - コードブロック: 数・行数・言語ごとのブロック数（フェンスの info の先頭。`python:main.py` → python）
+  - 内部リンク: zenn.dev/correlate_dev/articles/<slug> へのリンク先（自記事を除く、出現順で重複なし）
+  - 画像: `![alt](src)` の数と、リポジトリ内の画像（/images/...）の合計バイト数
+  - 推定読了時間: 本文の文字数・コード行数・画像数から計算（分）
+フロントマター・フェンス内・インラインコード内は本文として数えない。
+
+走査結果は Article.memo でコーパスキャッシュに保存する。画像のバイト数は
+画像ファイル側の変更に追従するよう、書き出す時に毎回 stat で求める。
+
+出力は zenn_columnar.write_table で Parquet（pyarrow が無ければ NDJSON）に書き、
+そのまま BigQuery に一括ロードできる:
+  bq load --source_format=PARQUET --replace dataset.article_metrics .zenn-cache/article-metrics.parquet
+
+使い方:
+  python3 scripts/zenn_metrics.py                    # .zenn-cache/article-metrics.parquet に書き出す
+  python3 scripts/zenn_metrics.py -o metrics.parquet
+  python3 scripts/zenn_metrics.py --print            # 記事ごとの指標を表示（書き出さない）
+
+  from zenn_metrics import article_metrics
+  article_metrics(article)["reading_minutes"]
+"""
+
+import argparse
+import re
+from collections import Counter
+from pathlib import Path
+
+from zenn_columnar import write_table
+from zenn_corpus import ARTICLES_DIR, CACHE_DIR, REPO_ROOT, Article, load_corpus
+from zenn_markdown import BLANK, CODE, FENCE, FRONTMATTER, HEADING, LINK_TEXT, LINK_URL, TEXT, tokenize
+
+METRICS_KEY = "metrics/1"  # 走査のロジックを変えたら上げる
+OUTPUT_FILE = CACHE_DIR / "article-metrics.parquet"
+INTERNAL_LINK_RE = re.compile(r"zenn\.dev/correlate_dev/articles/([a-z0-9_-]+)")
+IMAGE_RE = re.compile(r"!\[[^\]]*\]\(\s*([^)\s]*)[^)]*\)")
+MARKUP_RE = re.compile(r"[#*\[\]()>!|_~\-\s]")
+HEADING_LEVEL_RE = re.compile(r"^ {0,3}(#{1,6})")
+
+# 推定読了時間（日本語の技術記事を想定）
+CHARS_PER_MINUTE = 500
+CODE_LINES_PER_MINUTE = 50
+SECONDS_PER_IMAGE = 10
+
+COLUMNS = [
+    ("id", "string"),
+    ("slug", "string"),
+    ("prose_chars", "int64"),
+    ("reading_minutes", "float64"),
+    ("heading_h1", "int64"),
+    ("heading_h2", "int64"),
+    ("heading_h3", "int64"),
+    ("heading_h4", "int64"),
+    ("heading_h5", "int64"),
+    ("heading_h6", "int64"),
+    ("max_heading_depth", "int64"),
+    ("code_block_count", "int64"),
+    ("code_line_count", "int64"),
+    ("code_languages", ("list", ("struct", [("language", "string"), ("blocks", "int64")]))),
+    ("internal_links", ("list", "string")),
+    ("internal_link_count", "int64"),
+    ("image_count", "int64"),
+    ("image_bytes", "int64"),
+    ("external_image_count", "int64"),
+    ("missing_image_count", "int64"),
+]
+
+
+def fence_language(line: str) -> str:
+    """開始フェンス行の言語（info の先頭語、`:` 以降のファイル名は除く）. 無指定は ""."""
+    stripped = line.lstrip()
+    info = stripped.lstrip(stripped[:1]).strip()
+    return info.split()[0].split(":")[0].lower() if info else ""
+
+
+def scan_metrics(article: Article) -> dict:
+    """1回の走査で求める指標（記事の内容だけで決まるもの. memo でキャッシュする）."""
+    headings = [0] * 6
+    languages = Counter()
+    code_blocks = code_lines = prose_chars = 0
+    links: dict[str, None] = {}
+    images = []
+    in_fence = False
+    for line in tokenize(article.lines):
+        if line.block == FRONTMATTER:
+            continue
+        if line.block == FENCE:
+            if not line.marker:
+                code_lines += 1
+            elif not in_fence:
+                in_fence = True
+                code_blocks += 1
+                languages[fence_language(line.text)] += 1
+            else:
+                in_fence = False
+            continue
+        if line.block == BLANK:
+            continue
+        if line.block == HEADING:
+            headings[len(HEADING_LEVEL_RE.match(line.text).group(1)) - 1] += 1
+        code = []
+        for span in line.spans:
+            if span.kind == CODE:
+                code.append((span.start, span.end))
+                continue
+            text = line.span_text(span)
+            if span.kind in (TEXT, LINK_TEXT):
+                prose_chars += len(MARKUP_RE.sub("", text))
+            if span.kind in (TEXT, LINK_URL):
+                for m in INTERNAL_LINK_RE.finditer(text):
+                    links[m.group(1)] = None
+        if "![" in line.text:
+            images.extend(m.group(1) for m in IMAGE_RE.finditer(line.text)
+                          if m.group(1) and not any(a <= m.start() < b for a, b in code))
+    links.pop(article.slug, None)
+    return {
+        "prose_chars": prose_chars,
+        "headings": headings,
+        "code_block_count": code_blocks,
+        "code_line_count": code_lines,
+        "code_languages": sorted(languages.items(), key=lambda kv: (-kv[1], kv[0])),
+        "internal_links": list(links),
+        "images": images,
+    }
+
+
+def image_sizes(srcs: list[str], root: Path = REPO_ROOT) -> tuple[int, int, int]:
+    """(リポジトリ内の画像の合計バイト数, 外部画像の数, 見つからない画像の数)."""
+    total = external = missing = 0
+    for src in srcs:
+        if not src.startswith("/"):
+            external += 1
+            continue
+        try:
+            total += (root / src.lstrip("/")).stat().st_size
+        except OSError:
+            missing += 1
+    return total, external, missing
+
+
+def article_metrics(article: Article, root: Path = REPO_ROOT) -> dict:
+    """記事1件の指標（COLUMNS の列）."""
+    m = article.memo(METRICS_KEY, scan_metrics)
+    image_bytes, external, missing = image_sizes(m["images"], root)
+    minutes = (m["prose_chars"] / CHARS_PER_MINUTE + m["code_line_count"] / CODE_LINES_PER_MINUTE
+               + len(m["images"]) * SECONDS_PER_IMAGE / 60)
+    depths = [level + 1 for level, count in enumerate(m["headings"]) if count]
+    row = {
+        "id": f"zenn-{article.slug}",
+        "slug": article.slug,
+        "prose_chars": m["prose_chars"],
+        "reading_minutes": round(minutes, 1),
+        "max_heading_depth": max(depths, default=0),
+        "code_block_count": m["code_block_count"],
+        "code_line_count": m["code_line_count"],
+        "code_languages": [{"language": lang, "blocks": n} for lang, n in m["code_languages"]],
+        "internal_links": m["internal_links"],
+        "internal_link_count": len(m["internal_links"]),
+        "image_count": len(m["images"]),
+        "image_bytes": image_bytes,
+        "external_image_count": external,
+        "missing_image_count": missing,
+    }
+    for level, count in enumerate(m["headings"], 1):
+        row[f"heading_h{level}"] = count
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="記事ごとの集計指標を書き出す")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_FILE,
+                        help=f"出力先（既定: {OUTPUT_FILE.relative_to(REPO_ROOT)}）")
+    parser.add_argument("--print", action="store_true", help="書き出さずに記事ごとの指標を表示")
+    args = parser.parse_args()
+
+    rows = []
+    for article in load_corpus(articles_dir=ARTICLES_DIR).values():
+        rows.append(article_metrics(article))
+        article.release()
+
+    if args.print:
+        for row in rows:
+            langs = ",".join(f"{c['language'] or '-'}:{c['blocks']}" for c in row["code_languages"])
+            print(f"{row['slug']}: {row['reading_minutes']}分 見出し{row['heading_h2']}/{row['heading_h3']}"
+                  f" コード{row['code_block_count']}[{langs}] 内部リンク{row['internal_link_count']}"
+                  f" 画像{row['image_count']}({row['image_bytes'] // 1024}KB)")
+        return
+    path = write_table(args.output, rows, COLUMNS)
+    print(f"{len(rows)}件の指標を書き出しました: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""記事本文の重複（コピー・焼き直し）検出.
+
+winnowing（Schleimer et al. 2003）で本文のフィンガープリントを取り、
+全記事の転置索引から共通箇所を行範囲で返す。
+
+  - 対象はコードフェンス外の本文。関連記事・参考リンクのようなリンクだけの箇条書き行と URL は
+    定型的な一致になるので除く
+  - 空白と Markdown 記号（* _ # > ` |）を除いて小文字化し、
+    文字 SHINGLE_CHARS-gram の CRC32 を取る（日本語でも分かち書き不要）
+  - WINDOW 個ずつの窓で最小ハッシュを選ぶので、SHINGLE_CHARS + WINDOW - 1 文字以上
+    一致する箇所は必ず検出される
+  - フィンガープリントは記事ごとに Article.memo で .zenn-cache/corpus.json に保存され、
+    変更された記事だけが再計算される
+  - BOILERPLATE_ARTICLES 記事を超えて共有されるハッシュ（CV フッター等の定型文）は無視する
+
+計算量は本文の総文字数に比例（共通フィンガープリントの組み合わせ分を除く）。
+"""
+
+import re
+import zlib
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+
+from zenn_corpus import Article
+
+FINGERPRINT_KEY = "body-winnow/2"
+SHINGLE_CHARS = 30
+WINDOW = 16
+BOILERPLATE_ARTICLES = 4
+SECTION_GAP_LINES = 5
+MIN_SECTION_FINGERPRINTS = 6
+
+STRIP_CHARS = str.maketrans("", "", " \t　*_#>`|")
+LINK_ITEM_RE = re.compile(r"^\s*(?:[-*+]|\d+\.)\s*\[[^\]]*\]\([^)]*\)\s*$")
+URL_RE = re.compile(r"\]\([^)]*\)|https?://\S+")
+
+
+def normalized_stream(article: Article) -> tuple[str, list[int]]:
+    """コードフェンス外の本文を正規化した文字列と、各文字の行番号（1始まり）."""
+    chars: list[str] = []
+    line_of: list[int] = []
+    for i in range(article.body_line, len(article.lines)):
+        line = article.lines[i]
+        if article.in_fence(i) or LINK_ITEM_RE.match(line):
+            continue
+        norm = URL_RE.sub("", line).translate(STRIP_CHARS).lower()
+        chars.append(norm)
+        line_of.extend([i + 1] * len(norm))
+    return "".join(chars), line_of
+
+
+def fingerprints(article: Article) -> list[list[int]]:
+    """winnowing で選んだ [hash, 行番号] のリスト."""
+    text, line_of = normalized_stream(article)
+    hashes = [
+        zlib.crc32(text[i:i + SHINGLE_CHARS].encode("utf-8"))
+        for i in range(len(text) - SHINGLE_CHARS + 1)
+    ]
+    selected: list[list[int]] = []
+    window: deque[int] = deque()  # hashes のインデックス（ハッシュ値が単調増加）
+    last = -1
+    for i, h in enumerate(hashes):
+        while window and hashes[window[-1]] >= h:
+            window.pop()
+        window.append(i)
+        if window[0] <= i - WINDOW:
+            window.popleft()
+        if i >= WINDOW - 1 and window[0] != last:
+            last = window[0]
+            selected.append([hashes[last], line_of[last]])
+    if hashes and not selected:
+        # 本文が窓より短い場合は最小値を1つだけ採る
+        last = min(range(len(hashes)), key=hashes.__getitem__)
+        selected.append([hashes[last], line_of[last]])
+    return selected
+
+
+@dataclass
+class Section:
+    """2記事間で一致した区間（行番号は1始まり、両端を含む）."""
+
+    a_start: int
+    a_end: int
+    b_start: int
+    b_end: int
+    count: int = 1
+    b_last: int = field(default=0, repr=False)
+
+
+def _sections(matches: list[tuple[int, int]]) -> list[Section]:
+    """(a の行, b の行) の一致点を、両側で SECTION_GAP_LINES 以内に連なる区間にまとめる."""
+    done: list[Section] = []
+    open_: list[Section] = []
+    for la, lb in sorted(matches):
+        still_open = []
+        target = None
+        for sec in open_:
+            if la - sec.a_end > SECTION_GAP_LINES:
+                done.append(sec)
+                continue
+            still_open.append(sec)
+            if target is None and abs(lb - sec.b_last) <= SECTION_GAP_LINES:
+                target = sec
+        open_ = still_open
+        if target is None:
+            open_.append(Section(la, la, lb, lb, b_last=lb))
+        else:
+            target.a_end = la
+            target.b_start = min(target.b_start, lb)
+            target.b_end = max(target.b_end, lb)
+            target.b_last = lb
+            target.count += 1
+    done.extend(open_)
+    return sorted(
+        (s for s in done if s.count >= MIN_SECTION_FINGERPRINTS), key=lambda s: (s.a_start, s.b_start)
+    )
+
+
+def find_overlaps(articles: list[Article]) -> list[tuple[Article, Article, list[Section]]]:
+    """本文が重複する記事ペアと一致区間を返す（articles の順で a < b）."""
+    postings: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    for idx, article in enumerate(articles):
+        for h, line in article.memo(FINGERPRINT_KEY, fingerprints):
+            postings[h].append((idx, line))
+
+    pair_matches: dict[tuple[int, int], list[tuple[int, int]]] = defaultdict(list)
+    for entries in postings.values():
+        docs = {idx for idx, _ in entries}
+        if len(docs) < 2 or len(docs) > BOILERPLATE_ARTICLES:
+            continue
+        for ia, la in entries:
+            for ib, lb in entries:
+                if ia < ib:
+                    pair_matches[(ia, ib)].append((la, lb))
+
+    results = []
+    for (ia, ib), matches in sorted(pair_matches.items()):
+        sections = _sections(matches)
+        if sections:
+            results.append((articles[ia], articles[ib], sections))
+    return results
@@ -0,0 +1,231 @@
+"""記事テキスト修正の共通エンジン（複数ルールを1パスで適用）.
+
+各ルールは zenn_markdown.Line を受け取り、行内の修正のリストを返す関数。
+1つの修正は編集 (開始, 終了, 置換文字列) のリストで、件数は修正単位で数える
+（bold の前後余白の削除は2つの編集で1件）。
+エンジンはファイルを1回だけ読んでトークン化し、全ルールの編集を行ごとに集めて
+位置順に並べ、重なる編集は RULES の登録順で先のルールを優先して後のものを捨てる。
+変更があったファイルだけを zenn_backup に保存してから atomic_write で1回書き込む
+（戻すときは scripts/fix-backup.py restore --run <id>）。
+
+ルール:
+  bold           `** 太字 **` の内側の前後余白を除去
+  emdash         「——」→ front matter・見出しは「：」、本文は「。」
+  single-emdash  単独の「—」→「：」（引用元帰属 `> — ` とテーブルの `| — |` は残す）
+
+使い方:
+  python3 scripts/fix-text.py                  # 全ルールを1パスで適用
+  python3 scripts/fix-text.py --rules bold     # 一部のルールだけ
+  python3 scripts/fix-text.py --dry-run        # 書き込まずに件数だけ表示
+
+  from zenn_rewrite import rewrite_text
+  new_text, counts = rewrite_text(text, ["bold", "emdash"])
+"""
+
+import argparse
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+from zenn_backup import BackupRun
+from zenn_corpus import ARTICLES_DIR, atomic_write
+from zenn_markdown import BLANK, BLOCKQUOTE, CODE, FENCE, FRONTMATTER, HEADING, TABLE, Line, tokenize
+
+Edit = tuple[int, int, str]
+Rule = Callable[[Line], list[list[Edit]]]
+
+ATTRIBUTION_RE = re.compile(r"^\s*>\s*—\s")
+
+
+def star_positions(line: Line) -> list[int]:
+    """インラインコード外の `*` の位置（昇順）."""
+    text = line.text
+    code = [(s.start, s.end) for s in line.spans if s.kind == CODE]
+    stars = []
+    c = 0
+    at = text.find("*")
+    while at != -1:
+        while c < len(code) and code[c][1] <= at:
+            c += 1
+        if c < len(code) and code[c][0] <= at:
+            at = text.find("*", code[c][1])  # コードスパンを飛ばす
+            continue
+        stars.append(at)
+        at = text.find("*", at + 1)
+    return stars
+
+
+def bold_edits(line: Line) -> list[list[Edit]]:
+    """`**...**` ペアごとに、内側の前後余白を削除する編集.
+
+    開き `**` の直後に現れる最初のコード外の `*` が `**` の先頭なら、それが閉じ
+    （内側にコード外の `*` を含まない最短のペア）。`*` の位置だけを1回走査するので
+    行長に対して線形。
+    """
+    if line.block in (FRONTMATTER, FENCE, BLANK):
+        return []
+    text = line.text
+    stars = star_positions(line)
+    fixes: list[list[Edit]] = []
+    k = 0
+    while k + 1 < len(stars):
+        if stars[k + 1] != stars[k] + 1:
+            k += 1
+            continue
+        if k + 3 >= len(stars) or stars[k + 3] != stars[k + 2] + 1:
+            k += 1  # 閉じが無い: 2つ目の * から開きを探し直す
+            continue
+        open_, close = stars[k], stars[k + 2]
+        inner = text[open_ + 2:close]
+        lead = len(inner) - len(inner.lstrip())
+        trail = len(inner) - len(inner.rstrip())
+        if inner.strip() and (lead or trail):
+            fix = []
+            if lead:
+                fix.append((open_ + 2, open_ + 2 + lead, ""))
+            if trail:
+                fix.append((close - trail, close, ""))
+            fixes.append(fix)
+        k += 4
+    return fixes
+
+
+def emdash_edits(line: Line) -> list[list[Edit]]:
+    """「——」を front matter・見出しでは「：」、本文では「。」にする編集."""
+    if line.block == FENCE or line.marker or "——" not in line.text:
+        return []
+    repl = "：" if line.block in (FRONTMATTER, HEADING) else "。"
+    return [[(at, at + 2, repl)] for at in line.find("——")]
+
+
+def single_emdash_edits(line: Line) -> list[list[Edit]]:
+    """単独の「—」を「：」にする編集（「——」の一部は emdash ルールに任せる）."""
+    text = line.text
+    if line.block == FENCE or line.marker or "—" not in text:
+        return []
+    # 引用元帰属 `> — [Author]` は欧文の慣習どおり残す
+    if line.block == BLOCKQUOTE and ATTRIBUTION_RE.match(text):
+        return []
+    # テーブルのプレースホルダ `| — |`（N/A 表記）は残す
+    protect = []
+    if line.block == TABLE:
+        protect = [(a, b) for a, b in line.cells if text[a:b].strip() == "—"]
+    return [
+        [(at, at + 1, "：")] for at in line.find("—", protect=protect)
+        if text[at - 1:at] != "—" and text[at + 1:at + 2] != "—"
+    ]
+
+
+# 登録順 = 範囲が重なった編集の優先順位
+RULES: dict[str, Rule] = {
+    "bold": bold_edits,
+    "emdash": emdash_edits,
+    "single-emdash": single_emdash_edits,
+}
+
+
+def apply_edits(text: str, edits: list[tuple[int, int, str, tuple[str, int]]]) -> tuple[str, Counter]:
+    """(開始, 終了, 置換文字列, (ルール名, 修正番号)) の編集を適用し、ルールごとの修正数を返す.
+
+    edits はルールの優先順に並んでいること。範囲が重なる編集は先のものだけを採る。
+    """
+    accepted: list[tuple[int, tuple[int, int, str, tuple[str, int]]]] = []
+    for prio, edit in sorted(enumerate(edits), key=lambda p: (p[1][0], p[0])):
+        if accepted and edit[0] < accepted[-1][1][1]:
+            if prio > accepted[-1][0]:
+                continue
+            accepted.pop()
+        accepted.append((prio, edit))
+
+    out = []
+    pos = 0
+    fixes = set()
+    for _, (start, end, repl, fix) in accepted:
+        out.append(text[pos:start])
+        out.append(repl)
+        pos = end
+        fixes.add(fix)
+    out.append(text[pos:])
+    return "".join(out), Counter(rule for rule, _ in fixes)
+
+
+def rewrite_text(text: str, rules: list[str]) -> tuple[str, Counter]:
+    """全ルールを1回のトークン化で適用した本文と、ルールごとの修正数を返す."""
+    out = []
+    counts: Counter = Counter()
+    for line in tokenize(text.split("\n")):
+        edits = [
+            (*edit, (name, k))
+            for name, rule in RULES.items() if name in rules
+            for k, fix in enumerate(rule(line)) for edit in fix
+        ]
+        if not edits:
+            out.append(line.text)
+            continue
+        new, n = apply_edits(line.text, edits)
+        counts.update(n)
+        out.append(new)
+    return "\n".join(out), counts
+
+
+def rewrite_files(paths: list[Path], rules: list[str], label: str,
+                  dry_run: bool = False) -> list[tuple[Path, Counter]]:
+    """paths を書き換え、変更のあったファイルと修正数を返す.
+
+    書き換える前の内容は1つの BackupRun にまとめて保存する。
+    """
+    backup = BackupRun(label)
+    changed = []
+    for path in paths:
+        raw = path.read_bytes()
+        text = raw.decode("utf-8")
+        new_text, counts = rewrite_text(text, rules)
+        if new_text == text:
+            continue
+        if not dry_run:
+            backup.add(path, raw)
+            atomic_write(path, new_text)
+        changed.append((path, counts))
+    if not dry_run:
+        manifest = backup.close()
+        if manifest:
+            print(f"バックアップ: {manifest}")
+    return changed
+
+
+def print_summary(title: str, changed: list[tuple[Path, Counter]], limit: int | None = None) -> None:
+    totals: Counter = Counter()
+    for _, counts in changed:
+        totals.update(counts)
+    print(f"=== {title} complete ===")
+    print(f"Files modified: {len(changed)}")
+    print(f"Total replacements: {sum(totals.values())}")
+    if len(totals) > 1:
+        for name in RULES:
+            if totals[name]:
+                print(f"  {name}: {totals[name]}")
+    ranked = sorted(changed, key=lambda x: -sum(x[1].values()))
+    for path, counts in ranked[:limit]:
+        print(f"  {sum(counts.values()):3d}  {path.name}")
+    if limit is not None and len(ranked) > limit:
+        print(f"  ... +{len(ranked) - limit} more")
+
+
+def main(rules: list[str] | None = None, title: str = "Text fix", limit: int | None = None) -> None:
+    parser = argparse.ArgumentParser(description="記事テキストの一括修正")
+    if rules is None:
+        parser.add_argument("--rules", default=",".join(RULES),
+                            help=f"適用するルール（カンマ区切り、デフォルト: {','.join(RULES)}）")
+    parser.add_argument("--dry-run", action="store_true", help="書き込まずに件数だけ表示")
+    parser.add_argument("files", nargs="*", type=Path, help="対象ファイル（省略時は articles/*.md）")
+    args = parser.parse_args()
+
+    if rules is None:
+        rules = [r.strip() for r in args.rules.split(",") if r.strip()]
+        unknown = [r for r in rules if r not in RULES]
+        if unknown:
+            parser.error(f"不明なルール: {', '.join(unknown)}")
+    paths = args.files or sorted(ARTICLES_DIR.glob("*.md"))
+    changed = rewrite_files(paths, rules, label="-".join(rules), dry_run=args.dry_run)
+    print_summary(title, changed, limit)
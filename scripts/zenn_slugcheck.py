@@ -0,0 +1,190 @@
+"""Zenn slug 衝突チェックの共通エンジン.
+
+Zenn の slug はサイト全体で一意。他アカウントが同じ slug を使用中だと
+デプロイ時に全記事がブロックされるため、公開前に
+`HEAD https://zenn.dev/api/articles/{slug}` で使用状況を確認する。
+
+  - スレッドプール（既定 8 並列）で並行に問い合わせる
+  - 接続はスレッドごとに keep-alive で使い回す
+  - トークンバケットで毎秒のリクエスト数を制限する
+  - 判定が確定した結果（200 / 404）は .zenn-cache/slug-collisions.json に
+    checked_at 付きで保存し、TTL 内は再問い合わせしない
+
+HTTP 層は head(path) -> int を持つ任意のオブジェクトに差し替えられる。
+ZENN_BASE_URL を設定すると問い合わせ先を変えられる（ローカルのスタブサーバー等）。
+
+使い方:
+  from zenn_slugcheck import SlugCollisionChecker
+  checker = SlugCollisionChecker(user_agent="validate-frontmatter/1.0")
+  statuses = checker.check(["my-slug", ...])   # slug → HTTP ステータス（-1 はネットワークエラー）
+  checker.save()
+"""
+
+import http.client
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from zenn_corpus import CACHE_DIR, atomic_write
+
+ZENN_BASE_URL = os.environ.get("ZENN_BASE_URL", "https://zenn.dev")
+SLUG_CACHE_FILE = CACHE_DIR / "slug-collisions.json"
+SLUG_CACHE_VERSION = 1
+CACHE_TTL_HOURS = 24
+MAX_WORKERS = 8
+REQUESTS_PER_SEC = 10.0
+TIMEOUT_SEC = 5
+DEFINITIVE_STATUSES = {200, 404}  # 403/429/5xx は判定不能のためキャッシュしない
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット（rate 個/秒、最大 burst 個）."""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpTransport:
+    """スレッドごとに keep-alive 接続を保持して HEAD を送る HTTP 層."""
+
+    def __init__(self, base_url: str = ZENN_BASE_URL, user_agent: str = "zenn-slugcheck/1.0",
+                 timeout: float = TIMEOUT_SEC):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = cls(self.netloc, timeout=self.timeout)
+            self.local.conn = conn
+        return conn
+
+    def head(self, path: str) -> int:
+        """HEAD を送ってステータスを返す. ネットワークエラー時は -1."""
+        headers = {"User-Agent": self.user_agent, "Connection": "keep-alive"}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("HEAD", self.prefix + path, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.will_close:
+                    conn.close()
+                    self.local.conn = None
+                return resp.status
+            except (OSError, http.client.HTTPException):
+                # サーバー側で切られた keep-alive 接続は1回だけ張り直す
+                conn.close()
+                self.local.conn = None
+        return -1
+
+
+class SlugCollisionChecker:
+    """slug の使用状況を並行に問い合わせ、確定結果を TTL 付きでキャッシュする."""
+
+    def __init__(self, transport=None, user_agent: str = "zenn-slugcheck/1.0",
+                 cache_path: Path | None = SLUG_CACHE_FILE, ttl_hours: float = CACHE_TTL_HOURS,
+                 max_workers: int = MAX_WORKERS, rate: float = REQUESTS_PER_SEC):
+        self.transport = transport or HttpTransport(user_agent=user_agent)
+        self.cache_path = cache_path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate)
+        self.cache: dict[str, dict] = {}
+        self.dirty = False
+        if cache_path is not None:
+            try:
+                data = json.loads(cache_path.read_text(encoding="utf-8"))
+                if data.get("version") == SLUG_CACHE_VERSION:
+                    self.cache = data.get("slugs", {})
+            except (OSError, ValueError):
+                pass
+
+    def _cached(self, slug: str, now: datetime) -> int | None:
+        entry = self.cache.get(slug)
+        if not entry:
+            return None
+        try:
+            checked_at = datetime.fromisoformat(entry["checked_at"])
+        except (KeyError, ValueError):
+            return None
+        if now - checked_at >= self.ttl:
+            return None
+        return entry["status"]
+
+    def _fetch(self, slug: str) -> int:
+        self.bucket.acquire()
+        return self.transport.head(f"/api/articles/{slug}")
+
+    def check(self, slugs: list[str], fresh: bool = False) -> dict[str, int]:
+        """slug → HTTP ステータス（200: 使用中, 404: 未使用, -1: ネットワークエラー）.
+
+        fresh=True ならキャッシュを読まずに問い合わせる（結果はキャッシュに書く）。
+        """
+        now = datetime.now(timezone.utc)
+        results: dict[str, int] = {}
+        pending = []
+        for slug in dict.fromkeys(slugs):
+            status = None if fresh else self._cached(slug, now)
+            if status is None:
+                pending.append(slug)
+            else:
+                results[slug] = status
+
+        if pending:
+            workers = max(1, min(self.max_workers, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for slug, status in zip(pending, pool.map(self._fetch, pending)):
+                    results[slug] = status
+                    if status in DEFINITIVE_STATUSES:
+                        self.cache[slug] = {"status": status, "checked_at": now.isoformat()}
+                        self.dirty = True
+
+        return {slug: results[slug] for slug in slugs}
+
+    def collisions(self, slugs: list[str], fresh: bool = False) -> list[str]:
+        """Zenn 上で既に使用されている slug（入力順）."""
+        statuses = self.check(slugs, fresh=fresh)
+        return [slug for slug in slugs if statuses[slug] == 200]
+
+    def save(self) -> None:
+        """期限切れを除いてキャッシュを書き出す（変更がある時のみ）."""
+        if self.cache_path is None or not self.dirty:
+            return
+        now = datetime.now(timezone.utc)
+        self.cache = {s: e for s, e in self.cache.items() if self._cached(s, now) is not None}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.cache_path, json.dumps(
+                {"version": SLUG_CACHE_VERSION, "slugs": self.cache}, ensure_ascii=False, indent=2,
+            ))
+        except OSError:
+            pass
+        self.dirty = False
@@ -0,0 +1,195 @@
+"""コーパス全体の列指向スナップショット（ローカル分析・BigQuery への一括ロード用）.
+
+記事1件を1行にして、次の列を1つの Parquet ファイルに書き出す:
+  - front matter: title / emoji / type / topics / published / status / published_at / publication_name
+  - 本文: body（front matter 以降の全文）と sha256
+  - 統計: 行数・文字数（zenn_corpus）と zenn_metrics の指標（見出し・コード言語・内部リンク・画像・読了時間）
+  - lint: lint-bold-emdash の指摘（rule / severity / line / column / message）と severity ごとの件数
+emoji / type / status / publication_name / topics と lint の rule / severity は辞書エンコードし、
+読み込みは read_table でメモリマップする。
+
+stats は audit_articles.py の print_stats と同じ統計（総数・fixed_visual・tech:idea 比率）に
+加えて、種別・topics・emoji の重複・lint の集計を pyarrow.compute のベクトル演算で求める。
+記事ファイルは読まないので、エクスポート済みのスナップショットがあれば数ミリ秒で終わる。
+
+pyarrow が無い環境では export は同じ列の NDJSON を書く（zenn_columnar）。stats には pyarrow が必要。
+
+使い方:
+  python3 scripts/zenn_snapshot.py export                  # .zenn-cache/corpus-snapshot.parquet
+  python3 scripts/zenn_snapshot.py export -o snapshot.parquet
+  python3 scripts/zenn_snapshot.py stats [snapshot.parquet]
+  bq load --source_format=PARQUET --replace dataset.articles .zenn-cache/corpus-snapshot.parquet
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+from zenn_columnar import read_table, write_table
+from zenn_corpus import ARTICLES_DIR, CACHE_DIR, REPO_ROOT, Article, load_corpus
+from zenn_metrics import COLUMNS as METRICS_COLUMNS, article_metrics
+
+try:
+    import pyarrow.compute as pc
+except ImportError:
+    pc = None
+
+SNAPSHOT_FILE = CACHE_DIR / "corpus-snapshot.parquet"
+TOP_TOPICS = 15
+
+LINT_COLUMNS = [
+    ("lint", ("list", ("struct", [
+        ("rule", ("dictionary", "string")),
+        ("severity", ("dictionary", "string")),
+        ("line", "int64"),
+        ("column", "int64"),
+        ("message", "string"),
+    ]))),
+    ("lint_error_count", "int64"),
+    ("lint_warning_count", "int64"),
+]
+COLUMNS = [
+    ("id", "string"),
+    ("slug", "string"),
+    ("filename", "string"),
+    ("title", "string"),
+    ("emoji", ("dictionary", "string")),
+    ("type", ("dictionary", "string")),
+    ("topics", ("list", ("dictionary", "string"))),
+    ("published", "bool"),
+    ("status", ("dictionary", "string")),
+    ("published_at", "string"),
+    ("publication_name", ("dictionary", "string")),
+    ("sha256", "string"),
+    ("line_count", "int64"),
+    ("chars", "int64"),
+    ("body", "string"),
+    *[(name, spec) for name, spec in METRICS_COLUMNS if name not in ("id", "slug")],
+    *LINT_COLUMNS,
+]
+
+
+def load_lint():
+    """scripts/lint-bold-emdash.py をモジュールとして読み込む（ファイル名にハイフンがあるため）."""
+    spec = importlib.util.spec_from_file_location("lint_bold_emdash", Path(__file__).with_name("lint-bold-emdash.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def snapshot_row(article: Article, lint) -> dict:
+    fm = article.fm
+    findings = article.memo(lint.CACHE_KEY, lint.audit)
+    row = {
+        "filename": article.filename,
+        "title": fm.get("title", ""),
+        "emoji": fm.get("emoji"),
+        "type": fm.get("type"),
+        "topics": article.topics,
+        "published": article.is_published(),
+        "status": fm.get("status"),
+        "published_at": fm.get("published_at"),
+        "publication_name": fm.get("publication_name"),
+        "sha256": article.sha256,
+        "line_count": article.line_count,
+        "chars": article.stats["chars"],
+        "body": article.body,
+        "lint": findings,
+        "lint_error_count": sum(1 for x in findings if x["severity"] == "error"),
+        "lint_warning_count": sum(1 for x in findings if x["severity"] == "warning"),
+    }
+    row.update(article_metrics(article))
+    return row
+
+
+def export(path: Path, articles_dir: Path = ARTICLES_DIR) -> Path:
+    lint = load_lint()
+    rows = []
+    for article in load_corpus(articles_dir=articles_dir).values():
+        rows.append(snapshot_row(article, lint))
+        article.release()
+    return write_table(path, rows, COLUMNS)
+
+
+# ---- 統計（pyarrow.compute） ----
+
+def counts(array) -> list[tuple[str, int]]:
+    """値ごとの件数（多い順、同数は値の順）."""
+    result = pc.value_counts(pc.drop_null(array))
+    pairs = zip(result.field("values").to_pylist(), result.field("counts").to_pylist())
+    return sorted(pairs, key=lambda kv: (-kv[1], kv[0]))
+
+
+def print_stats(table) -> None:
+    """audit_articles.print_stats と同じ統計 + 種別・topics・emoji・lint の集計."""
+    published = table.filter(pc.field("published"))
+    fixed_visual = pc.match_substring(published["slug"], "_fixed_visual")
+    n_fv = pc.sum(fixed_visual).as_py() or 0
+    types = dict(counts(published["type"]))
+    tech, idea = types.get("tech", 0), types.get("idea", 0)
+
+    print("=" * 70)
+    print("📊 記事統計")
+    print("=" * 70)
+    print(f"  総記事数（全ファイル）: {table.num_rows}")
+    print(f"  published=true 総数 : {published.num_rows}")
+    print(f"    うち fixed_visual版: {n_fv}")
+    print(f"    うち 通常版        : {published.num_rows - n_fv}")
+    print(f"  type=tech: {tech}本 / type=idea: {idea}本")
+    if idea:
+        print(f"  tech:idea比率 = {tech/idea:.1f}:1")
+
+    print()
+    print("  status: " + " / ".join(f"{v or '(なし)'}: {n}" for v, n in counts(table["status"].fill_null(""))))
+    print(f"  推定読了時間（公開記事）: 平均 {pc.mean(published['reading_minutes']).as_py() or 0:.1f}分"
+          f" / 合計 {pc.sum(published['reading_minutes']).as_py() or 0:.0f}分")
+    print(f"  内部リンク: {pc.sum(table['internal_link_count']).as_py()}本"
+          f" / 画像: {pc.sum(table['image_count']).as_py()}枚（見つからない: {pc.sum(table['missing_image_count']).as_py()}）")
+    print(f"  lint: error {pc.sum(table['lint_error_count']).as_py()}件"
+          f" / warning {pc.sum(table['lint_warning_count']).as_py()}件")
+
+    print(f"\n  topics 上位{TOP_TOPICS}（全記事）:")
+    for topic, n in counts(pc.list_flatten(table["topics"]))[:TOP_TOPICS]:
+        print(f"    {n:4d}  {topic}")
+
+    duplicates = [(emoji, n) for emoji, n in counts(published["emoji"]) if n > 1]
+    if duplicates:
+        print("\n  emoji の重複（公開記事）: " + " ".join(f"{e}×{n}" for e, n in duplicates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="コーパスの列指向スナップショット")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="スナップショットを書き出す")
+    p_export.add_argument("-o", "--output", type=Path, default=SNAPSHOT_FILE,
+                          help=f"出力先（既定: {SNAPSHOT_FILE.relative_to(REPO_ROOT)}）")
+    p_stats = sub.add_parser("stats", help="スナップショットから統計を表示する")
+    p_stats.add_argument("path", type=Path, nargs="?", default=SNAPSHOT_FILE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        start = time.perf_counter()
+        path = export(args.output)
+        print(f"スナップショットを書き出しました: {path} ({path.stat().st_size // 1024}KB,"
+              f" {time.perf_counter() - start:.2f}s)")
+        return
+
+    if pc is None:
+        print("stats には pyarrow が必要です（pip install pyarrow）", file=sys.stderr)
+        sys.exit(1)
+    if not args.path.exists():
+        print(f"スナップショットがありません: {args.path}（先に export を実行してください）", file=sys.stderr)
+        sys.exit(1)
+    start = time.perf_counter()
+    table = read_table(args.path, columns=[
+        "slug", "type", "topics", "published", "status", "emoji", "reading_minutes",
+        "internal_link_count", "image_count", "missing_image_count", "lint_error_count", "lint_warning_count",
+    ])
+    print_stats(table)
+    print(f"\n（{time.perf_counter() - start:.3f}s）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""複数記事の公開状態の遷移をまとめて行うトランザクション.
+
+(slug, 遷移) の組をまとめて受け取り、
+  1. すべてをコーパス（load_corpus の front matter）に対して検証する
+     （記事が存在するか・遷移前の状態か・予約枠が空いているか・同じ記事を二重に含まないか）
+  2. 変更後の記事をすべて一時ファイルに書く
+  3. 一時ファイルを順に os.replace で差し替えてから、record() したイベントを
+     イベントログ（zenn_events）にまとめて追記する。途中で失敗したら差し替え済みの
+     ファイルを元に戻す
+検証で1件でも問題があれば何も書き込まない。イベントは遷移の件数に関係なく1回で追記する。
+
+遷移:
+  PUBLISH              published: false → true（status: publish-ready / draft → published）
+  REVERT               published: true → false（status: published → draft）
+  ROLLBACK             published: false にして published_at を削除
+  schedule(at)         published_at を at に設定（published: false なら true にする）
+
+使い方:
+  from zenn_state import PUBLISH, StateTransaction, TransitionError, schedule
+
+  txn = StateTransaction()
+  txn.add("my-slug", schedule("2026-05-01 08:00"))
+  txn.add("other-slug", PUBLISH)
+  txn.record("dequeued", "my-slug")     # イベントは commit() でまとめて追記
+  txn.state.failures                    # 読み込み時点のビュー + record() したイベント
+  try:
+      applied = txn.commit()            # slug → 適用した front matter の変更
+  except TransitionError as e:
+      print(e.errors)
+"""
+
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from zenn_corpus import REPO_ROOT, Article, load_corpus
+from zenn_events import EventLog, PublishState, replay
+from zenn_frontmatter import stage_frontmatter, unquote
+
+SCHEDULE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class TransitionError(Exception):
+    """検証に失敗した遷移（errors に1件ずつのメッセージ）. この場合ファイルは変更されない."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+@dataclass
+class Transition:
+    """1記事の状態遷移.
+
+    require は遷移前に満たすべき front matter の値（引用符を除いた値の候補）、
+    edit は patch_frontmatter と同じく生の値 dict → 変更を返す関数。
+    """
+
+    name: str
+    edit: Callable[[dict[str, str]], dict[str, str | None]]
+    require: dict[str, set[str]] = field(default_factory=dict)
+    published_at: str | None = None
+    insert_after: str | None = None
+
+
+def _publish(fm: dict[str, str]) -> dict[str, str | None]:
+    changes = {"published": "true"}
+    if unquote(fm.get("status", "")) in ("publish-ready", "draft"):
+        changes["status"] = '"published"'
+    return changes
+
+
+def _revert(fm: dict[str, str]) -> dict[str, str | None]:
+    changes = {"published": "false"}
+    if unquote(fm.get("status", "")) == "published":
+        changes["status"] = '"draft"'
+    return changes
+
+
+def _rollback(fm: dict[str, str]) -> dict[str, str | None]:
+    # published: false + published_at は Zenn で無効な組み合わせなので一緒に消す
+    return {"published": "false", "published_at": None}
+
+
+PUBLISH = Transition("publish", _publish, {"published": {"false"}})
+REVERT = Transition("revert", _revert, {"published": {"true"}})
+ROLLBACK = Transition("rollback", _rollback)
+
+
+def schedule(published_at: str) -> Transition:
+    """published_at（"YYYY-MM-DD HH:MM"）に予約する遷移."""
+    def edit(fm):
+        changes = {"published_at": f'"{published_at}"'}
+        if unquote(fm.get("published", "")) == "false":
+            changes["published"] = "true"
+        return changes
+
+    return Transition(f"schedule {published_at}", edit, published_at=published_at, insert_after="published")
+
+
+class StateTransaction:
+    """記事の状態遷移とイベントの追記をまとめて書き込む（1回きり）."""
+
+    def __init__(self, corpus: dict[str, Article] | None = None, root: Path = REPO_ROOT):
+        """root はリポジトリルート（GitHub Actions では GITHUB_WORKSPACE）."""
+        self.root = Path(root)
+        self.corpus = corpus if corpus is not None else load_corpus(articles_dir=self.root / "articles")
+        self.transitions: list[tuple[str, Transition]] = []
+        self.log = EventLog(self.root)
+        self.pending: list[dict] = []
+        self._logged: list[dict] | None = None
+
+    def add(self, slug: str, transition: Transition) -> None:
+        self.transitions.append((slug, transition))
+
+    # ---- イベント（record() でためて commit() で追記する） ----
+
+    def record(self, type: str, slug: str = "", **data) -> dict:
+        """commit() で追記するイベントを追加する（state にはすぐ反映される）."""
+        event = self.log.event(type, slug, **data)
+        self.pending.append(event)
+        return event
+
+    @property
+    def state(self) -> PublishState:
+        """初回アクセス時点のイベントログ + record() したイベントのビュー."""
+        if self._logged is None:
+            self._logged = self.log.events()
+        return replay(self._logged + self.pending)
+
+    # ---- 検証と書き込み ----
+
+    def validate(self) -> list[str]:
+        """すべての遷移をコーパスに対して検証し、問題のメッセージを返す."""
+        errors = []
+        seen = set()
+        taken = {}
+        for slug, article in self.corpus.items():
+            at = article.fm.get("published_at")
+            if at:
+                taken[at] = slug
+        for slug, transition in self.transitions:
+            label = f"{slug}: {transition.name}"
+            if slug in seen:
+                errors.append(f"{label}: 同じ記事への遷移が重複しています")
+                continue
+            seen.add(slug)
+            article = self.corpus.get(slug)
+            if article is None:
+                errors.append(f"{label}: 記事が見つかりません")
+                continue
+            if article.fm_end is None:
+                errors.append(f"{label}: front matter がありません")
+                continue
+            for key, allowed in transition.require.items():
+                value = article.fm.get(key, "")
+                if value not in allowed:
+                    errors.append(f"{label}: {key} が {value or '(なし)'}（{'/'.join(sorted(allowed))} が必要）")
+            at = transition.published_at
+            if at is not None:
+                try:
+                    datetime.strptime(at, SCHEDULE_FORMAT)
+                except ValueError:
+                    errors.append(f"{label}: published_at の形式が不正です（{SCHEDULE_FORMAT}）")
+                    continue
+                if taken.get(at, slug) != slug:
+                    errors.append(f"{label}: {at} は {taken[at]} が予約済みです")
+                    continue
+                taken[at] = slug
+        return errors
+
+    def commit(self) -> dict[str, dict[str, str | None]]:
+        """検証して全ファイルを書き込み、slug → 適用した front matter の変更を返す.
+
+        検証に失敗したら TransitionError（何も書かない）。書き込み途中で失敗したら
+        差し替え済みのファイルを元に戻して例外を送出する。
+        """
+        errors = self.validate()
+        if errors:
+            raise TransitionError(errors)
+
+        staged: list[tuple[Path, Path]] = []
+        applied = {}
+        try:
+            for slug, transition in self.transitions:
+                path = self.corpus[slug].path
+                tmp, changes = stage_frontmatter(path, transition.edit, transition.insert_after)
+                if tmp is not None:
+                    staged.append((path, tmp))
+                applied[slug] = changes
+            _replace_all(staged, then=lambda: self.log.append(*self.pending))
+        except BaseException:
+            for _, tmp in staged:
+                _unlink(tmp)
+            raise
+        self.transitions = []
+        if self._logged is not None:
+            self._logged += self.pending
+        self.pending = []
+        return applied
+
+
+def _unlink(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _replace_all(staged: list[tuple[Path, Path]], then: Callable[[], None] | None = None) -> None:
+    """一時ファイルを順に差し替えてから then を呼ぶ. どこかで失敗したら差し替え済みのものを元の内容に戻す."""
+    done: list[tuple[Path, Path | None]] = []  # (差し替えたファイル, 元の内容の退避先)
+    try:
+        for path, tmp in staged:
+            backup = None
+            if path.exists():
+                backup = path.with_name(f".{path.name}.txn-backup")
+                _unlink(backup)
+                try:
+                    os.link(path, backup)
+                except OSError:
+                    shutil.copy2(path, backup)
+            done.append((path, backup))
+            os.replace(tmp, path)
+        if then is not None:
+            then()
+    except BaseException:
+        for path, backup in reversed(done):
+            if backup is None:
+                _unlink(path)
+            elif os.path.samefile(backup, path):
+                _unlink(backup)  # 差し替え前に失敗（同じ inode への rename は何もしない）
+            else:
+                os.replace(backup, path)
+        raise
+    for _, backup in done:
+        if backup is not None:
+            _unlink(backup)
@@ -0,0 +1,142 @@
+"""記事ディレクトリの変更監視（validate-frontmatter / lint-bold-emdash の --watch 用）.
+
+Linux では inotify（libc を ctypes で呼ぶ。追加パッケージ不要）で articles/ を監視し、
+使えない環境（macOS・inotify の上限超過など）では mtime / size のスナップショットを
+一定間隔で比べるポーリングに切り替える。
+
+エディタの保存は「一時ファイルに書いて rename」や複数回の write になることがあるので、
+最初のイベントから DEBOUNCE 秒のあいだに届いたイベントをまとめて1回の変更として返す。
+
+使い方:
+  from zenn_watch import ArticleWatcher
+  for paths in ArticleWatcher(ARTICLES_DIR):  # 変更・追加・削除された *.md の Path の集合
+      for path in paths:
+          if path.exists(): ...               # 削除は存在しない Path として届く
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Iterator
+
+DEBOUNCE = 0.03  # 秒: 1回の保存で届く連続イベントをまとめる待ち時間
+POLL_INTERVAL = 0.2  # 秒: ポーリング時のスナップショット間隔
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _inotify_fd(directory: Path) -> int | None:
+    """directory を監視する inotify の fd（使えなければ None）."""
+    if not hasattr(select, "poll"):
+        return None
+    name = ctypes.util.find_library("c")
+    if not name:
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    fd = init(os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    if add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _read_names(fd: int) -> tuple[set[str], bool]:
+    """fd に溜まったイベントの (ファイル名の集合, 監視対象ディレクトリ自体が消えたか)."""
+    data = os.read(fd, 64 * 1024)
+    names, gone = set(), False
+    offset = 0
+    while offset < len(data):
+        _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+        offset += EVENT_HEADER.size
+        name = data[offset:offset + length].rstrip(b"\0")
+        offset += length
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            gone = True
+        elif name:
+            names.add(os.fsdecode(name))
+    return names, gone
+
+
+def _watch_inotify(fd: int, directory: Path, pattern: str) -> Iterator[set[Path]]:
+    poller = select.poll()
+    poller.register(fd, select.POLLIN)
+    try:
+        while True:
+            poller.poll()
+            names, gone = _read_names(fd)
+            deadline = time.monotonic() + DEBOUNCE
+            while not gone and (wait := deadline - time.monotonic()) > 0 and poller.poll(wait * 1000):
+                more, gone = _read_names(fd)
+                names |= more
+            paths = {directory / n for n in names if Path(n).match(pattern)}
+            if paths:
+                yield paths
+            if gone:
+                return
+    finally:
+        os.close(fd)
+
+
+def snapshot(directory: Path, pattern: str) -> dict[Path, tuple[int, int]]:
+    """pattern に一致するファイルの (mtime_ns, size)."""
+    snap = {}
+    for path in directory.glob(pattern):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        snap[path] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+
+def _watch_polling(directory: Path, pattern: str, interval: float,
+                   before: dict[Path, tuple[int, int]]) -> Iterator[set[Path]]:
+    while True:
+        time.sleep(interval)
+        after = snapshot(directory, pattern)
+        paths = {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+        before = after
+        if paths:
+            yield paths
+
+
+class ArticleWatcher:
+    """directory 直下の pattern に一致するファイルの変更を、まとまりごとに Path の集合で返す.
+
+    polling=True か inotify が使えない場合は interval 秒ごとのスナップショット比較になる
+    （backend で "inotify" / "polling" を確認できる）。inotify の監視は生成時に始まるので、
+    生成後〜反復開始前の変更も取りこぼさない。
+    """
+
+    def __init__(self, directory: Path, pattern: str = "*.md", polling: bool = False,
+                 interval: float = POLL_INTERVAL):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.interval = interval
+        self.fd = None if polling else _inotify_fd(self.directory)
+        self.backend = "polling" if self.fd is None else "inotify"
+        self.snap = snapshot(self.directory, pattern) if self.fd is None else {}
+
+    def __iter__(self) -> Iterator[set[Path]]:
+        if self.fd is None:
+            return _watch_polling(self.directory, self.pattern, self.interval, self.snap)
+        return _watch_inotify(self.fd, self.directory, self.pattern)